@@ -1,38 +1,48 @@
-import csv, json, sys
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+import dict_json, editor_types, profiling, rich_text, table_registry, table_schema
+from build_cache import open_output, run_cached
+from dict_json import DictJsonWriter
+from editor_types import ConfigReference, Entry, Int32, String, Struct
+from rich_text import NL, literal_newlines
+from table_schema import Column, load_columns
+
 STRUCT_ID = "1077936134"
 SET_NAME_COLOR = "#71db60"
 NEED_PREFIX_COLOR = "#FFFFFFBF"  # 仅 2/4 件套的前缀高亮
 
-def to_int_str(v: str) -> str:
-    try:
-        return str(int(float(str(v).strip())))
-    except Exception:
-        return "0"
+# 只有一个“套装”列的版本
+ITEM_COLUMNS = [
+    Column("卡牌标题", String),
+    Column("ID", ConfigReference),
+    Column("基础效果", String),
+    Column("套装", String),
+    Column("标签颜色", Int32, default=0),
+    Column("价格", Int32, default=0),
+]
 
 def load_sets(sets_csv: str):
     """
     读取“圣遗物套装.csv”，返回：{ 套装名: {need1,eff1,need2,eff2,need3,eff3} }
     """
     m = {}
-    with open(sets_csv, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.DictReader(f)
-        if r.fieldnames is None:
-            raise SystemExit("圣遗物套装.csv 缺少表头。")
-        r.fieldnames = [ (h or "").strip() for h in r.fieldnames ]
-        for row in r:
-            name = (row.get("名字") or "").strip()
-            if not name:
-                continue
-            m[name] = {
-                "need1": (row.get("套装需求1") or "").strip(),
-                "eff1":  (row.get("套装效果1") or "").strip(),
-                "need2": (row.get("套装需求2") or "").strip(),
-                "eff2":  (row.get("套装效果2") or "").strip(),
-                "need3": (row.get("套装需求3") or "").strip(),
-                "eff3":  (row.get("套装效果3") or "").strip(),
-            }
+    t = table_registry.load(sets_csv)
+    if not t.header:
+        raise SystemExit("圣遗物套装.csv 缺少表头。")
+    for row in t.records():
+        name = (row.get("名字") or "").strip()
+        if not name:
+            continue
+        m[name] = {
+            "need1": (row.get("套装需求1") or "").strip(),
+            "eff1":  literal_newlines((row.get("套装效果1") or "").strip()),
+            "need2": (row.get("套装需求2") or "").strip(),
+            "eff2":  literal_newlines((row.get("套装效果2") or "").strip()),
+            "need3": (row.get("套装需求3") or "").strip(),
+            "eff3":  literal_newlines((row.get("套装效果3") or "").strip()),
+        }
     return m
 
 def _normalize_need(n: str) -> str:
@@ -48,98 +58,85 @@ def _fmt_need_line(need: str, eff: str):
         return f"<color={NEED_PREFIX_COLOR}>{prefix}</color>{eff}"
     return f"{prefix}{eff}"
 
-def build_desc(base_effect: str, set_name: str, sets_map: dict) -> str:
+def render_set_block(set_name: str, row) -> str:
+    """
+    套装部分：彩色套装名 + 各件套效果行（字面 \\n 连接）。与物品无关，每个套装渲染一次即可。
+    """
+    if not set_name:
+        return ""
+    lines = [f"<color={SET_NAME_COLOR}>{set_name}</color>"]
+    if row:
+        for ln in (
+            _fmt_need_line(row["need1"], row["eff1"]),
+            _fmt_need_line(row["need2"], row["eff2"]),
+            _fmt_need_line(row["need3"], row["eff3"]),
+        ):
+            if ln:
+                lines.append(ln)
+    return NL.join(lines)
+
+def make_set_block_cache(sets_map: dict, check=None):
+    """
+    {套装名: 套装块} 的记忆化索引；.cache_info() 给出复用次数。
+    给了 check（rich_text.Validator）时每个套装块在第一次渲染时校验一次。
+    """
+    def render(set_name):
+        block = render_set_block(set_name, sets_map.get(set_name))
+        if check is not None:
+            check(block, f"套装 {set_name}")
+        return block
+    return lru_cache(maxsize=None)(render)
+
+def build_desc(base_effect: str, set_name: str, sets_map: dict, set_block=None) -> str:
     """
     单一套装版本描述，使用**字面** \\n 连接每行。
+    set_block 为 make_set_block_cache() 的结果时复用预渲染的套装块，只拼上本行的基础效果。
     """
-    lines = []
-    base_effect = (base_effect or "").strip()
+    base_effect = literal_newlines((base_effect or "").strip())
     set_name = (set_name or "").strip()
+    block = set_block(set_name) if set_block else render_set_block(set_name, sets_map.get(set_name))
+
+    if not base_effect:
+        return block
+    # 基础效果加括号，空一行后接套装块
+    return f"({base_effect}){NL}{NL}{block}" if block else f"({base_effect}){NL}"
 
-    if base_effect:
-        lines.append(f"({base_effect})")  # 基础效果加括号
-        lines.append("")                  # 空一行
-
-    if set_name:
-        lines.append(f"<color={SET_NAME_COLOR}>{set_name}</color>")
-        row = sets_map.get(set_name)
-        if row:
-            for ln in (
-                _fmt_need_line(row["need1"], row["eff1"]),
-                _fmt_need_line(row["need2"], row["eff2"]),
-                _fmt_need_line(row["need3"], row["eff3"]),
-            ):
-                if ln:
-                    lines.append(ln)
-
-    return "\\n".join(lines)
-
-def make_entry(key_index: int, title: str, config_id: str, tag_color: str, price: str, desc: str, struct_id: str = STRUCT_ID):
+def make_entry(key_index: int, title: str, config_id: str, tag_color: int, price: int, desc: str, struct_id: str = STRUCT_ID):
     """
     第一项为 String(卡牌标题) —— 你要求用名字。
     """
-    return {
-        "key": {"param_type": "Int32", "value": str(key_index)},
-        "value": {
-            "param_type": "Struct",
-            "value": {
-                "structId": struct_id,
-                "type": "Struct",
-                "value": [
-                    {"param_type": "String",          "value": title},
-                    {"param_type": "ConfigReference", "value": str(config_id)},
-                    {"param_type": "Int32",           "value": to_int_str(tag_color)},
-                    {"param_type": "Int32",           "value": to_int_str(price)},
-                    {"param_type": "String",          "value": desc},
-                ]
-            }
-        }
-    }
+    return Entry(Int32(key_index), Struct(struct_id, (
+        String(title),
+        ConfigReference(config_id),
+        Int32(tag_color),
+        Int32(price),
+        String(desc),
+    )))
 
 def main(items_csv: str, sets_csv: str, out_json: str, struct_id: str = STRUCT_ID, start_index: int = 1):
     sets_map = load_sets(sets_csv)
-    entries = []
-
-    with open(items_csv, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.DictReader(f)
-        if r.fieldnames is None:
-            raise SystemExit("圣遗物.csv 缺少表头。")
-        r.fieldnames = [ (h or "").strip() for h in r.fieldnames ]
-
-        # 只有一个“套装”列的版本
-        needed = ["卡牌标题", "ID", "基础效果", "套装", "标签颜色", "价格"]
-        for c in needed:
-            if c not in r.fieldnames:
-                raise SystemExit(f"圣遗物.csv 缺少必需列: {c}；实际列：{r.fieldnames}")
-
-        idx = int(start_index)
-        for row in r:
-            title = (row.get("卡牌标题") or "").strip()
-            cfg   = (row.get("ID") or "").strip()
-            base  = (row.get("基础效果") or "").strip()
-            set_name = (row.get("套装") or "").strip()
-            tagc  = (row.get("标签颜色") or "0").strip()
-            price = (row.get("价格") or "0").strip()
-            if not title or not cfg:
-                continue
-
-            desc = build_desc(base, set_name, sets_map)
-            entries.append(make_entry(idx, title, cfg, tagc, price, desc, struct_id))
-            idx += 1
-
-    obj = {
-        "type": "Dict",
-        "key_type": "Int32",
-        "value_type": "Struct",
-        "value": entries,
-        "value_structId": struct_id
-    }
-
+    check = rich_text.Validator()
+    set_block = make_set_block_cache(sets_map, check)
     outp = Path(out_json)
-    outp.parent.mkdir(parents=True, exist_ok=True)
-    with open(outp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-    print(f"Wrote {outp}")
+    out = open_output(outp)
+
+    # 按列一次转换完；标题或 ID 为空的行跳过，其余行的坏单元格一起报错
+    cols = load_columns(items_csv, ITEM_COLUMNS, nonempty=("卡牌标题", "ID"))
+
+    # 逐行编码写出，不保留整个 entries 列表；<color> 标记不合法时写完后一起报错（输出不落盘）。
+    # 描述由 基础效果 和套装块拼成，分别校验：套装块在 set_block 第一次渲染时校验
+    with out as w, DictJsonWriter(w, "Int32", struct_id, indent=2) as writer:
+        rows = zip(cols.lines, cols["卡牌标题"], cols["ID"], cols["基础效果"], cols["套装"], cols["标签颜色"], cols["价格"])
+        for idx, (line, title, cfg, base, set_name, tagc, price) in enumerate(rows, start=int(start_index)):
+            where = f"{cols.table.path}:{line} {title}"
+            check(base, where)
+            desc = build_desc(base, set_name, sets_map, set_block)
+            writer.write(make_entry(idx, title, cfg, tagc, price, desc, struct_id))
+        check.raise_errors()
+
+    print(f"Wrote {outp}" if out.changed else f"Unchanged {outp}")
+    info = set_block.cache_info()
+    print(f"套装描述块：渲染 {info.misses} 次，复用 {info.hits} 次")
 
 if __name__ == "__main__":
     import argparse
@@ -149,5 +146,15 @@ if __name__ == "__main__":
     ap.add_argument("--out", required=True, help="输出 JSON 路径")
     ap.add_argument("--struct-id", default=STRUCT_ID, help="StructId (默认 1077936134)")
     ap.add_argument("--start-index", type=int, default=1, help="键的起始序号（默认 1）")
+    ap.add_argument("--cache-dir", default="", help="增量构建缓存目录（为空则不使用缓存）")
+    profiling.add_arguments(ap)
     args = ap.parse_args()
-    main(args.items, args.sets, args.out, struct_id=args.struct_id, start_index=args.start_index)
\ No newline at end of file
+    with profiling.from_args(args, hooks=[(sys.modules[__name__], "build_desc", "desc_build")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.items, args.sets], outputs=[args.out],
+            params={"struct_id": args.struct_id, "start_index": args.start_index},
+            sources=[__file__, dict_json.__file__, editor_types.__file__, rich_text.__file__, table_registry.__file__,
+                     table_schema.__file__],
+            build=lambda: main(args.items, args.sets, args.out, struct_id=args.struct_id, start_index=args.start_index),
+        )
\ No newline at end of file
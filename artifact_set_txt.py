@@ -1,7 +1,10 @@
-import csv
+import sys
 from pathlib import Path
 from typing import List, Tuple
 
+import profiling, rich_text, table_registry
+from build_cache import run_cached, write_text_if_changed
+
 # ===== Default Style =====
 DEFAULT_SEPARATOR = "  "   # double space
 DEFAULT_COLOR_OPEN = "<color=#71db60>"
@@ -18,30 +21,25 @@ def load_sets(sets_csv: str) -> List[Tuple[str, List[Tuple[str, str]]]]:
     读取圣遗物套装CSV，返回列表：[ (名字, [(need, effect), ...]) ]
     """
     results: List[Tuple[str, List[Tuple[str, str]]]] = []
-    with open(sets_csv, "r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        if not reader.fieldnames:
-            raise SystemExit(f"{sets_csv} 缺少表头")
-
-        # Normalize header names
-        headers = {h.strip(): h for h in reader.fieldnames}
-
-        def get(row, key):
-            real = headers.get(key, key)
-            return (row.get(real) or "").strip()
-
-        for row in reader:
-            name = get(row, "名字")
-            if not name:
-                continue
-
-            pairs: List[Tuple[str, str]] = []
-            for i in range(1, 11):
-                need = get(row, f"套装需求{i}")
-                eff  = get(row, f"套装效果{i}")
-                if need and eff:
-                    pairs.append((need, eff))
-            results.append((name, pairs))
+    t = table_registry.load(sets_csv)  # 表头已去空白
+    if not t.header:
+        raise SystemExit(f"{sets_csv} 缺少表头")
+
+    def get(row, key):
+        return (row.get(key) or "").strip()
+
+    for row in t.records():
+        name = get(row, "名字")
+        if not name:
+            continue
+
+        pairs: List[Tuple[str, str]] = []
+        for i in range(1, 11):
+            need = get(row, f"套装需求{i}")
+            eff  = get(row, f"套装效果{i}")
+            if need and eff:
+                pairs.append((need, eff))
+        results.append((name, pairs))
     return results
 
 
@@ -60,20 +58,21 @@ def build_txt(
     """生成TXT输出，每个名字和效果在同一行"""
     sets = load_sets(sets_csv)
     out_lines: List[str] = []
+    check = rich_text.Validator()  # 颜色参数或效果文本里的标记不合法时报错
 
     for name, pairs in sets:
         colored_name = wrap_color(name, color_open, color_close)
         if pairs:
             block = make_block(pairs, sep)
-            out_lines.append(f"{colored_name}{sep}{block}")
+            out_lines.append(check(f"{colored_name}{sep}{block}", f"{sets_csv} {name}"))
         else:
-            out_lines.append(colored_name)
+            out_lines.append(check(colored_name, f"{sets_csv} {name}"))
         out_lines.append("")  # blank line between entries
+    check.raise_errors()
 
     outp = Path(out_txt)
-    outp.parent.mkdir(parents=True, exist_ok=True)
-    outp.write_text("\n".join(out_lines), encoding="utf-8")
-    print(f"Wrote {outp.resolve()}")
+    changed = write_text_if_changed(outp, "\n".join(out_lines))
+    print(f"{'Wrote' if changed else 'Unchanged'} {outp.resolve()}")
 
 
 if __name__ == "__main__":
@@ -83,9 +82,18 @@ if __name__ == "__main__":
     ap.add_argument("--out", required=True, help="输出 TXT 文件路径")
     ap.add_argument("--sep", default=DEFAULT_SEPARATOR, help="段内分隔符（默认两个空格）")
     ap.add_argument("--hex", default="71db60", help="颜色HEX码（默认71db60）")
+    ap.add_argument("--cache-dir", default="", help="增量构建缓存目录（为空则不使用缓存）")
+    profiling.add_arguments(ap)
     args = ap.parse_args()
 
     color_open = f"<color=#{args.hex}>"
     color_close = "</color>"
 
-    build_txt(args.sets, args.out, sep=args.sep, color_open=color_open, color_close=color_close)
\ No newline at end of file
+    with profiling.from_args(args, hooks=[(sys.modules[__name__], "make_block", "desc_build")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.sets], outputs=[args.out],
+            params={"sep": args.sep, "hex": args.hex},
+            sources=[__file__, rich_text.__file__, table_registry.__file__],
+            build=lambda: build_txt(args.sets, args.out, sep=args.sep, color_open=color_open, color_close=color_close),
+        )
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+生成脚本的规模基准：按表结构造合成 CSV（1k / 10k / 100k / 1M 行），逐个运行 build_manifest.json 里的
+生成脚本，记录 行/秒、耗时、峰值 RSS，并与基线 JSON 比较，标出退化。
+
+  python bench.py                              # 全部规模，与 bench_baseline.json 比较
+  python bench.py --sizes 1k,10k --save        # 只跑小规模并把结果写成新基线
+  python bench.py --cases upgrades.py --sizes 100k
+
+每个 (脚本, 规模) 在单独的子进程里运行（峰值 RSS 互不干扰），合成数据用固定种子，结果可复现。
+峰值 RSS 依赖 resource 模块（Linux/macOS）；其它平台记为 null。
+"""
+import argparse, csv, json, os, random, shutil, subprocess, sys, tempfile, time
+from pathlib import Path
+
+import build
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_SIZES = "1k,10k,100k,1M"
+DEFAULT_TOLERANCE = 0.25
+# 小于这些差值的变化视为噪声
+NOISE_SECONDS = 0.05
+NOISE_RSS_KB = 2048
+
+SET_STATE_HEADER = ["名字", "ID", "套装需求1", "状态效果ID", "套装需求2", "状态效果ID", "套装需求3", "状态效果ID",
+                    "套装效果1", "套装效果2", "套装效果3", "套装效果简略描述"]
+ITEM_HEADER = ["卡牌图标", "卡牌标题", "标签描述", "ID", "基础效果", "套装", "标签颜色", "价格"]
+UPGRADE_HEADER = ["名字", "上限", "状态ID", "描述"]
+MONSTER_HEADER = ["怪物", "元件ID", "秒伤倍率", "基础生命值（1级）", "基础攻击力（1级）", "生命值额外倍率", "攻击力额外倍率",
+                  "平均秒伤", "有效生命", "总强度", "AI额外乘区", "额外强度", "单体强度", "可生成数量", "总强度", "最小生成"]
+INTRO_HEADER = ["怪物", "元件ID", "名字", "介绍"]
+PROP_HEADER = ["序号", "元件ID", "名字", "描述", "数量"]
+UPGRADES_CSV = "职业强化.csv"
+
+SLOTS = ["头盔", "手套", "胸甲", "护腿", "靴子"]
+COLORS = ["#ba7920", "#ff5555", "#00aa88", "#6fdfff"]
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s.rstrip("km")) * mult)
+
+
+def size_label(n: int) -> str:
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f"{n // 1_000_000}M"
+    if n >= 1_000 and n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+def _effect(rng: random.Random, i: int) -> str:
+    c = rng.choice(COLORS)
+    return f"<color={c}>效果{i}</color>时，获得{rng.randint(1, 9)}层<color={rng.choice(COLORS)}>战意</color>。"
+
+
+def _write(path: Path, header, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(header)
+        w.writerows(rows)
+
+
+# ---- 合成数据：每个函数写出 n 行，结构与仓库里的表一致 ----
+
+def gen_sets(path: Path, n: int, rng: random.Random):
+    """圣遗物套装.csv：同时带 套装效果 与三个 状态效果ID 列，artifact / artifact_set / *_txt 共用。"""
+    rows = ([f"套装{i}", 1128267000 + i, 2, rng.randint(0, 1 << 30), 4, rng.randint(0, 1 << 30), "", "",
+             _effect(rng, i), _effect(rng, i + 1), "", f"套装{i}的简略描述。"] for i in range(n))
+    _write(path, SET_STATE_HEADER, rows)
+
+
+def gen_items(path: Path, n: int, rng: random.Random, n_sets: int):
+    rows = ([91000 + i % 100, f"圣遗物{i}", SLOTS[i % len(SLOTS)], 1107296000 + i,
+             f"攻击力提升{rng.randint(1, 20)}-{rng.randint(21, 40)}%", f"套装{rng.randrange(n_sets)}",
+             rng.randint(1, 5), rng.choice((100, 200, 500))] for i in range(n))
+    _write(path, ITEM_HEADER, rows)
+
+
+def gen_upgrades(path: Path, n: int, rng: random.Random):
+    """职业强化：每行 0–4 个 (a/b/c) 组，组长 = 上限（1–5），偶尔带百分比。"""
+    def row(i):
+        limit = rng.randint(1, 5)
+        parts = [f"使用<color={rng.choice(COLORS)}>技能{i}</color>时"]
+        for g in range(rng.randint(0, 4)):
+            pct = "%" if rng.random() < 0.3 else ""
+            step = rng.randint(1, 50)
+            parts.append(f"获得({'/'.join(f'{step * (k + 1)}{pct}' for k in range(limit))})层效果{g}")
+        return [f"强化{i}", limit, 1077936000 + i % 1000, "，".join(parts) + "。"]
+    _write(path, UPGRADE_HEADER, (row(i) for i in range(n)))
+
+
+def gen_monsters(path: Path, n: int, rng: random.Random):
+    def row(i):
+        dps = rng.randint(20, 90)
+        hp, atk = round(rng.uniform(10, 130), 2), round(rng.uniform(15, 60), 2)
+        single = rng.randint(10, 600)
+        return [f"怪物{i}", 1082130000 + i, f"{dps}%", hp, atk, f"{rng.randint(-30, 160)}%", f"{rng.randint(0, 170)}%",
+                "", "", "", f"{rng.randint(-50, 110)}%", rng.choice((0, 0, 0, 20, -10)), single, 800 // single, 800,
+                rng.randint(1, 4)]
+    rows = [row(i) for i in range(n)]
+    blank = [""] * (len(MONSTER_HEADER) - 2)
+    rows += [["生命值权重", "50%"] + blank, ["目标强度", "800"] + blank]
+    _write(path, MONSTER_HEADER, rows)
+
+
+def gen_intros(path: Path, n: int, rng: random.Random):
+    rows = ([f"怪物{i}", 1082130000 + i, f"怪物{i}", f"第{i}号怪物，{rng.choice(('擅长打群架', '会喷火', '很结实'))}。"]
+            for i in range(n))
+    _write(path, INTRO_HEADER, rows)
+
+
+def gen_props(path: Path, n: int, rng: random.Random):
+    rows = ([i + 1, 1077936000 + i, f"道具{i}", _effect(rng, i), rng.choice((1, 1, 1, 2))] for i in range(n))
+    _write(path, PROP_HEADER, rows)
+
+
+def synth_inputs(work: Path, n: int, seed: int = 0):
+    """在 work 下按清单里的相对路径写出全部合成输入，每张 n 行。"""
+    rng = random.Random(seed)
+    gen_sets(work / "圣遗物套装.csv", n, rng)
+    # 圣遗物.csv 只引用前 n/10 个套装，和真实数据一样多件共用一个套装
+    gen_items(work / "圣遗物.csv", n, rng, max(1, n // 10))
+    gen_upgrades(work / UPGRADES_CSV, n, rng)
+    gen_monsters(work / "超级斗鸡/怪物数据.csv", n, rng)
+    gen_intros(work / "超级斗鸡/怪物介绍.csv", n, rng)
+    gen_props(work / "超级斗鸡/道具.csv", n, rng)
+
+
+def bench_cases(manifest: str, only=None):
+    """每个生成脚本取清单里的第一张表作为基准用例。"""
+    cases, seen = [], set()
+    for t in build.load_manifest(manifest):
+        if t["script"] in seen or (only and t["script"] not in only and t["name"] not in only):
+            continue
+        seen.add(t["script"])
+        cases.append(t)
+    return cases
+
+
+def _child(payload: str):
+    """子进程：在本进程内运行一个生成脚本，输出 {ok, wall_s, peak_rss_kb, log}。"""
+    spec = json.loads(payload)
+    ok, log, secs = build.run_script(spec["script"], spec["argv"])
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            rss //= 1024  # macOS 以字节计
+    except ImportError:
+        rss = None
+    print(json.dumps({"ok": ok, "wall_s": secs, "peak_rss_kb": rss, "log": log[-2000:]}, ensure_ascii=False))
+
+
+def run_case(t, work: Path, rows: int) -> dict:
+    argv = []
+    for flag, p in t["inputs"]:
+        # 各职业的强化表结构相同，共用一份合成数据
+        src = work / (UPGRADES_CSV if p.endswith(UPGRADES_CSV) else p)
+        argv += [flag, str(src)]
+    for flag, p in t["outputs"]:
+        argv += [flag, str(work / "out" / Path(p).name)]
+    for flag, v in t["args"]:
+        argv += [flag, v]
+    payload = json.dumps({"script": str(ROOT / t["script"]), "argv": argv}, ensure_ascii=False)
+    proc = subprocess.run([sys.executable, str(Path(__file__).resolve()), "--run-one", payload],
+                          capture_output=True, text=True, encoding="utf-8", cwd=ROOT)
+    if proc.returncode != 0:
+        raise SystemExit(f"{t['script']}: 基准子进程失败\n{proc.stderr}")
+    res = json.loads(proc.stdout.strip().splitlines()[-1])
+    if not res["ok"]:
+        raise SystemExit(f"{t['script']}: 生成失败\n{res['log']}")
+    return {
+        "rows": rows,
+        "wall_s": round(res["wall_s"], 4),
+        "rows_per_s": round(rows / res["wall_s"]) if res["wall_s"] > 0 else None,
+        "peak_rss_kb": res["peak_rss_kb"],
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """[(用例, 指标, 基线, 本次)]：耗时或峰值 RSS 超过基线 (1 + tolerance) 倍的项。"""
+    flagged = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if cur["wall_s"] > base["wall_s"] * (1 + tolerance) and cur["wall_s"] - base["wall_s"] > NOISE_SECONDS:
+            flagged.append((key, "wall_s", base["wall_s"], cur["wall_s"]))
+        if (cur.get("peak_rss_kb") and base.get("peak_rss_kb") and cur["peak_rss_kb"] > base["peak_rss_kb"] * (1 + tolerance)
+                and cur["peak_rss_kb"] - base["peak_rss_kb"] > NOISE_RSS_KB):
+            flagged.append((key, "peak_rss_kb", base["peak_rss_kb"], cur["peak_rss_kb"]))
+    return flagged
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--run-one":
+        return _child(sys.argv[2])
+
+    ap = argparse.ArgumentParser(description="合成数据规模基准：行/秒、耗时、峰值 RSS，与基线比较。")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help=f"逗号分隔的行数（默认 {DEFAULT_SIZES}）")
+    ap.add_argument("--cases", default="", help="只跑这些脚本或表名（逗号分隔，默认清单里的每个脚本）")
+    ap.add_argument("--manifest", default=build.DEFAULT_MANIFEST, help=f"清单路径（默认 {build.DEFAULT_MANIFEST}）")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"基线 JSON（默认 {DEFAULT_BASELINE}）")
+    ap.add_argument("--save", action="store_true", help="把本次结果写入基线（与已有基线合并）")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help=f"允许的退化比例（默认 {DEFAULT_TOLERANCE}）")
+    ap.add_argument("--seed", type=int, default=0, help="合成数据种子（默认 0）")
+    ap.add_argument("--work-dir", default="", help="合成数据目录（默认临时目录，结束后删除）")
+    args = ap.parse_args()
+
+    os.chdir(ROOT)
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    cases = bench_cases(args.manifest, {c.strip() for c in args.cases.split(",") if c.strip()})
+    if not cases:
+        raise SystemExit("没有匹配的用例。")
+
+    work_root = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix="bench_"))
+    results = {}
+    try:
+        for n in sizes:
+            work = work_root / size_label(n)
+            t0 = time.perf_counter()
+            synth_inputs(work, n, seed=args.seed)
+            print(f"# {size_label(n)} rows: synthetic inputs in {time.perf_counter() - t0:.1f}s", flush=True)
+            for t in cases:
+                res = run_case(t, work, n)
+                key = f"{t['script']}@{size_label(n)}"
+                results[key] = res
+                rss = f"{res['peak_rss_kb'] / 1024:.0f} MB" if res["peak_rss_kb"] else "n/a"
+                print(f"{key:<40} {res['wall_s']:8.3f}s {res['rows_per_s'] or 0:12,.0f} rows/s  peak {rss}", flush=True)
+            if not args.work_dir:
+                shutil.rmtree(work, ignore_errors=True)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    flagged = compare(results, baseline, args.tolerance)
+    for key, metric, old, new in flagged:
+        print(f"[regression] {key} {metric}: {old:,.3f} → {new:,.3f}")
+
+    if args.save:
+        merged = dict(baseline)
+        merged.update(results)
+        data = {"python": sys.version.split()[0], "platform": sys.platform, "results": dict(sorted(merged.items()))}
+        baseline_path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {baseline_path}")
+    elif not baseline:
+        print(f"没有基线 {baseline_path}；用 --save 记录本次结果。")
+
+    if flagged and not args.save:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
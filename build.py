@@ -0,0 +1,295 @@
+"""
+按 build_manifest.json 重建 build/ 下的全部表。
+
+清单中每张表声明：脚本、输入 CSV（参数名 → 路径）、输出（参数名 → 文件名，相对 out_dir）、
+其余参数（structId 等），以及可选的 sources（脚本额外读取的文件，如 table_specs.json，参与缓存键；
+脚本导入的仓库内模块由 script_sources 自动算入）。某表的输入若是另一张表的输出，则形成依赖；
+没有依赖关系的表在进程池中并行生成。输入/参数/脚本都没变的表直接由 build_cache 命中跳过。
+
+  python build.py                  # 全部
+  python build.py 怪物 圣遗物        # 只构建指定表（连同其依赖）
+  python build.py --jobs 1 --no-cache
+  python build.py --delta          # 另外为每个 JSON 输出写出相对上次构建的增量（见 dict_delta.py）
+  python build.py --no-cache --profile build/profile   # 每张表写一份分阶段报告（见 profiling.py）
+"""
+import argparse, ast, contextlib, io, json, os, runpy, sys, time, traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import dict_delta, table_registry
+from build_cache import DEFAULT_CACHE_DIR, BuildCache
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_MANIFEST = "build_manifest.json"
+
+
+
+def load_manifest(manifest_path: str, out_dir: str = None):
+    """
+    读取清单，返回表列表：
+      {name, script, inputs: [(flag, path)], outputs: [(flag, path)], args: [(flag, value)]}
+    路径相对仓库根目录；outputs 已拼接 out_dir。
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    out_dir = out_dir or data.get("out_dir") or "build"
+
+    tables = []
+    seen_names = set()
+    produced = {}
+    for t in data.get("tables", []):
+        name = t.get("name")
+        script = t.get("script")
+        if not name or not script:
+            raise SystemExit(f"清单条目缺少 name/script: {t}")
+        if name in seen_names:
+            raise SystemExit(f"清单中表名重复: {name}")
+        seen_names.add(name)
+
+        outputs = [(flag, Path(out_dir, p).as_posix()) for flag, p in t.get("outputs", {}).items()]
+        if not outputs:
+            raise SystemExit(f"{name}: 没有声明输出")
+        for _, p in outputs:
+            if p in produced:
+                raise SystemExit(f"{name} 与 {produced[p]} 写同一个输出: {p}")
+            produced[p] = name
+
+        tables.append({
+            "name": name,
+            "script": script,
+            "inputs": list(t.get("inputs", {}).items()),
+            "outputs": outputs,
+            "args": [(flag, str(v)) for flag, v in t.get("args", {}).items()],
+            "sources": list(t.get("sources", [])),
+        })
+    return tables
+
+
+def script_sources(script: str) -> list:
+    """
+    脚本连同它（递归）导入的仓库内模块，作为缓存键的 sources：改了哪个模块，导入它的表就重建。
+    静态扫描 import 语句（含函数里的延迟导入），在导入方所在目录和仓库根目录下找 <模块>.py；
+    标准库与第三方包不在仓库里，不计入。
+    """
+    seen = set()
+    todo = [Path(script)]
+    while todo:
+        p = todo.pop()
+        if p.as_posix() in seen:
+            continue
+        seen.add(p.as_posix())
+        try:
+            tree = ast.parse(p.read_bytes(), filename=p.as_posix())
+        except (OSError, SyntaxError):
+            continue  # 脚本读不到 / 有语法错误时运行会报错，这里只管收集
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                for d in (p.parent, Path(".")):
+                    f = Path(d, name.split(".")[0] + ".py")
+                    if f.is_file():
+                        todo.append(f)
+                        break
+    return sorted(seen)
+
+
+def resolve_deps(tables):
+    """{表名: {依赖的表名}} —— 输入路径等于另一张表的输出路径即为依赖。"""
+    producer = {p: t["name"] for t in tables for _, p in t["outputs"]}
+    deps = {}
+    for t in tables:
+        deps[t["name"]] = {producer[p] for _, p in t["inputs"] if p in producer and producer[p] != t["name"]}
+
+    # 环检测（Kahn）
+    remaining = {n: set(d) for n, d in deps.items()}
+    while remaining:
+        ready = [n for n, d in remaining.items() if not d]
+        if not ready:
+            raise SystemExit(f"清单存在循环依赖: {sorted(remaining)}")
+        for n in ready:
+            del remaining[n]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return deps
+
+
+def select_tables(tables, deps, names):
+    """只保留 names 及其传递依赖；names 为空则全部。"""
+    if not names:
+        return tables
+    known = {t["name"] for t in tables}
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise SystemExit(f"清单中没有这些表: {unknown}；可选: {sorted(known)}")
+    keep = set()
+    stack = list(names)
+    while stack:
+        n = stack.pop()
+        if n not in keep:
+            keep.add(n)
+            stack.extend(deps[n])
+    return [t for t in tables if t["name"] in keep]
+
+
+def table_argv(t, profile_dir: str = ""):
+    argv = []
+    for flag, v in t["inputs"] + t["outputs"] + t["args"]:
+        argv += [flag, v]
+    if profile_dir:
+        argv += ["--profile", Path(profile_dir, f"{t['name']}.json").as_posix()]
+    return argv
+
+
+def run_script(script: str, argv):
+    """在当前进程中以 __main__ 运行生成脚本，返回 (成功, 输出日志, 耗时秒)。进程池的工作函数。"""
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    old_argv, old_path = sys.argv, sys.path[:]  # 脚本会往 sys.path 前面插目录；常驻进程里不能越插越多
+    sys.argv = [script] + list(argv)
+    ok = True
+    try:
+        with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+            runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            ok = False
+            if not isinstance(e.code, int):
+                buf.write(f"{e.code}\n")
+    except Exception:
+        ok = False
+        buf.write(traceback.format_exc())
+    finally:
+        sys.argv = old_argv
+        sys.path[:] = old_path
+    return ok, buf.getvalue(), time.perf_counter() - t0
+
+
+def run_build(tables, deps, jobs: int = 0, cache: BuildCache = None, profile_dir: str = "") -> set:
+    """按依赖顺序构建；无依赖关系的表并行。返回失败（含被跳过）的表名集合。"""
+    by_name = {t["name"]: t for t in tables}
+    pending = {t["name"]: set(deps[t["name"]]) & set(by_name) for t in tables}
+    done, failed = set(), set()
+    keys = {}
+    imported = {}  # 脚本 -> script_sources（每次构建重新扫描，watch 常驻时改了 import 也能跟上）
+
+    def report(name, ok, log, secs):
+        for line in log.rstrip().splitlines():
+            print(f"  {line}")
+        print(f"[{'ok' if ok else 'FAIL'}] {name} ({secs:.2f}s)")
+
+    def start(name, submit):
+        t = by_name[name]
+        if cache is not None:
+            if t["script"] not in imported:
+                imported[t["script"]] = script_sources(t["script"])
+            hit, key = cache.check(
+                t["outputs"][0][1],
+                inputs=[p for _, p in t["inputs"]],
+                outputs=[p for _, p in t["outputs"]],
+                params={"script": t["script"], "args": t["args"]},
+                sources=imported[t["script"]] + t["sources"],
+            )
+            if hit:
+                print(f"[cached] {name}")
+                return None
+            keys[name] = key
+        return submit(t["script"], table_argv(t, profile_dir))
+
+    def finish(name, ok, log, secs):
+        report(name, ok, log, secs)
+        if ok:
+            t = by_name[name]
+            if cache is not None and name in keys:
+                cache.record(t["outputs"][0][1], keys[name], [p for _, p in t["outputs"]])
+            done.add(name)
+        else:
+            failed.add(name)
+
+    def next_ready():
+        ready = []
+        for name, d in list(pending.items()):
+            if d & failed:
+                del pending[name]
+                failed.add(name)
+                print(f"[skip] {name}（依赖失败: {sorted(d & failed)}）")
+            elif d <= done:
+                del pending[name]
+                ready.append(name)
+        return ready
+
+    if jobs == 1:
+        while pending:
+            for name in next_ready():
+                res = start(name, lambda script, argv: run_script(script, argv))
+                if res is None:
+                    done.add(name)
+                else:
+                    finish(name, *res)
+        return failed
+
+    # 先在主进程把输入 CSV 各解析一次；fork 出的工作进程继承注册表，不再各自解析
+    table_registry.preload(p for t in tables for _, p in t["inputs"])
+    with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+        running = {}
+        while pending or running:
+            for name in next_ready():
+                fut = start(name, lambda script, argv: pool.submit(run_script, script, argv))
+                if fut is None:
+                    done.add(name)
+                else:
+                    running[fut] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                finish(running.pop(fut), *fut.result())
+    return failed
+
+
+def write_deltas(tables, state_dir: str):
+    """对每个 .json 输出写增量文件；摘要状态按输出文件名存在 state_dir 下。"""
+    for t in tables:
+        for _, p in t["outputs"]:
+            if p.endswith(".json"):
+                s = dict_delta.write_delta(p, Path(state_dir, Path(p).name))
+                print(f"[delta] {dict_delta.format_summary(s)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="按清单并行重建全部表（CSV → JSON/TXT）。")
+    ap.add_argument("tables", nargs="*", help="只构建这些表（默认全部）")
+    ap.add_argument("--manifest", default=DEFAULT_MANIFEST, help=f"清单路径（默认 {DEFAULT_MANIFEST}）")
+    ap.add_argument("--out-dir", default="", help="覆盖清单中的 out_dir")
+    ap.add_argument("--jobs", "-j", type=int, default=0, help="并行进程数（默认 CPU 数；1 为串行）")
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"增量构建缓存目录（默认 {DEFAULT_CACHE_DIR}）")
+    ap.add_argument("--no-cache", action="store_true", help="不使用缓存，全部重新生成")
+    ap.add_argument("--profile", default="", help="每张表的分阶段剖析报告写到此目录（<表名>.json；缓存命中的表不生成）")
+    ap.add_argument("--delta", action="store_true", help="为每个 JSON 输出写出 <name>.delta.json（相对上次构建的增量）")
+    args = ap.parse_args()
+
+    os.chdir(ROOT)  # 清单中的路径都相对仓库根目录
+    tables = load_manifest(args.manifest, out_dir=args.out_dir or None)
+    deps = resolve_deps(tables)
+    tables = select_tables(tables, deps, args.tables)
+    cache = None if args.no_cache else BuildCache(args.cache_dir)
+
+    t0 = time.perf_counter()
+    failed = run_build(tables, deps, jobs=args.jobs, cache=cache, profile_dir=args.profile)
+    n_failed = len(failed)
+    if cache is not None:
+        cache.report()
+    if args.delta:
+        # 摘要状态放在缓存目录里，CI 中随缓存一起保留
+        write_deltas([t for t in tables if t["name"] not in failed], Path(args.cache_dir, "digests"))
+    print(f"{len(tables) - n_failed}/{len(tables)} tables built in {time.perf_counter() - t0:.2f}s")
+    if n_failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
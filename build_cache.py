@@ -0,0 +1,193 @@
+"""
+内容哈希增量构建缓存（所有 CSV → JSON/TXT 生成脚本共用）。
+
+缓存键 = 生成脚本源码 + 参数（structId、起始序号、颜色……）+ 每个输入 CSV 的内容哈希。
+命中时不再重新生成；输出文件内容未变时也不重写（避免编辑器重新导入）。
+
+缓存目录结构：
+  <cache_dir>/index.json        { 输出表: {"key": ..., "outputs": {路径: 哈希}} }
+  <cache_dir>/objects/<sha256>  输出文件内容（CI 中输出目录是空的，命中时从这里恢复）
+"""
+import hashlib, json, os, shutil, tempfile
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = ".build_cache"
+CACHE_FORMAT = "1"
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_digest(path) -> str:
+    """sha256 of a file's bytes, or "" when the file does not exist."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+    except FileNotFoundError:
+        return ""
+    return h.hexdigest()
+
+
+class OutputFile:
+    """
+    写到同目录的临时文件，关闭时与现有文件比较：
+    内容相同则丢弃临时文件（不改动 mtime），否则原子替换。
+    用法与 open(path, "w", encoding="utf-8") 相同；退出后 .changed 表示是否真的写入。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.changed = None
+        self._tmp = None
+        self._f = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self._f = open(fd, "w", encoding="utf-8")
+        return self._f
+
+    def __exit__(self, exc_type, exc, tb):
+        self._f.close()
+        if exc_type is not None:
+            os.unlink(self._tmp)
+            return False
+        if file_digest(self._tmp) == file_digest(self.path):
+            os.unlink(self._tmp)
+            self.changed = False
+        else:
+            os.chmod(self._tmp, 0o666 & ~_UMASK)  # mkstemp 默认 0600
+            os.replace(self._tmp, self.path)
+            self.changed = True
+        return False
+
+
+def open_output(path) -> OutputFile:
+    return OutputFile(path)
+
+
+def write_text_if_changed(path, text: str) -> bool:
+    """Path.write_text 的替代：内容未变时不重写。返回是否写入。"""
+    out = open_output(path)
+    with out as f:
+        f.write(text)
+    return out.changed
+
+
+class BuildCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.dir = Path(cache_dir)
+        self.index_path = self.dir / "index.json"
+        self.objects = self.dir / "objects"
+        self.index = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("format") == CACHE_FORMAT:
+                    self.index = data.get("tables", {})
+            except (OSError, ValueError):
+                self.index = {}  # 损坏的索引当作空缓存
+        self.stats = {}  # table -> "hit" / "restored" / "miss"
+
+    def key(self, inputs, params: dict, sources) -> str:
+        h = hashlib.sha256()
+        h.update(f"format={CACHE_FORMAT}\n".encode())
+        for src in sorted({str(Path(s).resolve()) for s in list(sources) + [__file__]}):
+            h.update(f"source {Path(src).name} {file_digest(src)}\n".encode())
+        h.update(json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        h.update(b"\n")
+        for p in inputs:
+            d = file_digest(p)
+            if not d:
+                raise SystemExit(f"输入文件不存在: {p}")
+            h.update(f"input {Path(p).name} {d}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def _restore(self, table: str, key: str, outputs) -> str:
+        """Return "hit"/"restored" if the stored outputs can be used, else ""."""
+        rec = self.index.get(table)
+        if not rec or rec.get("key") != key:
+            return ""
+        stored = rec.get("outputs", {})
+        if sorted(stored) != sorted(str(o) for o in outputs):
+            return ""
+        restored = False
+        for out, digest in stored.items():
+            if file_digest(out) == digest:
+                continue
+            blob = self.objects / digest
+            if not blob.exists():
+                return ""
+            Path(out).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(blob, out)
+            restored = True
+        return "restored" if restored else "hit"
+
+    def _store(self, table: str, key: str, outputs):
+        self.objects.mkdir(parents=True, exist_ok=True)
+        stored = {}
+        for out in outputs:
+            digest = file_digest(out)
+            if not digest:
+                raise SystemExit(f"生成脚本没有写出 {out}")
+            blob = self.objects / digest
+            if not blob.exists():
+                shutil.copyfile(out, blob)
+            stored[str(out)] = digest
+        self.index[table] = {"key": key, "outputs": stored}
+        self.save()
+
+    def save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        write_text_if_changed(
+            self.index_path,
+            json.dumps({"format": CACHE_FORMAT, "tables": self.index}, ensure_ascii=False, indent=2, sort_keys=True),
+        )
+
+    def check(self, table: str, inputs, outputs, params: dict, sources):
+        """
+        返回 (hit, key)。命中时缺失或被改动的输出已从缓存恢复；
+        未命中时由调用方生成输出后调用 record(table, key, outputs)。
+        """
+        outputs = [str(o) for o in outputs]
+        key = self.key(inputs, params, sources)
+        state = self._restore(table, key, outputs)
+        if state:
+            self.stats[table] = state
+        return bool(state), key
+
+    def record(self, table: str, key: str, outputs):
+        self._store(table, key, [str(o) for o in outputs])
+        self.stats[table] = "miss"
+
+    def run(self, table: str, inputs, outputs, params: dict, sources, build) -> bool:
+        """
+        命中则跳过 build()；否则调用 build() 并记录输出。返回是否命中。
+        outputs 为 build() 会写出的全部文件路径。
+        """
+        hit, key = self.check(table, inputs, outputs, params, sources)
+        if hit:
+            return True
+        build()
+        self.record(table, key, outputs)
+        return False
+
+    def report(self):
+        hits = sum(1 for s in self.stats.values() if s != "miss")
+        for table, state in self.stats.items():
+            print(f"[cache] {state:<8} {table}")
+        print(f"[cache] {hits} hit / {len(self.stats) - hits} miss")
+
+
+def run_cached(cache_dir, table: str, inputs, outputs, params: dict, sources, build):
+    """cache_dir 为空时直接 build()；否则经由 BuildCache 并打印命中情况。"""
+    if not cache_dir:
+        build()
+        return False
+    cache = BuildCache(cache_dir)
+    hit = cache.run(table, inputs, outputs, params, sources, build)
+    cache.report()
+    return hit
@@ -0,0 +1,340 @@
+"""
+卡牌展示抽样（平衡测试）：按 标签颜色 / 标签描述 / 价格 … 配置权重，模拟几百万次选卡展示，
+统计每张卡、每个套装的出现频率，以及集齐 2 件 / 4 件套平均要看多少次展示。
+
+  python card_sampler.py                                       # 圣遗物选择表.csv，每种 标签颜色 权重 1
+  python card_sampler.py 圣遗物.csv --weights 5=1,4=2,3=4
+  python card_sampler.py 圣遗物.csv --weights 5=1,4=2 --weights 5=1,4=4 --offers 2M   # 权重扫描
+  python card_sampler.py 超级斗鸡/道具选择.csv --by 标签描述 --weights 陷阱=2,道具=1
+
+卡池 CSV 需要 卡牌标题 列；套装、价格 等缺的列按 卡牌描述 里的 {1:lv.圣遗物.<标题>.描述} 占位符
+（没有占位符时按 卡牌标题）到 --items（默认 圣遗物.csv）里查。
+
+抽样用 Walker / Vose alias 方法：n 张卡建 n 列，每列一个浮点阈值和一个别名卡，
+一次抽样 = 一个 [0, 1) 均匀数乘 n：整数部分选列，小数部分与该列阈值比较，决定取本列的卡还是别名卡。
+抽中各卡的概率恰为 权重 / 总权重（只受浮点精度限制），卡池大小不限；权重大于 0 的卡都可能抽到。
+抽样结果存成整数数组，计数用 Counter，判重按列逐对比较，只有“追套装”的玩家状态按命中事件逐个推进。
+
+一次展示 --offer-size 张互不相同的卡；有重复的展示整组重抽（即按“各张不同”为条件的独立抽样）。
+集齐耗时按“只追这一套的玩家”计：每次展示里若有还没拿到的该套部件就拿一件（一次最多一件），
+集齐最大件数后从下一次展示重新开始，所以同一条展示流里可以得到很多个样本。
+"""
+import json, random, re
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from operator import eq
+from pathlib import Path
+
+import table_registry
+from check_refs import PLACEHOLDER_RE
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_POOL = "圣遗物选择表.csv"
+DEFAULT_ITEMS = "圣遗物.csv"
+BATCH_OFFERS = 1 << 18
+
+
+class AliasTable:
+    """
+    Walker / Vose alias 表：weights 为各卡的非负权重，n 张卡对应 n 列。
+      prob   各列的阈值（0..1）：落在本列时，小数部分低于阈值取本列的卡
+      alias  各列的别名卡：否则取它
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        if not n:
+            raise SystemExit("卡池里没有卡")
+        if total <= 0 or min(weights) < 0:
+            raise SystemExit("权重不能为负，且至少要有一张卡权重大于 0")
+        self.weights = list(weights)
+        self.total = total
+        self.n = n
+
+        # Vose：按 权重 × n / 总权重 分成不足 1 和至少 1 的两组，每次用一张“大”卡补满一列“小”卡
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        prob, alias = [1.0] * n, list(range(n))
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        # 剩下的只差浮点误差，整列归自己（阈值保持 1）
+        self.prob = prob
+        self.alias = alias
+        self._edge = [i + p for i, p in enumerate(prob)]  # x = u × n 落在第 c 列时，x < c + 阈值 即取本列
+
+    def probability(self, i: int) -> float:
+        return self.weights[i] / self.total
+
+    def sample(self, count: int, rng: random.Random) -> array:
+        """count 次独立抽样，结果为各卡下标组成的 array('I')。"""
+        n, edge, alias, rand = self.n, self._edge, self.alias, rng.random
+        xs = [rand() * n for _ in repeat(None, count)]
+        return array("I", [c if x < edge[c] else alias[c] for x, c in zip(xs, map(int, xs))])
+
+
+def draw_offers(table: AliasTable, offers: int, size: int, rng: random.Random) -> array:
+    """
+    offers 次展示、每次 size 张互不相同的卡，按展示依次排列（第 i 次为 [i*size, (i+1)*size)）。
+    有重复的展示整组重抽。
+    """
+    if sum(1 for w in table.weights if w > 0) < size:
+        raise SystemExit(f"权重大于 0 的卡不足 {size} 张，凑不出一次展示")
+    stream = table.sample(offers * size, rng)
+    cols = [stream[j::size] for j in range(size)]
+    bad = set()
+    for a in range(size):
+        for b in range(a + 1, size):
+            bad.update(m.start() for m in re.finditer(b"\x01", bytes(map(eq, cols[a], cols[b]))))
+    while bad:
+        # 有重复的展示一起重抽，仍有重复的留到下一轮
+        redraw = table.sample(len(bad) * size, rng)
+        retry = []
+        for k, i in enumerate(bad):
+            offer = redraw[k * size:(k + 1) * size]
+            if len(set(offer)) == size:
+                stream[i * size:(i + 1) * size] = offer
+            else:
+                retry.append(i)
+        bad = retry
+    return stream
+
+
+class SetTracker:
+    """一个套装的统计：出现在多少次展示里，以及“只追这一套的玩家”集齐 needs 件各用了几次展示。"""
+
+    def __init__(self, name: str, cards, needs):
+        self.name = name
+        self.cards = list(cards)
+        self.needs = sorted(n for n in needs if n <= len(self.cards))
+        self.impossible = sorted(n for n in needs if n > len(self.cards))
+        self.times = {n: [] for n in self.needs}
+        self.piece = {card: k for k, card in enumerate(self.cards)}
+        self.present = 0
+        # 玩家状态跨批次保留
+        self.owned = 0
+        self.have = 0
+        self.start = 0
+        self.taken_at = -1
+
+    def feed(self, offers, positions, size: int, base: int):
+        """
+        offers 为 draw_offers 的结果，positions 为其中本套部件的位置（递增）；
+        base 为这一批第一次展示的全局序号。
+        """
+        if not self.needs:
+            self.present += len({pos // size for pos in positions})
+            return
+        top = self.needs[-1]
+        needs, times = set(self.needs), self.times
+        piece_of = self.piece
+        owned, have, start, taken_at = self.owned, self.have, self.start, self.taken_at
+        seen = -1
+        present = 0
+        for pos in positions:
+            i = base + pos // size
+            if i != seen:
+                seen = i
+                present += 1
+            if i == taken_at:
+                continue  # 这次展示已经拿过一件
+            bit = 1 << piece_of[offers[pos]]
+            if owned & bit:
+                continue
+            owned |= bit
+            have += 1
+            taken_at = i
+            if have in needs:
+                times[have].append(i - start + 1)
+                if have == top:
+                    owned, have, start = 0, 0, i + 1
+        self.present += present
+        self.owned, self.have, self.start, self.taken_at = owned, have, start, taken_at
+
+
+def _quantile(sorted_values, q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# ---------------- 卡池与权重 ----------------
+
+def load_pool(pool_csv: str, items_csv: str = ""):
+    """
+    读卡池，返回 [{列名: 值}]；卡池缺的列从 items 表补（按占位符里的键或 卡牌标题 对应）。
+    """
+    t = table_registry.load(pool_csv)
+    t.require(["卡牌标题"])
+    items = {}
+    if items_csv and Path(items_csv).exists():
+        it = table_registry.load(items_csv)
+        if "卡牌标题" in it:
+            for row in it.records():
+                items.setdefault((row.get("卡牌标题") or "").strip(), row)
+    cards = []
+    for row in t.records():
+        title = (row.get("卡牌标题") or "").strip()
+        if not title:
+            continue
+        m = PLACEHOLDER_RE.search(row.get("卡牌描述") or "")
+        item = items.get(m.group(2).strip() if m else title) or items.get(title) or {}
+        card = {k: (v or "").strip() for k, v in item.items()}
+        card.update({k: (v or "").strip() for k, v in row.items() if (v or "").strip() or k not in card})
+        card["卡牌标题"] = title
+        cards.append(card)
+    if not cards:
+        raise SystemExit(f"{pool_csv} 里没有卡牌")
+    return cards
+
+
+def parse_weights(spec: str) -> dict:
+    """"5=1,4=2,3=4" → {"5": 1.0, "4": 2.0, "3": 4.0}"""
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        key, sep, w = part.partition("=")
+        try:
+            out[key.strip()] = float(w)
+        except ValueError:
+            sep = ""
+        if not sep:
+            raise SystemExit(f"权重格式应为 值=权重，用逗号分隔: {part!r}")
+    return out
+
+
+def card_weights(cards, by: str, weights: dict, default: float):
+    if by not in cards[0]:
+        raise SystemExit(f"卡池里没有 {by} 列；可用：{'、'.join(cards[0])}")
+    return [weights.get(c.get(by, ""), default) for c in cards]
+
+
+def run(cards, weights, offers: int, size: int, needs, by_set: str, rng: random.Random) -> dict:
+    table = AliasTable(weights)
+    sets = {}
+    for i, c in enumerate(cards):
+        if c.get(by_set):
+            sets.setdefault(c[by_set], []).append(i)
+    trackers = [SetTracker(name, members, needs) for name, members in sets.items()]
+    tag = [0] * len(cards)  # 卡 → 所属套装的 trackers 下标 + 1（0 = 不属于任何套装）
+    for k, tr in enumerate(trackers, 1):
+        for card in tr.cards:
+            tag[card] = k
+    counts = Counter()
+
+    done = 0
+    while done < offers:
+        batch = min(BATCH_OFFERS, offers - done)
+        drawn = draw_offers(table, batch, size, rng)
+        counts.update(drawn)
+        # 一次遍历给每个位置标上套装，再把命中位置按套装稳定排序（同一套装内仍按位置递增）分给各套装
+        tags = list(map(tag.__getitem__, drawn))
+        hits = list(compress(range(len(tags)), tags))
+        hits.sort(key=tags.__getitem__)
+        per_set = Counter(map(tags.__getitem__, hits))
+        lo = 0
+        for k, tr in enumerate(trackers, 1):
+            hi = lo + per_set[k]
+            tr.feed(drawn, hits[lo:hi], size, done)
+            lo = hi
+        done += batch
+
+    result = {
+        "offers": offers,
+        "offer_size": size,
+        "cards": [{
+            "卡牌标题": c["卡牌标题"],
+            "weight": w,
+            "probability": table.probability(i),
+            "appear_rate": counts[i] / offers,
+        } for i, (c, w) in enumerate(zip(cards, weights))],
+        "sets": [],
+    }
+    for tr in trackers:
+        entry = {"套装": tr.name, "pieces": len(tr.cards), "appear_rate": tr.present / offers, "complete": {}}
+        for n in tr.needs:
+            ts = sorted(tr.times[n])
+            entry["complete"][str(n)] = {
+                "samples": len(ts),
+                "mean": sum(ts) / len(ts) if ts else None,
+                "p50": _quantile(ts, 0.5),
+                "p90": _quantile(ts, 0.9),
+            }
+        for n in tr.impossible:
+            entry["complete"][str(n)] = None
+        result["sets"].append(entry)
+    return result
+
+
+def _fmt(v, spec=".1f"):
+    return "—" if v is None else format(v, spec)
+
+
+def report(result: dict, label: str, needs) -> str:
+    lines = [f"== {label}：{result['offers']} 次展示，每次 {result['offer_size']} 张"]
+    lines.append(f"{'卡牌':<12}\t权重\t抽中概率\t每次展示出现率")
+    for c in sorted(result["cards"], key=lambda c: -c["appear_rate"]):
+        lines.append(f"{c['卡牌标题']:<12}\t{c['weight']:g}\t{c['probability']:.4%}\t{c['appear_rate']:.4%}")
+    if result["sets"]:
+        head = "\t".join(f"{n}件 平均/p50/p90" for n in needs)
+        lines.append(f"{'套装':<10}\t部件\t出现率\t{head}（展示次数）")
+        for s in sorted(result["sets"], key=lambda s: -s["appear_rate"]):
+            cells = []
+            for n in needs:
+                c = s["complete"].get(str(n))
+                cells.append("—" if c is None or not c["samples"]
+                             else f"{_fmt(c['mean'])}/{c['p50']}/{c['p90']}")
+            lines.append(f"{s['套装']:<10}\t{s['pieces']}\t{s['appear_rate']:.2%}\t" + "\t".join(cells))
+    return "\n".join(lines)
+
+
+def parse_count(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s.rstrip("km")) * mult)
+
+
+def main():
+    import argparse, time
+    ap = argparse.ArgumentParser(description="按权重抽样模拟选卡展示，统计各卡 / 各套装的出现频率与集齐耗时。")
+    ap.add_argument("pool", nargs="?", default=str(ROOT / DEFAULT_POOL), help="卡池 CSV（默认 圣遗物选择表.csv）")
+    ap.add_argument("--items", default=str(ROOT / DEFAULT_ITEMS), help="补 套装 / 价格 等列的物品表（默认 圣遗物.csv）")
+    ap.add_argument("--by", default="标签颜色", help="按哪一列配置权重（默认 标签颜色；也可 标签描述 / 价格 / 套装 / 卡牌标题）")
+    ap.add_argument("--weights", action="append", default=[],
+                    help="值=权重，逗号分隔，如 5=1,4=2,3=4；可重复给出多组做权重扫描")
+    ap.add_argument("--default-weight", type=float, default=1.0, help="--weights 里没写到的值的权重（默认 1）")
+    ap.add_argument("--offers", default="1M", help="每组权重模拟的展示次数（默认 1M，可写 500k / 2M）")
+    ap.add_argument("--offer-size", type=int, default=3, help="每次展示几张卡（默认 3）")
+    ap.add_argument("--needs", default="2,4", help="统计集齐几件的耗时（默认 2,4）")
+    ap.add_argument("--set-column", default="套装", help="套装列名（默认 套装）")
+    ap.add_argument("--seed", type=int, default=0, help="随机种子（默认 0，结果可复现）")
+    ap.add_argument("--json", default="", help="把全部结果写成 JSON")
+    args = ap.parse_args()
+
+    cards = load_pool(args.pool, args.items)
+    needs = sorted({int(n) for n in args.needs.split(",") if n.strip()})
+    offers = parse_count(args.offers)
+    if offers <= 0 or args.offer_size <= 0:
+        raise SystemExit("--offers 与 --offer-size 必须为正数")
+    results = []
+    for spec in args.weights or [""]:
+        weights = card_weights(cards, args.by, parse_weights(spec), args.default_weight)
+        t0 = time.perf_counter()
+        result = run(cards, weights, offers, args.offer_size, needs, args.set_column, random.Random(args.seed))
+        result["by"], result["weights"] = args.by, spec
+        results.append(result)
+        label = f"{args.by} {spec or f'全部 {args.default_weight:g}'}"
+        print(report(result, label, needs))
+        print(f"（用时 {time.perf_counter() - t0:.2f}s）\n")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+跨表引用检查：每张表只读一次并对名字 / ID 建哈希索引，再线性扫描一遍所有引用，
+列出每个悬空引用所在的文件和行号。
+
+  圣遗物.csv 的 套装                 → 圣遗物套装.csv 的 名字
+  怪物介绍.csv 的 元件ID              → 怪物数据.csv 的 元件ID
+  {1:lv.<表>.<键>.<字段>} 占位符       → <表> 的键（圣遗物 按 卡牌标题，道具表 按 道具.json 的 Dict 键）
+
+  python check_refs.py            # 有悬空引用时退出码为 1
+"""
+import json, re, sys
+from pathlib import Path
+
+import table_registry
+
+ROOT = Path(__file__).resolve().parent
+
+# 索引名 -> (文件, 键列)；.json 文件取 Dict 各项的 key
+INDEXES = {
+    "圣遗物套装": ("圣遗物套装.csv", "名字"),
+    "圣遗物": ("圣遗物.csv", "卡牌标题"),
+    "怪物数据": ("超级斗鸡/怪物数据.csv", "元件ID"),
+    "道具表": ("超级斗鸡/道具.json", None),
+}
+
+# (文件, 列, 索引名)：列中非空的值必须出现在索引里
+COLUMN_REFS = [
+    ("圣遗物.csv", "套装", "圣遗物套装"),
+    ("超级斗鸡/怪物介绍.csv", "元件ID", "怪物数据"),
+]
+
+# (文件, 列)：列中的 {n:lv.<索引名>.<键>.<字段>} 占位符
+PLACEHOLDER_COLUMNS = [
+    ("圣遗物选择表.csv", "卡牌描述"),
+    ("超级斗鸡/道具选择.csv", "卡牌描述"),
+]
+
+PLACEHOLDER_RE = re.compile(r"\{\d+:lv\.([^.{}]+)\.([^{}]+)\.([^.{}]+)\}")
+
+
+class Tables:
+    """CSV 走 table_registry（每个文件只解析一次）；索引按名字缓存，JSON 为 {键: 行号}。"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._indexes = {}
+
+    def csv(self, rel: str) -> table_registry.Table:
+        return table_registry.load(self.root / rel)
+
+    def column(self, rel: str, col: str):
+        """[(行号, 去空白后的值)]；缺列时报错退出。"""
+        t = self.csv(rel)
+        if col not in t:
+            raise SystemExit(f"{rel}: 缺少列 {col}；实际列：{list(t.header)}")
+        return [(line, v.strip()) for line, v in zip(t.lines, t.column(col))]
+
+    def index(self, name: str) -> dict:
+        """{键: 首次出现的行号}"""
+        if name not in self._indexes:
+            rel, col = INDEXES[name]
+            if rel.endswith(".json"):
+                self._indexes[name] = _json_dict_keys(self.root / rel)
+            else:
+                idx = {}
+                for line, v in self.column(rel, col):
+                    if v:
+                        idx.setdefault(v, line)
+                self._indexes[name] = idx
+        return self._indexes[name]
+
+
+def _json_dict_keys(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {str(e["key"]["value"]): 0 for e in data.get("value", [])}
+
+
+def check(root: Path = ROOT):
+    """返回悬空引用列表 [(文件, 行号, 说明)]，按文件、行号排序。"""
+    tables = Tables(root)
+    problems = []
+
+    for rel, col, target in COLUMN_REFS:
+        idx = tables.index(target)
+        src, key_col = INDEXES[target]
+        for line, v in tables.column(rel, col):
+            if v and v not in idx:
+                problems.append((rel, line, f"{col}={v!r} 在 {src} 的 {key_col} 中不存在"))
+
+    for rel, col in PLACEHOLDER_COLUMNS:
+        for line, v in tables.column(rel, col):
+            for m in PLACEHOLDER_RE.finditer(v):
+                target, key, _field = m.groups()
+                if target not in INDEXES:
+                    problems.append((rel, line, f"{m.group(0)} 引用了未知的表 {target!r}"))
+                elif key not in tables.index(target):
+                    src, key_col = INDEXES[target]
+                    where = f"{src} 的 {key_col}" if key_col else f"{src} 的键"
+                    problems.append((rel, line, f"{m.group(0)}：{key!r} 在 {where} 中不存在"))
+
+    problems.sort(key=lambda p: (p[0], p[1]))
+    return problems
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="检查各表之间的引用（套装名、元件ID、lv.表.键 占位符）。")
+    ap.add_argument("--root", default=str(ROOT), help="表格所在的仓库根目录（默认脚本所在目录）")
+    args = ap.parse_args()
+
+    problems = check(Path(args.root))
+    for rel, line, msg in problems:
+        print(f"{rel}:{line}: {msg}")
+    print(f"{len(problems)} 个悬空引用" if problems else "引用检查通过")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
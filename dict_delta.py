@@ -0,0 +1,105 @@
+"""
+增量导出：与上次构建比较，只输出新增 / 改动的 entry，并列出删除的键。
+
+每个 Dict 键（怪物名、套装 ConfigReference、强化名……）记一个 entry 内容摘要，存在状态文件里：
+  <state>              {"source": 输出 JSON, "digests": {键: 摘要}}
+每次比较后写出：
+  <name>.delta.json          与原表同结构的 Dict JSON，只含新增 + 改动的 entry（可直接导入编辑器）
+  <name>.delta_summary.json  {"added": [键], "changed": [键], "removed": [键], "unchanged": 数量}
+然后把状态更新为本次构建。没有状态文件时，所有 entry 都算新增。
+
+  python dict_delta.py --json build/怪物.json --state .build_cache/digests/怪物.json
+"""
+import hashlib, json
+from pathlib import Path
+
+from build_cache import open_output, write_text_if_changed
+from dict_json import DictJsonReader, DictJsonWriter
+
+
+def entry_digest(entry) -> str:
+    text = json.dumps(entry["value"], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def delta_paths(json_path):
+    p = Path(json_path)
+    return p.with_name(p.stem + ".delta.json"), p.with_name(p.stem + ".delta_summary.json")
+
+
+def load_state(state_path) -> dict:
+    """{键: 摘要}；状态文件不存在时为空。"""
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("digests", {})
+    except FileNotFoundError:
+        return {}
+
+
+def write_delta(json_path, state_path, delta_path=None, summary_path=None, indent: int = 2) -> dict:
+    """流式读取 json_path，写出增量文件和摘要，更新状态；返回摘要 dict。"""
+    default_delta, default_summary = delta_paths(json_path)
+    delta_path = delta_path or default_delta
+    summary_path = summary_path or default_summary
+    old = load_state(state_path)
+    new = {}
+    added, changed = [], []
+
+    out = open_output(delta_path)
+    with open(json_path, "r", encoding="utf-8") as f, out as w:
+        reader = DictJsonReader(f)
+        entries = iter(reader)
+        first = next(entries, None)  # 读到第一个 entry 时 key_type / value_type 已在 header 里
+        h = reader.header
+        if h.get("type", "Dict") != "Dict":
+            raise SystemExit(f"{json_path}: 顶层 type 不是 Dict: {h.get('type')!r}")
+        with DictJsonWriter(w, h.get("key_type", "String"), "", h.get("value_type", "Struct"), indent=indent) as writer:
+            for entry in _chain(first, entries):
+                key = str(entry["key"]["value"])
+                if key in new:
+                    raise SystemExit(f"{json_path}: Dict 键重复: {key!r}")
+                d = new[key] = entry_digest(entry)
+                if key not in old:
+                    added.append(key)
+                elif old[key] != d:
+                    changed.append(key)
+                else:
+                    continue
+                writer.write(entry)
+            writer.value_struct_id = reader.header.get("value_structId", "")
+
+    summary = {
+        "source": Path(json_path).as_posix(),
+        "added": added,
+        "changed": changed,
+        "removed": [k for k in old if k not in new],
+        "unchanged": len(new) - len(added) - len(changed),
+    }
+    write_text_if_changed(summary_path, json.dumps(summary, ensure_ascii=False, indent=2))
+    Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+    write_text_if_changed(state_path, json.dumps({"source": summary["source"], "digests": new},
+                                                 ensure_ascii=False, indent=0))
+    return summary
+
+
+def _chain(first, rest):
+    if first is not None:
+        yield first
+        yield from rest
+
+
+def format_summary(s: dict) -> str:
+    return (f"{s['source']}: +{len(s['added'])} ~{len(s['changed'])} -{len(s['removed'])} "
+            f"={s['unchanged']}")
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="与上次构建比较，写出只含改动 entry 的增量 Dict JSON。")
+    ap.add_argument("--json", required=True, help="本次生成的 Dict JSON")
+    ap.add_argument("--state", required=True, help="上次构建的摘要状态文件（不存在则视为全部新增）")
+    ap.add_argument("--out", default="", help="增量 JSON 路径（默认 <name>.delta.json）")
+    ap.add_argument("--summary", default="", help="摘要路径（默认 <name>.delta_summary.json）")
+    args = ap.parse_args()
+    s = write_delta(args.json, args.state, args.out or None, args.summary or None)
+    print(format_summary(s))
@@ -0,0 +1,189 @@
+"""
+编辑器 Dict JSON 的结构化比较：按 Dict 键对齐两份导出，Struct 字段按位置和 param_type 比较，
+只打印语义上的改动，而不是缩进 JSON 的逐行 diff：
+
+  ~ 丘丘人.field[1] Int32 48→52
+  ~ 强化名.field[1][0].field[1] String "…旧…"→"…新…"
+  + 新怪物
+  - 被删的怪物
+
+  python dict_diff.py build/怪物.json /tmp/怪物.json
+  python dict_diff.py 超级斗鸡/道具.json --rev HEAD          # 与 git 里的版本比较
+  python dict_diff.py a.json b.json --full                  # 长文本不截断
+
+两份文件都用 DictJsonReader 流式读取并同步推进：键顺序一致时逐对比较、比完即丢，
+只有顺序错开的 entry 暂存在按键索引的表里，所以整体是线性时间，内存只与错位的 entry 数有关。
+有差异时退出码为 1（同 diff）。
+"""
+import json, subprocess, sys
+
+from dict_json import DictJsonReader
+
+DEFAULT_WIDTH = 60
+
+
+def _fmt(v, width: int, quote: bool = True) -> str:
+    """显示用：文本带引号（Int32 等数值在 JSON 里也是字符串，不加引号），过长的从中间截断。"""
+    s = json.dumps(v, ensure_ascii=False) if quote and isinstance(v, str) else str(v)
+    if width and len(s) > width:
+        half = (width - 1) // 2
+        s = s[:half] + "…" + s[-half:]
+    return s
+
+
+def diff_node(a, b, path: str, width: int = DEFAULT_WIDTH):
+    """逐层比较两个节点，产出 "路径 说明" 行。"""
+    ta, tb = a.get("param_type"), b.get("param_type")
+    if ta != tb:
+        yield f"{path} {ta}→{tb} {_show(a, width)}→{_show(b, width)}"
+        return
+    va, vb = a.get("value"), b.get("value")
+    if ta == "Struct":
+        if va.get("structId") != vb.get("structId"):
+            yield f"{path} structId {va.get('structId')}→{vb.get('structId')}"
+        fa, fb = va.get("value", []), vb.get("value", [])
+        for i, (x, y) in enumerate(zip(fa, fb)):
+            if x != y:
+                yield from diff_node(x, y, f"{path}.field[{i}]", width)
+        for i in range(len(fb), len(fa)):
+            yield f"{path}.field[{i}] 删除 {fa[i].get('param_type')} {_show(fa[i], width)}"
+        for i in range(len(fa), len(fb)):
+            yield f"{path}.field[{i}] 新增 {fb[i].get('param_type')} {_show(fb[i], width)}"
+    elif ta == "StructList":
+        if va.get("structId") != vb.get("structId"):
+            yield f"{path} structId {va.get('structId')}→{vb.get('structId')}"
+        ia, ib = va.get("value", []), vb.get("value", [])
+        for j, (x, y) in enumerate(zip(ia, ib)):
+            if x != y:
+                yield from diff_node(x, y, f"{path}[{j}]", width)
+        if len(ia) != len(ib):
+            yield f"{path} 长度 {len(ia)}→{len(ib)}"
+    elif va != vb:
+        q = ta == "String"
+        yield f"{path} {ta} {_fmt(va, width, q)}→{_fmt(vb, width, q)}"
+
+
+def _show(node, width: int) -> str:
+    """整个节点的简短显示：Struct / StructList 只给类型和 structId。"""
+    v = node.get("value")
+    if isinstance(v, dict):
+        return f"{node.get('param_type')}<{v.get('structId', '')}>"
+    return _fmt(v, width, node.get("param_type") == "String")
+
+
+def _key(entry) -> str:
+    return str(entry["key"]["value"])
+
+
+def diff_entries(old, new, width: int = DEFAULT_WIDTH):
+    """
+    old / new 为 entry 迭代器。产出 (标记, 键, [说明行])：标记为 "~" / "+" / "-"。
+    两边同步推进；键对不上时各自暂存，等另一边出现同一个键再比较。
+    """
+    pend_old, pend_new = {}, {}
+    order = []  # 新增 / 删除按出现顺序报告
+
+    def compare(key, a, b):
+        if a == b:
+            return None
+        if a["key"].get("param_type") != b["key"].get("param_type"):
+            lines = [f"{key} 键类型 {a['key'].get('param_type')}→{b['key'].get('param_type')}"]
+        else:
+            lines = []
+        lines += diff_node(a["value"], b["value"], key, width)
+        return "~", key, lines
+
+    old, new = iter(old), iter(new)
+    done_old = done_new = False
+    while not (done_old and done_new):
+        a = None if done_old else next(old, None)
+        b = None if done_new else next(new, None)
+        done_old, done_new = a is None, b is None
+        ka = _key(a) if a is not None else None
+        kb = _key(b) if b is not None else None
+        if ka is not None and ka == kb:
+            r = compare(ka, a, b)
+            if r:
+                yield r
+            continue
+        if ka is not None:
+            if ka in pend_new:
+                r = compare(ka, a, pend_new.pop(ka))
+                if r:
+                    yield r
+            else:
+                if ka in pend_old:
+                    raise SystemExit(f"旧文件里 Dict 键重复: {ka!r}")
+                pend_old[ka] = a
+                order.append(ka)
+        if kb is not None:
+            if kb in pend_old:
+                r = compare(kb, pend_old.pop(kb), b)
+                if r:
+                    yield r
+            else:
+                if kb in pend_new:
+                    raise SystemExit(f"新文件里 Dict 键重复: {kb!r}")
+                pend_new[kb] = b
+                order.append(kb)
+    for key in order:
+        if key in pend_old:
+            yield "-", key, []
+        elif key in pend_new:
+            yield "+", key, []
+
+
+def _open_side(path: str, rev: str = ""):
+    """文件对象；rev 非空时读 git 里该版本的文件（流式读取 git show 的输出）。"""
+    if not rev:
+        return open(path, "r", encoding="utf-8"), None
+    spec = f"{rev}:./{path}"
+    if subprocess.run(["git", "cat-file", "-e", spec], capture_output=True).returncode != 0:
+        raise SystemExit(f"git 里没有 {spec}（build/ 下的构建输出不入库，可先另存旧版本再比较两个文件）")
+    proc = subprocess.Popen(["git", "show", spec], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            encoding="utf-8")
+    return proc.stdout, proc
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="按 Dict 键比较两份编辑器 Dict JSON，只打印字段级的改动。")
+    ap.add_argument("old", help="旧文件（给了 --rev 时为要比较的文件，旧版本取自 git）")
+    ap.add_argument("new", nargs="?", default="", help="新文件（给了 --rev 时省略，取工作区里的 old）")
+    ap.add_argument("--rev", default="", help="与 git 的这个版本比较，如 HEAD / HEAD~3 / main")
+    ap.add_argument("--full", action="store_true", help="长文本不截断")
+    ap.add_argument("--width", type=int, default=DEFAULT_WIDTH, help=f"值的最大显示宽度（默认 {DEFAULT_WIDTH}）")
+    ap.add_argument("--quiet", "-q", action="store_true", help="不打印改动，只给统计和退出码")
+    args = ap.parse_args()
+    if bool(args.rev) == bool(args.new):
+        raise SystemExit("需要两个文件，或一个文件加 --rev")
+
+    old_f, proc = _open_side(args.old, args.rev)
+    new_f, _ = _open_side(args.new or args.old)
+    width = 0 if args.full else args.width
+    counts = {"~": 0, "+": 0, "-": 0}
+    with old_f, new_f:
+        ro, rn = DictJsonReader(old_f), DictJsonReader(new_f)
+        for mark, key, lines in diff_entries(ro, rn, width):
+            counts[mark] += 1
+            if args.quiet:
+                continue
+            if lines:
+                for line in lines:
+                    print(f"{mark} {line}")
+            else:
+                print(f"{mark} {key}")
+        for k in sorted(set(ro.header) | set(rn.header)):
+            if ro.header.get(k) != rn.header.get(k):
+                counts["~"] += 1
+                if not args.quiet:
+                    print(f"~ <{k}> {ro.header.get(k)}→{rn.header.get(k)}")
+    if proc is not None and proc.wait() != 0:
+        raise SystemExit(f"git show {args.rev}:{args.old} 失败：{proc.stderr.read().strip()}")
+    print(f"{counts['~']} 处改动，{counts['+']} 个新增，{counts['-']} 个删除", file=sys.stderr)
+    if any(counts.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+编辑器 Dict JSON 的流式写出器 / 读取器。
+
+  {"type": "Dict", "key_type": ..., "value_type": "Struct", "value": [...], "value_structId": ...}
+
+逐条编码 entry 并直接写入文件，不在内存中保留整个 value 列表；
+输出字节与 json.dump(obj, f, ensure_ascii=False, indent=N) 完全一致。
+entry 可以是 editor_types.Entry（走专用编码器）或等价的 dict。
+"""
+import json
+import re
+
+from editor_types import Encoder, Entry
+
+
+class DictJsonWriter:
+    """
+    用法：
+        with open_output(path) as f, DictJsonWriter(f, "Int32", struct_id) as w:
+            for row in rows:
+                w.write(make_entry(...))
+    """
+
+    def __init__(self, f, key_type: str, value_struct_id: str, value_type: str = "Struct", indent: int = 2):
+        self.f = f
+        self.key_type = key_type
+        self.value_type = value_type
+        self.value_struct_id = value_struct_id
+        self.indent = indent
+        self.count = 0
+        self._pad1 = " " * indent
+        self._pad2 = " " * (indent * 2)
+        self._encoder = json.JSONEncoder(ensure_ascii=False, indent=indent)
+        self._fast = Encoder(indent)
+
+    def _dumps(self, v) -> str:
+        return self._encoder.encode(v)
+
+    def __enter__(self):
+        p = self._pad1
+        self.f.write(
+            "{\n"
+            f"{p}\"type\": \"Dict\",\n"
+            f"{p}\"key_type\": {self._dumps(self.key_type)},\n"
+            f"{p}\"value_type\": {self._dumps(self.value_type)},\n"
+            f"{p}\"value\": ["
+        )
+        return self
+
+    def encode(self, entry) -> str:
+        """entry 在 value 数组中的文本（不含首行缩进）。"""
+        if isinstance(entry, Entry):
+            return self._fast.node(entry, 2)
+        # 嵌套层级 2：除首行外每行再缩进两级（JSON 字符串内不会有真实换行）
+        return self._encoder.encode(entry).replace("\n", "\n" + self._pad2)
+
+    def write(self, entry):
+        self.write_text(self.encode(entry))
+
+    def use_emitter(self, emit):
+        """
+        登记逐行生成 entry 文本的函数（table_spec 编译出的 emitter），原样返回，其结果交给 write_text。
+        profiling 在这里给 emitter 套上 json_encode 计时；不剖析时没有额外开销。
+        """
+        return emit
+
+    def write_text(self, text: str):
+        """写入已编码好的 entry 文本（encode() 的结果，或 table_spec 生成的 emitter 输出）。"""
+        self.f.write(("\n" if self.count == 0 else ",\n") + self._pad2 + text)
+        self.count += 1
+
+    def write_all(self, entries):
+        for e in entries:
+            self.write(e)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        p = self._pad1
+        closing = "]" if self.count == 0 else f"\n{p}]"
+        self.f.write(f"{closing},\n{p}\"value_structId\": {self._dumps(self.value_struct_id)}\n}}")
+        return False
+
+
+class DictJsonReader:
+    """
+    流式读取编辑器 Dict JSON：逐个产出 "value" 数组中的 entry（普通 dict），
+    不做整文件 json.load；内存只保留一个读块加一个 entry。
+    顶层的其它字段（type / key_type / value_type / value_structId）放在 .header 里，
+    "value_structId" 写在 "value" 之后，所以要等遍历结束才齐全。
+
+        with open(path, encoding="utf-8") as f:
+            reader = DictJsonReader(f)
+            for entry in reader:
+                ...
+    """
+
+    _WS = re.compile(r"[ \t\r\n]*")
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.header = {}
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > self.chunk_size:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _peek(self) -> str:
+        """跳过空白，返回下一个字符（文件结束时为 ""）。"""
+        while True:
+            self._pos = self._WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos:self._pos + 1]
+
+    def _expect(self, ch: str):
+        got = self._peek()
+        if got != ch:
+            raise ValueError(f"JSON 格式错误：期望 {ch!r}，得到 {got!r}（缓冲区位置 {self._pos}）")
+        self._pos += 1
+
+    def _value(self):
+        """解码一个完整的 JSON 值；读到块尾时补读后重试。"""
+        self._peek()
+        while True:
+            try:
+                v, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 数字等可能正好被块尾截断：还没到文件尾就再读一块确认
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return v
+
+    def __iter__(self):
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "value" and self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        sep = self._peek()
+                        self._pos += 1
+                        if sep == "]":
+                            break
+                        if sep != ",":
+                            raise ValueError(f"JSON 格式错误：value 数组中出现 {sep!r}")
+            else:
+                self.header[key] = self._value()
+            sep = self._peek()
+            self._pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"JSON 格式错误：顶层对象中出现 {sep!r}")
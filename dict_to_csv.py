@@ -0,0 +1,129 @@
+"""
+反向导入：编辑器 Dict/Struct JSON → CSV（流式，不做整文件 json.load）。
+
+按 structId（以及字段类型签名，structId 相同的不同表靠它区分）选择列映射：
+  columns —— CSV 各列的来源："key" 为 Dict 键，整数为 Struct 字段下标，其它字符串为常量
+  tail    —— 可选，StructList 字段下标；每个子 Struct 的字段依次展开到行尾（无表头）
+映射可以用 --mapping 追加/覆盖（同样格式的 JSON：{structId: [映射, ...]}）。
+
+  python dict_to_csv.py --json 超级斗鸡/道具.json --out 道具.csv
+"""
+import csv, json
+from pathlib import Path
+
+from build_cache import open_output
+from dict_json import DictJsonReader
+
+MAPPINGS = {
+    # build_monster_json.py：怪物 → (元件ID, 单体强度, 最小生成)
+    "1077936130": [
+        {"types": ["EntityReference", "Int32", "Int32"],
+         "columns": [["怪物", "key"], ["元件ID", 0], ["单体强度", 1], ["最小生成", 2]]},
+    ],
+    # 超级斗鸡/道具.json：序号 → (元件ID, 名字, 描述, 数量)
+    "1077936131": [
+        {"types": ["EntityReference", "String", "String", "Int32"],
+         "columns": [["序号", "key"], ["元件ID", 0], ["名字", 1], ["描述", 2], ["数量", 3]]},
+    ],
+    "1077936134": [
+        # monster_intro.py：元件ID → (名字, 介绍)
+        {"types": ["String", "String"],
+         "columns": [["元件ID", "key"], ["名字", 0], ["介绍", 1]]},
+        # artifact.py：序号 → (卡牌标题, ID, 标签颜色, 价格, 描述)
+        {"types": ["String", "ConfigReference", "Int32", "Int32", "String"],
+         "columns": [["序号", "key"], ["卡牌标题", 0], ["ID", 1], ["标签颜色", 2], ["价格", 3], ["描述", 4]]},
+    ],
+    # artifact_set.py：三个 状态效果ID 列按出现顺序排列，与 圣遗物套装.csv 一致
+    "1077936135": [
+        {"types": ["String", "Int32", "ConfigReference", "Int32", "ConfigReference", "Int32", "ConfigReference", "ConfigReference"],
+         "columns": [["名字", 0], ["ID", "key"], ["套装需求1", 1], ["状态效果ID", 2], ["套装需求2", 3],
+                     ["状态效果ID", 4], ["套装需求3", 5], ["状态效果ID", 6]]},
+    ],
+    # upgrades.py：描述模板无法还原，改为在 描述 后写出每级 (过渡文本, 最终文本)，upgrades.py 可直接读回
+    "1077936138": [
+        {"types": ["String", "StructList", "Int32", "Int32", "ConfigReference"],
+         "columns": [["名字", "key"], ["上限", 2], ["状态ID", 4], ["描述", ""]],
+         "tail": 1},
+    ],
+}
+
+
+def _field_types(entry) -> tuple:
+    return tuple(f["param_type"] for f in entry["value"]["value"]["value"])
+
+
+def pick_mapping(entry, mappings=MAPPINGS):
+    struct = entry["value"]["value"]
+    sid = str(struct.get("structId", ""))
+    types = _field_types(entry)
+    for m in mappings.get(sid, []):
+        if tuple(m["types"]) == types:
+            return m
+    raise SystemExit(f"没有 structId={sid} 字段类型为 {list(types)} 的列映射；可用 --mapping 补充。")
+
+
+def entry_row(entry, mapping) -> list:
+    key = entry["key"]["value"]
+    fields = entry["value"]["value"]["value"]
+    row = []
+    for _, src in mapping["columns"]:
+        if src == "key":
+            row.append(key)
+        elif isinstance(src, int):
+            row.append(fields[src]["value"])
+        else:
+            row.append(src)
+    tail = mapping.get("tail")
+    if tail is not None:
+        for item in fields[tail]["value"]["value"]:
+            # 只取标量字段（upgrades.py --value-struct-id 加在每级末尾的数值列表无法写回 CSV）
+            row.extend(f["value"] for f in item["value"]["value"] if not isinstance(f["value"], dict))
+    return row
+
+
+def convert(json_path: str, out_csv: str, mappings=MAPPINGS, encoding: str = "utf-8-sig") -> int:
+    """逐个 entry 读取并写出 CSV 行，返回行数。"""
+    mapping = None
+    n = 0
+    out = open_output(out_csv)
+    with open(json_path, "r", encoding="utf-8") as f, out as w:
+        if encoding == "utf-8-sig":
+            w.write("\ufeff")
+        writer = csv.writer(w, lineterminator="\n")
+        reader = DictJsonReader(f)
+        for entry in reader:
+            m = pick_mapping(entry, mappings)
+            if mapping is None:
+                mapping = m
+                writer.writerow([name for name, _ in mapping["columns"]])
+            elif m is not mapping:
+                raise SystemExit(f"{json_path}: 同一文件中出现了不同结构的 entry（第 {n + 1} 项）")
+            writer.writerow(entry_row(entry, mapping))
+            n += 1
+        if reader.header.get("type") not in (None, "Dict"):
+            raise SystemExit(f"{json_path}: 顶层 type 不是 Dict: {reader.header.get('type')!r}")
+    return n
+
+
+def load_mappings(path: str) -> dict:
+    merged = {k: list(v) for k, v in MAPPINGS.items()}
+    with open(path, "r", encoding="utf-8") as f:
+        extra = json.load(f)
+    for sid, ms in extra.items():
+        # 同 structId 同字段签名的映射以文件中的为准
+        sigs = {tuple(m["types"]) for m in ms}
+        merged[str(sid)] = list(ms) + [m for m in merged.get(str(sid), []) if tuple(m["types"]) not in sigs]
+    return merged
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="编辑器 Dict JSON → CSV（流式读取，按 structId 选择列映射）。")
+    ap.add_argument("--json", required=True, help="输入 Dict JSON")
+    ap.add_argument("--out", required=True, help="输出 CSV 路径")
+    ap.add_argument("--mapping", default="", help="额外的列映射 JSON（格式同 MAPPINGS）")
+    ap.add_argument("--no-bom", action="store_true", help="输出不带 BOM 的 UTF-8（默认带 BOM，方便 Excel 打开）")
+    args = ap.parse_args()
+    mappings = load_mappings(args.mapping) if args.mapping else MAPPINGS
+    n = convert(args.json, args.out, mappings, encoding="utf-8" if args.no_bom else "utf-8-sig")
+    print(f"Wrote {Path(args.out)} ({n} rows)")
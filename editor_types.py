@@ -0,0 +1,195 @@
+"""
+编辑器 JSON 的紧凑类型模型 + 专用编码器。
+
+  标量：Int32 / String / ConfigReference / EntityReference   {"param_type": T, "value": "..."}
+  Struct      {"param_type": "Struct", "value": {"structId", "type": "Struct", "value": [字段...]}}
+  StructList  {"param_type": "StructList", "value": {"structId", "value": [Struct...]}}
+  Entry       Dict 的一项 {"key": 标量, "value": Struct}
+  Dict        {"type": "Dict", "key_type", "value_type", "value": [Entry...], "value_structId"}
+
+所有类型都用 __slots__，构造时检查取值（Int32 范围、引用为数字 ID），
+encode() 直接拼出与 json.dump(to_obj(), ensure_ascii=False, indent=N) 完全相同的文本。
+"""
+from json.encoder import encode_basestring as _quote
+
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+
+class Scalar:
+    __slots__ = ("value",)
+    param_type = ""
+
+    def __init__(self, value):
+        self.value = self.check(value if isinstance(value, str) else str(value))
+
+    @classmethod
+    def check(cls, value: str) -> str:
+        return value
+
+    def to_obj(self):
+        return {"param_type": self.param_type, "value": self.value}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.value == other.value
+
+    def __hash__(self):
+        return hash((self.param_type, self.value))
+
+    def __repr__(self):
+        return f"{self.param_type}({self.value!r})"
+
+
+class String(Scalar):
+    __slots__ = ()
+    param_type = "String"
+
+
+class Int32(Scalar):
+    __slots__ = ()
+    param_type = "Int32"
+
+    @classmethod
+    def check(cls, value: str) -> str:
+        try:
+            n = int(value)
+        except ValueError:
+            raise ValueError(f"Int32 取值不是整数: {value!r}") from None
+        if not INT32_MIN <= n <= INT32_MAX:
+            raise ValueError(f"Int32 取值越界: {value}")
+        return value
+
+
+class _Reference(Scalar):
+    __slots__ = ()
+
+    @classmethod
+    def check(cls, value: str) -> str:
+        if not (value.isascii() and value.isdigit()):
+            raise ValueError(f"{cls.param_type} 需要数字 ID: {value!r}")
+        return value
+
+
+class ConfigReference(_Reference):
+    __slots__ = ()
+    param_type = "ConfigReference"
+
+
+class EntityReference(_Reference):
+    __slots__ = ()
+    param_type = "EntityReference"
+
+
+SCALAR_TYPES = {t.param_type: t for t in (String, Int32, ConfigReference, EntityReference)}
+
+
+class Struct:
+    __slots__ = ("struct_id", "fields")
+    param_type = "Struct"
+
+    def __init__(self, struct_id: str, fields):
+        self.struct_id = str(struct_id)
+        self.fields = fields
+
+    def to_obj(self):
+        return {
+            "param_type": "Struct",
+            "value": {
+                "structId": self.struct_id,
+                "type": "Struct",
+                "value": [f.to_obj() for f in self.fields],
+            },
+        }
+
+
+class StructList:
+    __slots__ = ("struct_id", "items")
+    param_type = "StructList"
+
+    def __init__(self, struct_id: str, items):
+        self.struct_id = str(struct_id)
+        self.items = items
+
+    def to_obj(self):
+        return {
+            "param_type": "StructList",
+            "value": {"structId": self.struct_id, "value": [s.to_obj() for s in self.items]},
+        }
+
+
+class Entry:
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: Scalar, value: Struct):
+        self.key = key
+        self.value = value
+
+    def to_obj(self):
+        return {"key": self.key.to_obj(), "value": self.value.to_obj()}
+
+
+class Dict:
+    __slots__ = ("key_type", "value_struct_id", "entries", "value_type")
+
+    def __init__(self, key_type: str, value_struct_id: str, entries, value_type: str = "Struct"):
+        self.key_type = key_type
+        self.value_struct_id = str(value_struct_id)
+        self.entries = entries
+        self.value_type = value_type
+
+    def to_obj(self):
+        return {
+            "type": "Dict",
+            "key_type": self.key_type,
+            "value_type": self.value_type,
+            "value": [e.to_obj() for e in self.entries],
+            "value_structId": self.value_struct_id,
+        }
+
+
+# ---------------- encoder ----------------
+
+class Encoder:
+    """按缩进预先生成各层前缀，逐节点拼接文本（不经过中间 dict）。"""
+
+    def __init__(self, indent: int = 2):
+        self.indent = indent
+        self._pads = []
+
+    def pad(self, level: int) -> str:
+        pads = self._pads
+        while len(pads) <= level:
+            pads.append("\n" + " " * (self.indent * len(pads)))
+        return pads[level]
+
+    def _list(self, items, level: int) -> str:
+        if not items:
+            return "[]"
+        p = self.pad(level + 1)
+        return "[" + p + ("," + p).join([self.node(x, level + 1) for x in items]) + self.pad(level) + "]"
+
+    def node(self, x, level: int) -> str:
+        p1 = self.pad(level + 1)
+        p0 = self.pad(level)
+        if isinstance(x, Scalar):
+            return f'{{{p1}"param_type": "{x.param_type}",{p1}"value": {_quote(x.value)}{p0}}}'
+        p2 = self.pad(level + 2)
+        if isinstance(x, Struct):
+            return (f'{{{p1}"param_type": "Struct",{p1}"value": {{'
+                    f'{p2}"structId": {_quote(x.struct_id)},{p2}"type": "Struct",'
+                    f'{p2}"value": {self._list(x.fields, level + 2)}{p1}}}{p0}}}')
+        if isinstance(x, StructList):
+            return (f'{{{p1}"param_type": "StructList",{p1}"value": {{'
+                    f'{p2}"structId": {_quote(x.struct_id)},'
+                    f'{p2}"value": {self._list(x.items, level + 2)}{p1}}}{p0}}}')
+        if isinstance(x, Entry):
+            return f'{{{p1}"key": {self.node(x.key, level + 1)},{p1}"value": {self.node(x.value, level + 1)}{p0}}}'
+        if isinstance(x, Dict):
+            return (f'{{{p1}"type": "Dict",{p1}"key_type": {_quote(x.key_type)},'
+                    f'{p1}"value_type": {_quote(x.value_type)},'
+                    f'{p1}"value": {self._list(x.entries, level + 1)},'
+                    f'{p1}"value_structId": {_quote(x.value_struct_id)}{p0}}}')
+        raise TypeError(f"不是编辑器类型: {type(x).__name__}")
+
+
+def encode(x, indent: int = 2, level: int = 0) -> str:
+    return Encoder(indent).node(x, level)
@@ -0,0 +1,214 @@
+"""
+全部生成脚本和工具的统一入口：一个进程里跑多张表，子模块用到时才导入。
+
+  python gen.py all                                  # 同 build.py（默认串行、不另开进程）
+  python gen.py all -j 0 --delta                     # build.py 的参数原样可用
+  python gen.py monsters                             # 清单里用 build_monster_json.py 的表
+  python gen.py upgrades --csv 元素使职业强化.csv 机巧师职业强化.csv   # 每个 CSV 各生成一份 build/<名>.json
+  python gen.py artifacts + upgrades + lint          # 用 + 串起多条命令，同一进程依次执行
+  python gen.py list
+
+命令后面没有参数时按 build_manifest.json 构建该脚本的全部表（走构建缓存）；
+有参数时原样传给脚本，只是 --csv 给了多个文件时按文件逐个运行，--out 默认为 build/<CSV 名>.json。
+每个脚本第一次运行时导入 csv / json / re / argparse 等模块，之后的表直接复用。
+
+结束时在 stderr 报告：解释器启动到进入 main 的时间、gen 自己按需导入的模块耗时、各脚本运行耗时。
+"""
+import sys, time
+
+_T_MAIN = time.perf_counter()
+
+# 命令 -> 脚本（相对仓库根目录）
+GENERATORS = {
+    "monsters": "超级斗鸡/build_monster_json.py",
+    "intros": "超级斗鸡/monster_intro.py",
+    "artifacts": "artifact.py",
+    "artifact-text": "generate_txt.py",
+    "sets": "artifact_set.py",
+    "set-text": "artifact_set_txt.py",
+    "upgrades": "upgrades.py",
+    "table": "table_spec.py",
+}
+TOOLS = {
+    "lint": "rich_text.py",
+    "refs": "check_refs.py",
+    "delta": "dict_delta.py",
+    "diff": "dict_diff.py",
+    "to-csv": "dict_to_csv.py",
+    "watch": "watch.py",
+    "bench": "bench.py",
+    "strength": "超级斗鸡/monster_strength.py",
+    "waves": "超级斗鸡/wave_solver.py",
+    "encounters": "超级斗鸡/encounter_sim.py",
+    "cards": "card_sampler.py",
+    "loadouts": "loadout.py",
+}
+
+
+class Timings:
+    def __init__(self):
+        self.imports = []  # [(模块, 秒)]
+        self.runs = []     # [(命令, 秒)]
+
+    def load(self, name: str):
+        """按需导入并计时（已导入的直接返回）。"""
+        mod = sys.modules.get(name)
+        if mod is None:
+            import importlib
+            t0 = time.perf_counter()
+            mod = importlib.import_module(name)
+            self.imports.append((name, time.perf_counter() - t0))
+        return mod
+
+    def report(self) -> str:
+        startup = _process_age()
+        parts = [f"启动 {startup:.2f}s" if startup is not None else "启动 ?"]
+        if self.imports:
+            total = sum(s for _, s in self.imports)
+            parts.append(f"导入 {total:.2f}s（" + "，".join(f"{n} {s:.2f}s" for n, s in self.imports) + "）")
+        if self.runs:
+            total = sum(s for _, s in self.runs)
+            parts.append(f"运行 {total:.2f}s（" + "，".join(f"{n} {s:.2f}s" for n, s in self.runs) + "）")
+        return "[gen] " + "；".join(parts)
+
+
+def _process_age():
+    """解释器启动到进入 gen.py 的秒数（Linux 从 /proc 读取进程启动时刻；其它平台为 None）。"""
+    try:
+        import os
+        with open("/proc/self/stat", "rb") as f:
+            start_ticks = int(f.read().rsplit(b")", 1)[1].split()[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        age_now = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return max(0.0, age_now - (time.perf_counter() - _T_MAIN))
+
+
+def _split_commands(argv):
+    """["a", "x", "+", "b"] -> [["a", "x"], ["b"]]"""
+    groups, cur = [], []
+    for a in argv:
+        if a == "+":
+            groups.append(cur)
+            cur = []
+        else:
+            cur.append(a)
+    groups.append(cur)
+    return [g for g in groups if g]
+
+
+def _fan_out(argv, out_dir: str):
+    """--csv 后面有多个文件时拆成逐个运行的参数列表；否则原样返回一组。"""
+    if "--csv" not in argv:
+        return [argv]
+    i = argv.index("--csv")
+    j = i + 1
+    while j < len(argv) and not argv[j].startswith("--"):
+        j += 1
+    csvs, rest = argv[i + 1:j], argv[:i] + argv[j:]
+    if len(csvs) <= 1:
+        return [argv]
+    if "--out" in rest:
+        raise SystemExit("--csv 给了多个文件时不能再给 --out（输出为 <out_dir>/<CSV 名>.json）")
+    from pathlib import Path
+    return [rest + ["--csv", c, "--out", Path(out_dir, Path(c).stem + ".json").as_posix()] for c in csvs]
+
+
+def run_command(cmd: str, argv, timings: Timings, cache_dir: str, no_cache: bool) -> bool:
+    build = timings.load("build")
+    if cmd == "all":
+        t0 = time.perf_counter()
+        if not any(a == "--jobs" or a.startswith("-j") for a in argv):
+            argv = ["--jobs", "1"] + list(argv)  # 默认在本进程里串行，不再为每张表 fork
+        if no_cache:
+            argv.append("--no-cache")
+        elif cache_dir:
+            argv += ["--cache-dir", cache_dir]
+        old = sys.argv
+        sys.argv = ["build.py"] + list(argv)
+        try:
+            build.main()
+            ok = True
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        finally:
+            sys.argv = old
+            timings.runs.append(("all", time.perf_counter() - t0))
+        return ok
+
+    script = GENERATORS.get(cmd) or TOOLS.get(cmd)
+    if script is None:
+        raise SystemExit(f"未知命令 {cmd!r}；可用：all、{'、'.join(list(GENERATORS) + list(TOOLS))}（gen.py list 查看说明）")
+
+    if not argv and cmd in GENERATORS:
+        # 按清单构建该脚本的表（连同依赖），走构建缓存
+        tables = build.load_manifest(build.DEFAULT_MANIFEST)
+        deps = build.resolve_deps(tables)
+        names = [t["name"] for t in tables if t["script"] == script]
+        if not names:
+            raise SystemExit(f"{build.DEFAULT_MANIFEST} 里没有用 {script} 的表；请给出参数直接运行")
+        selected = build.select_tables(tables, deps, names)
+        cache = None if no_cache else timings.load("build_cache").BuildCache(cache_dir or build.DEFAULT_CACHE_DIR)
+        t0 = time.perf_counter()
+        failed = build.run_build(selected, deps, jobs=1, cache=cache)
+        timings.runs.append((cmd, time.perf_counter() - t0))
+        return not failed
+
+    ok = True
+    out_dir = "build"
+    for args in _fan_out(list(argv), out_dir):
+        if any(a == "--out" for a in args):
+            from pathlib import Path
+            out = args[args.index("--out") + 1]
+            Path(out).parent.mkdir(parents=True, exist_ok=True)
+        good, log, secs = build.run_script(script, args)
+        sys.stdout.write(log)
+        timings.runs.append((cmd, secs))
+        if not good:
+            print(f"[FAIL] {cmd} {' '.join(args)}")
+            ok = False
+    return ok
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    cache_dir, no_cache = "", False
+    while argv and argv[0].startswith("--"):
+        opt = argv.pop(0)
+        if opt == "--no-cache":
+            no_cache = True
+        elif opt == "--cache-dir" and argv:
+            cache_dir = argv.pop(0)
+        elif opt in ("--help", "-h"):
+            argv = ["list"]
+            break
+        else:
+            raise SystemExit(f"未知选项 {opt}；全局选项只有 --no-cache、--cache-dir DIR")
+    commands = _split_commands(argv)
+    if not commands:
+        print(__doc__.strip())
+        return
+    if commands[0][0] == "list":
+        print("命令：\n  all" + "".join(f"\n  {c:<14}{s}" for c, s in {**GENERATORS, **TOOLS}.items()))
+        return
+
+    import os
+    from pathlib import Path
+    os.chdir(Path(__file__).resolve().parent)  # 清单与默认路径都相对仓库根目录
+    sys.path.insert(0, os.getcwd())
+
+    timings = Timings()
+    ok = True
+    try:
+        for cmd, *rest in commands:
+            ok = run_command(cmd, rest, timings, cache_dir, no_cache) and ok
+    finally:
+        print(timings.report(), file=sys.stderr)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
-import csv
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+import profiling, rich_text, table_registry
+from build_cache import run_cached, write_text_if_changed
+from rich_text import NL, literal_newlines
+
 GREEN = "#71db60"
 
 def load_sets(sets_csv: str):
@@ -11,33 +16,31 @@ def load_sets(sets_csv: str):
     If not found (or empty), falls back to joining 套装效果1..3 (without 2/4件套前缀).
     """
     m = {}
-    with open(sets_csv, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.DictReader(f)
-        if not r.fieldnames:
-            raise SystemExit(f"{sets_csv} 缺少表头")
-        headers = [h or "" for h in r.fieldnames]
-
-        has_single_summary = ("套装效果简略描述" in headers)
-
-        for row in r:
-            name = (row.get("名字") or "").strip()
-            if not name:
-                continue
-
-            summary = ""
-            if has_single_summary:
-                summary = (row.get("套装效果简略描述") or "").strip()
-
-            if not summary:
-                # fall back: concat all 套装效果N with '；'
-                effects = []
-                for i in range(1, 11):
-                    eff = (row.get(f"套装效果{i}") or "").strip()
-                    if eff:
-                        effects.append(eff)
-                summary = "；".join(effects) if effects else ""
-
-            m[name] = summary
+    t = table_registry.load(sets_csv)
+    if not t.header:
+        raise SystemExit(f"{sets_csv} 缺少表头")
+
+    has_single_summary = ("套装效果简略描述" in t)
+
+    for row in t.records():
+        name = (row.get("名字") or "").strip()
+        if not name:
+            continue
+
+        summary = ""
+        if has_single_summary:
+            summary = (row.get("套装效果简略描述") or "").strip()
+
+        if not summary:
+            # fall back: concat all 套装效果N with '；'
+            effects = []
+            for i in range(1, 11):
+                eff = (row.get(f"套装效果{i}") or "").strip()
+                if eff:
+                    effects.append(eff)
+            summary = "；".join(effects) if effects else ""
+
+        m[name] = literal_newlines(summary)
     return m
 
 def detect_set_column(headers):
@@ -48,57 +51,71 @@ def detect_set_column(headers):
         return "套装1"
     raise SystemExit(f"圣遗物.csv 需要列：套装（或 套装1）；实际列：{headers}")
 
-def build_block(base_effect: str, set_name: str, summary: str):
+def render_set_block(set_name: str, summary: str):
+    """Set part of a block (same for every item of the set): <color=#71db60>套装名</color>\\n{简略描述}"""
+    return f"<color={GREEN}>{set_name}</color>{NL}{summary or ''}"
+
+def make_set_block_cache(sets_map: dict, check=None):
+    """Memoized {set_name: set block}; .cache_info() reports reuse. With check, each block is validated once when rendered."""
+    def render(set_name):
+        block = render_set_block(set_name, sets_map.get(set_name, ""))
+        if check is not None:
+            check(block, f"套装 {set_name}")
+        return block
+    return lru_cache(maxsize=None)(render)
+
+def build_block(base_effect: str, set_name: str, summary: str, set_block=None):
     """
     Build one block using literal \\n:
       (基础效果)\\n<color=#71db60>套装名</color>\\n{简略描述}
+    With set_block (from make_set_block_cache) the set part is reused, not rebuilt.
     """
-    parts = []
-    if base_effect:
-        parts.append(f"({base_effect})")
-    parts.append(f"<color={GREEN}>{set_name}</color>")
-    parts.append(summary or "")
-    return "\\n".join(parts)
+    block = set_block(set_name) if set_block else render_set_block(set_name, summary)
+    return f"({base_effect}){NL}{block}" if base_effect else block
 
 def main(items_csv: str, sets_csv: str, out_txt: str):
     sets_map = load_sets(sets_csv)
+    check = rich_text.Validator()
+    set_block = make_set_block_cache(sets_map, check)
 
     out_lines = []
-    with open(items_csv, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.DictReader(f)
-        headers = [(h or "").strip() for h in (r.fieldnames or [])]
-
-        # Required columns (single set)
-        for col in ("卡牌标题", "基础效果"):
-            if col not in headers:
-                raise SystemExit(f"{items_csv} 需要列：{col}；实际列：{headers}")
-        set_col = detect_set_column(headers)
-
-        for row in r:
-            title = (row.get("卡牌标题") or "").strip()
-            if not title:
-                continue
-            base  = (row.get("基础效果") or "").strip()
-            sname = (row.get(set_col) or "").strip()
-
-            if not sname:
-                # still write title with empty block
-                out_lines.append(title)
-                out_lines.append("")
-                out_lines.append("")
-                continue
-
-            summary = sets_map.get(sname, "")
-            block = build_block(base, sname, summary)
-
+    t = table_registry.load(items_csv)
+    headers = list(t.header)
+
+    # Required columns (single set)
+    for col in ("卡牌标题", "基础效果"):
+        if col not in headers:
+            raise SystemExit(f"{items_csv} 需要列：{col}；实际列：{headers}")
+    set_col = detect_set_column(headers)
+
+    for line, row in zip(t.lines, t.records()):
+        title = (row.get("卡牌标题") or "").strip()
+        if not title:
+            continue
+        base  = literal_newlines((row.get("基础效果") or "").strip())
+        sname = (row.get(set_col) or "").strip()
+
+        if not sname:
+            # still write title with empty block
             out_lines.append(title)
-            out_lines.append(block)
-            out_lines.append("")  # blank separator
+            out_lines.append("")
+            out_lines.append("")
+            continue
+
+        check(base, f"{t.path}:{line} {title}")
+        block = build_block(base, sname, sets_map.get(sname, ""), set_block)
+
+        out_lines.append(title)
+        out_lines.append(block)
+        out_lines.append("")  # blank separator
+
+    check.raise_errors()
 
     outp = Path(out_txt)
-    outp.parent.mkdir(parents=True, exist_ok=True)
-    outp.write_text("\n".join(out_lines), encoding="utf-8")
-    print(f"Wrote {outp}")
+    changed = write_text_if_changed(outp, "\n".join(out_lines))
+    print(f"Wrote {outp}" if changed else f"Unchanged {outp}")
+    info = set_block.cache_info()
+    print(f"套装描述块：渲染 {info.misses} 次，复用 {info.hits} 次")
 
 if __name__ == "__main__":
     import argparse
@@ -106,5 +123,14 @@ if __name__ == "__main__":
     ap.add_argument("--items", required=True, help="圣遗物.csv")
     ap.add_argument("--sets", required=True, help="圣遗物套装.csv")
     ap.add_argument("--out", required=True, help="输出 TXT 路径")
+    ap.add_argument("--cache-dir", default="", help="增量构建缓存目录（为空则不使用缓存）")
+    profiling.add_arguments(ap)
     args = ap.parse_args()
-    main(args.items, args.sets, args.out)
\ No newline at end of file
+    with profiling.from_args(args, hooks=[(sys.modules[__name__], "build_block", "desc_build")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.items, args.sets], outputs=[args.out],
+            params={},
+            sources=[__file__, rich_text.__file__, table_registry.__file__],
+            build=lambda: main(args.items, args.sets, args.out),
+        )
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""
+圣遗物搭配枚举：每个部位（标签描述：头盔/手套/护甲/靴子/饰品）选一件，统计各套装件数，
+按 圣遗物套装.csv 的 套装需求1..3 判断激活了哪些套装效果，再按可替换的评分函数排出最好的搭配。
+
+  python loadout.py                                    # 前 10 名，评分 = 激活的套装效果的件数之和
+  python loadout.py --top 20 --need-weight 1=0.5,4=3   # 按件数给套装效果加权
+  python loadout.py --item-column 价格 --item-weight -0.01 --require 逐战的凯歌:4
+  python loadout.py --scorer my_score.py               # 自定义评分（见下）
+
+各套装的件数打包在一个整数里（每套 W 位，W 足够装下部位数），选一件即加上该套的 1 << (W × 套装序号)；
+激活的套装效果是一个位集（每个 (套装, 需求件数) 一位），按件数向量记忆，相同件数向量只判断一次。
+
+评分 = Σ 各件的 item_score(行) + bonus_score(激活的效果)。在这个约定下按部位逐层做动态规划：
+状态为件数向量，每个状态只保留前 N 个部分和（同一部位、同一套装的物品只有前 N 件可能进前 N 名），
+所以状态数只与套装数、部位数有关，与物品数无关——物品池涨到几千万种搭配时，耗时几乎不变，
+搭配总数和各效果的激活次数也是按状态精确累计的。--require 在每层剪掉剩余部位已经凑不够件数的状态。
+
+--scorer 文件里可定义：
+  item_score(row) -> float               row 为 圣遗物.csv 的一行（{列名: 值}）
+  bonus_score(active) -> float           active 为 ((套装, 需求件数), ...)
+  loadout_score(rows, active) -> float   整套评分；给了它就改为逐个枚举全部搭配（只适合小物品池）
+"""
+import heapq, itertools, runpy
+from pathlib import Path
+
+import table_registry
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_ITEMS = "圣遗物.csv"
+DEFAULT_SETS = "圣遗物套装.csv"
+NEED_COLUMNS = ("套装需求1", "套装需求2", "套装需求3")
+
+
+def _int(v: str, where: str) -> int:
+    try:
+        return int(float(v))
+    except ValueError:
+        raise SystemExit(f"{where}: 不是整数: {v!r}") from None
+
+
+def load_sets(sets_csv: str) -> dict:
+    """{套装名: (需求件数, ...)}（升序、去重，空格跳过）。"""
+    t = table_registry.load(sets_csv)
+    t.require(["名字"] + list(NEED_COLUMNS))
+    out = {}
+    for line, row in zip(t.lines, t.records()):
+        name = (row.get("名字") or "").strip()
+        if name:
+            needs = {_int(row[c].strip(), f"{t.path}:{line} {c}") for c in NEED_COLUMNS if (row[c] or "").strip()}
+            out[name] = tuple(sorted(needs))
+    return out
+
+
+class Pool:
+    """
+    物品池与套装定义。
+      slots     部位（标签描述，按首次出现的顺序）
+      items     [(行, 部位序号, 套装序号或 None)]
+      set_names 套装（套装表里的在前，物品引用了但套装表里没有的在后，没有效果）
+      bonuses   [(套装, 需求件数)]，位集的第 i 位即 bonuses[i]
+    """
+
+    def __init__(self, rows, sets: dict, slots=None):
+        rows = [r for r in rows if (r.get("卡牌标题") or "").strip() and (r.get("标签描述") or "").strip()]
+        self.slots = list(slots) if slots else list(dict.fromkeys(r["标签描述"].strip() for r in rows))
+        self.set_names = list(sets)
+        for r in rows:
+            s = (r.get("套装") or "").strip()
+            if s and s not in sets and s not in self.set_names:
+                self.set_names.append(s)
+        set_index = {s: i for i, s in enumerate(self.set_names)}
+        slot_index = {s: i for i, s in enumerate(self.slots)}
+        self.items = [(r, slot_index[r["标签描述"].strip()], set_index.get((r.get("套装") or "").strip()))
+                      for r in rows if r["标签描述"].strip() in slot_index]
+        missing = [s for s in self.slots if all(slot != slot_index[s] for _, slot, _ in self.items)]
+        if missing:
+            raise SystemExit(f"没有可选的物品：{'、'.join(missing)}")
+
+        self.width = len(self.slots).bit_length()
+        self.field = (1 << self.width) - 1
+        self.bonuses = [(s, n) for s in self.set_names for n in sets.get(s, ())]
+        # 套装序号 -> [(需求件数, 位)]
+        self._tiers = [[(n, 1 << self.bonuses.index((s, n))) for n in sets.get(s, ())] for s in self.set_names]
+        self._active = {}
+
+    def inc(self, set_idx) -> int:
+        """选一件该套物品时件数向量的增量。"""
+        return 0 if set_idx is None else 1 << (self.width * set_idx)
+
+    def count(self, counts: int, set_idx: int) -> int:
+        return (counts >> (self.width * set_idx)) & self.field
+
+    def active(self, counts: int) -> int:
+        """件数向量 -> 激活效果的位集（按件数向量记忆）。"""
+        mask = self._active.get(counts)
+        if mask is None:
+            mask, k, i = 0, counts, 0
+            while k:
+                c = k & self.field
+                if c:
+                    for need, bit in self._tiers[i]:
+                        if c >= need:
+                            mask |= bit
+                k >>= self.width
+                i += 1
+            self._active[counts] = mask
+        return mask
+
+    def describe(self, mask: int) -> tuple:
+        return tuple(b for i, b in enumerate(self.bonuses) if mask >> i & 1)
+
+
+class Scorer:
+    """
+    默认评分：每个激活的效果记 need_weight.get(需求件数, 需求件数) 分；
+    给了 item_column 时每件再加 item_weight × 该列数值。
+    """
+
+    def __init__(self, need_weight=None, item_column: str = "", item_weight: float = 0.0):
+        self.need_weight = dict(need_weight or {})
+        self.item_column = item_column
+        self.item_weight = item_weight
+
+    def item_score(self, row) -> float:
+        if not self.item_column:
+            return 0.0
+        v = (row.get(self.item_column) or "").strip()
+        return self.item_weight * float(v) if v else 0.0
+
+    def bonus_score(self, active) -> float:
+        return float(sum(self.need_weight.get(n, n) for _, n in active))
+
+
+def _top_sums(partial, items, limit: int):
+    """两组降序 [(分数, 物品序号元组)] 的两两和中最大的 limit 个：第 i 个与第 j 个配对只需 (i+1)(j+1) <= limit。"""
+    out = []
+    for i, (a, ia) in enumerate(partial):
+        for b, ib in items[:limit // (i + 1)]:
+            out.append((a + b, ia + ib))
+    return out
+
+
+def _keep(cands, limit: int):
+    cands.sort(key=lambda c: (-c[0], c[1]))
+    return cands[:limit]
+
+
+class Result:
+    def __init__(self):
+        self.total = 0           # 合法搭配总数
+        self.states = 0          # 不同的件数向量
+        self.bonus_counts = {}   # (套装, 需求件数) -> 激活它的搭配数
+        self.top = []            # [(分数, (物品序号, ...), 激活位集)]
+
+
+def rank(pool: Pool, scorer, top: int = 10, require=None) -> Result:
+    """
+    按部位逐层动态规划，状态为件数向量：{件数向量: (搭配数, 前 top 个 [(部分和, 物品序号元组)])}。
+    require {套装序号: 至少件数}。
+    """
+    n_slots = len(pool.slots)
+    buckets = [{} for _ in pool.slots]  # 部位 -> {套装序号: 降序 [(分数, (物品序号,))]}
+    for idx, (row, slot, s) in enumerate(pool.items):
+        buckets[slot].setdefault(s, []).append((scorer.item_score(row), (idx,)))
+    for b in buckets:
+        for s, lst in b.items():
+            b[s] = _keep(lst, top)  # 只有前 top 件可能进前 top 名
+    sizes = [{s: sum(1 for _, sl, ss in pool.items if sl == slot and ss == s) for s in b} for slot, b in enumerate(buckets)]
+
+    # 每个套装在剩余部位里最多还能拿几件（剪枝用）
+    reach = [[0] * len(pool.set_names) for _ in range(n_slots + 1)]
+    for slot in range(n_slots - 1, -1, -1):
+        reach[slot] = [r + (s in buckets[slot]) for s, r in enumerate(reach[slot + 1])]
+    require = dict(require or {})
+
+    layer = {0: (1, [(0.0, ())])}
+    for slot, b in enumerate(buckets):
+        nxt = {}
+        for counts, (n, partial) in layer.items():
+            for s, items in b.items():
+                c2 = counts + pool.inc(s)
+                if require and any(pool.count(c2, rs) + reach[slot + 1][rs] < need for rs, need in require.items()):
+                    continue
+                n2, cands = nxt.get(c2, (0, []))
+                cands += _top_sums(partial, items, top)
+                nxt[c2] = (n2 + n * sizes[slot][s], cands)
+        layer = {c: (n, _keep(cands, top)) for c, (n, cands) in nxt.items()}
+
+    res = Result()
+    res.states = len(layer)
+    best = []
+    for counts, (n, partial) in layer.items():
+        mask = pool.active(counts)
+        active = pool.describe(mask)
+        res.total += n
+        for bonus in active:
+            res.bonus_counts[bonus] = res.bonus_counts.get(bonus, 0) + n
+        bonus = scorer.bonus_score(active)
+        for part, idxs in partial:
+            best.append((part + bonus, idxs, mask))
+    res.top = heapq.nsmallest(top, best, key=lambda t: (-t[0], t[1]))
+    return res
+
+
+def iter_loadouts(pool: Pool, require=None):
+    """逐个枚举全部合法搭配：(物品序号元组, 件数向量)。"""
+    per_slot = [[(i, pool.inc(s)) for i, (_, sl, s) in enumerate(pool.items) if sl == slot]
+                for slot in range(len(pool.slots))]
+    require = dict(require or {})
+    for combo in itertools.product(*per_slot):
+        counts = sum(inc for _, inc in combo)
+        if all(pool.count(counts, s) >= need for s, need in require.items()):
+            yield tuple(i for i, _ in combo), counts
+
+
+def rank_exhaustive(pool: Pool, loadout_score, top: int = 10, require=None) -> Result:
+    """整套评分（不可拆分）时逐个枚举。"""
+    res = Result()
+    states = set()
+
+    def scored():
+        for idxs, counts in iter_loadouts(pool, require):
+            mask = pool.active(counts)
+            active = pool.describe(mask)
+            res.total += 1
+            states.add(counts)
+            for bonus in active:
+                res.bonus_counts[bonus] = res.bonus_counts.get(bonus, 0) + 1
+            yield loadout_score([pool.items[i][0] for i in idxs], active), idxs, mask
+
+    res.top = heapq.nsmallest(top, scored(), key=lambda t: (-t[0], t[1]))
+    res.states = len(states)
+    return res
+
+
+def _parse_pairs(spec: str, what: str) -> dict:
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        k, sep, v = part.rpartition("=") if "=" in part else part.rpartition(":")
+        try:
+            out[k.strip()] = float(v)
+        except ValueError:
+            sep = ""
+        if not sep:
+            raise SystemExit(f"{what} 格式不对: {part!r}")
+    return out
+
+
+def main():
+    import argparse, time
+    ap = argparse.ArgumentParser(description="枚举每个部位一件的圣遗物搭配，判断激活的套装效果并按评分排序。")
+    ap.add_argument("--items", default=str(ROOT / DEFAULT_ITEMS), help="圣遗物.csv")
+    ap.add_argument("--sets", default=str(ROOT / DEFAULT_SETS), help="圣遗物套装.csv")
+    ap.add_argument("--slots", default="", help="部位，逗号分隔（默认 圣遗物.csv 里出现的全部 标签描述）")
+    ap.add_argument("--top", type=int, default=10, help="输出前几名（默认 10）")
+    ap.add_argument("--require", action="append", default=[], help="套装:件数，只保留至少有这么多件的搭配；可重复")
+    ap.add_argument("--need-weight", default="", help="按需求件数给效果加权，如 1=0.5,4=3（默认权重即件数）")
+    ap.add_argument("--item-column", default="", help="每件物品再加 该列数值 × --item-weight（如 价格）")
+    ap.add_argument("--item-weight", type=float, default=0.0, help="配合 --item-column")
+    ap.add_argument("--scorer", default="", help="自定义评分的 .py 文件（item_score / bonus_score / loadout_score）")
+    args = ap.parse_args()
+    if args.top < 1:
+        raise SystemExit("--top 至少为 1")
+
+    t = table_registry.load(args.items)
+    t.require(["卡牌标题", "标签描述", "套装"])
+    slots = [s.strip() for s in args.slots.split(",") if s.strip()]
+    pool = Pool(list(t.records()), load_sets(args.sets), slots or None)
+
+    require = {}
+    for spec in args.require:
+        name, _, need = spec.rpartition(":")
+        if name not in pool.set_names or not need.isdigit():
+            raise SystemExit(f"--require 应为 套装:件数，套装须出现在物品池里: {spec!r}")
+        require[pool.set_names.index(name)] = int(need)
+
+    scorer = Scorer({int(k): v for k, v in _parse_pairs(args.need_weight, "--need-weight").items()},
+                    args.item_column, args.item_weight)
+    loadout_score = None
+    if args.scorer:
+        plugin = runpy.run_path(args.scorer)
+        scorer.item_score = plugin.get("item_score", scorer.item_score)
+        scorer.bonus_score = plugin.get("bonus_score", scorer.bonus_score)
+        loadout_score = plugin.get("loadout_score")
+
+    t0 = time.perf_counter()
+    if loadout_score:
+        res = rank_exhaustive(pool, loadout_score, args.top, require)
+    else:
+        res = rank(pool, scorer, args.top, require)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{len(pool.items)} 件物品，{len(pool.slots)} 个部位：合法搭配 {res.total} 种，"
+          f"不同的套装件数组合 {res.states} 种（{elapsed:.2f}s）")
+    for rank_no, (score, idxs, mask) in enumerate(res.top, start=1):
+        titles = " / ".join(pool.items[i][0]["卡牌标题"].strip() for i in idxs)
+        bonuses = "、".join(f"{s}{n}件" for s, n in pool.describe(mask)) or "无"
+        print(f"{rank_no:>3}. {score:g}\t{titles}\t激活：{bonuses}")
+    if res.total:
+        print("各套装效果的激活比例：")
+        for (s, n), c in sorted(res.bonus_counts.items(), key=lambda kv: -kv[1]):
+            print(f"  {s}{n}件\t{c / res.total:.2%}")
+
+
+if __name__ == "__main__":
+    main()
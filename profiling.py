@@ -0,0 +1,226 @@
+"""
+各生成脚本共用的可选分阶段剖析：--profile report.json [--profile-dump stage.prof]
+
+不改动生成逻辑，只在会话期间给已知的函数套上计时包装（退出时还原）：
+  read_csv       table_registry.load                   行数 = 表的行数
+  header_check   Table.index / indexes / missing / require / in
+  json_encode    DictJsonWriter.encode，以及经 use_emitter 登记的 table_spec emitter   行数 = entry 数
+  disk_write     输出文件的 write 与关闭时的比较/替换
+以及脚本自己声明的阶段（upgrades 的 derive_pairs_from_desc → template_expand，
+artifact 的 build_desc → desc_build ……）。流式生成时各阶段按行交错执行，所以按调用累计。
+
+每个阶段记录：调用次数、行数、累计耗时、tracemalloc 峰值（阶段内相对进入时新增的内存）。
+报告里 total 为整次运行，other 为未归入任何阶段的时间。
+--profile-dump 为每个阶段单独开 cProfile，结束时把耗时最多的阶段写成 .prof（可用 pstats / snakeviz 查看）。
+tracemalloc 和 cProfile 都有明显开销，报告里的绝对耗时只用于阶段之间比较。
+"""
+import contextlib, cProfile, functools, json, sys, time, tracemalloc
+from pathlib import Path
+
+
+def add_arguments(ap):
+    ap.add_argument("--profile", default="", help="写出分阶段耗时/内存报告 JSON 到此路径（默认不剖析）")
+    ap.add_argument("--profile-dump", default="", help="配合 --profile：把最耗时阶段的 cProfile 数据写到此路径")
+
+
+def from_args(args, hooks=()):
+    """按命令行参数返回 Profiler；没有 --profile 时返回空的上下文管理器。"""
+    if not getattr(args, "profile", ""):
+        return contextlib.nullcontext()
+    return Profiler(args.profile, getattr(args, "profile_dump", "") or None, hooks)
+
+
+class _Stage:
+    __slots__ = ("name", "calls", "rows", "wall", "peak", "cprofile")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.rows = 0
+        self.wall = 0.0
+        self.peak = 0
+        self.cprofile = None
+
+
+class _Frame:
+    __slots__ = ("stage", "t0", "cur0", "carried")
+
+    def __init__(self, stage, t0, cur0):
+        self.stage = stage
+        self.t0 = t0
+        self.cur0 = cur0
+        self.carried = 0
+
+
+class Profiler:
+    """
+    with Profiler("report.json", hooks=[(module, "func", "stage")]):
+        ...
+    hooks 里的项为 (对象, 属性名, 阶段名) 或再加一个 rows(result) -> 行数 的函数。
+    """
+
+    def __init__(self, report_path, dump_path=None, hooks=()):
+        self.report_path = report_path
+        self.dump_path = dump_path
+        self.hooks = list(hooks)
+        self.stages = {}
+        self._stack = []
+        self._patched = []
+        self._started_tracing = False
+        self._total = _Stage("total")
+
+    # ---- 计时栈：嵌套阶段的内存峰值沿栈向上传递 ----
+
+    def _stage(self, name) -> _Stage:
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = _Stage(name)
+            if self.dump_path:
+                st.cprofile = cProfile.Profile()
+        return st
+
+    def _enter(self, st: _Stage):
+        cur, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            parent = self._stack[-1]
+            parent.carried = max(parent.carried, peak)
+            if parent.stage.cprofile:
+                parent.stage.cprofile.disable()
+        tracemalloc.reset_peak()
+        if st.cprofile:
+            st.cprofile.enable()
+        self._stack.append(_Frame(st, time.perf_counter(), cur))
+
+    def _exit(self, rows: int):
+        f = self._stack.pop()
+        st = f.stage
+        st.wall += time.perf_counter() - f.t0
+        if st.cprofile:
+            st.cprofile.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, f.carried)
+        st.peak = max(st.peak, peak - f.cur0)
+        st.calls += 1
+        st.rows += rows
+        if self._stack:
+            parent = self._stack[-1]
+            parent.carried = max(parent.carried, peak)
+            if parent.stage.cprofile:
+                parent.stage.cprofile.enable()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int = 0):
+        """显式标注一段代码；块内可以对返回的 _Stage 累加 rows。"""
+        st = self._stage(name)
+        self._enter(st)
+        try:
+            yield st
+        finally:
+            self._exit(rows)
+
+    def wrap(self, fn, name: str, rows=None):
+        st = self._stage(name)
+
+        @functools.wraps(fn)
+        def timed(*a, **kw):
+            self._enter(st)
+            n = 1
+            try:
+                result = fn(*a, **kw)
+                if rows is not None:
+                    n = rows(result)
+                return result
+            finally:
+                self._exit(n)
+        return timed
+
+    def instrument(self, owner, attr: str, name: str, rows=None):
+        """把 owner.attr 换成计时版本；会话结束时还原。"""
+        had = attr in vars(owner) if hasattr(owner, "__dict__") else True
+        orig = getattr(owner, attr)
+        setattr(owner, attr, self.wrap(orig, name, rows))
+        self._patched.append((owner, attr, orig, had))
+
+    # ---- 会话 ----
+
+    def _install(self):
+        import build_cache, dict_json, table_registry
+        self.instrument(table_registry, "load", "read_csv", rows=len)
+        for attr in ("index", "indexes", "missing", "require", "__contains__"):
+            self.instrument(table_registry.Table, attr, "header_check", rows=lambda _: 0)
+        self.instrument(dict_json.DictJsonWriter, "encode", "json_encode")
+        self.instrument(build_cache.OutputFile, "__exit__", "disk_write", rows=lambda _: 0)
+        enter = build_cache.OutputFile.__enter__
+        prof = self
+
+        def enter_and_time_writes(out):
+            f = enter(out)
+            f.write = prof.wrap(f.write, "disk_write", rows=lambda _: 0)
+            return f
+        build_cache.OutputFile.__enter__ = enter_and_time_writes
+        self._patched.append((build_cache.OutputFile, "__enter__", enter, True))
+        use_emitter = dict_json.DictJsonWriter.use_emitter
+
+        def use_timed_emitter(writer, emit):
+            return prof.wrap(use_emitter(writer, emit), "json_encode")
+        dict_json.DictJsonWriter.use_emitter = use_timed_emitter
+        self._patched.append((dict_json.DictJsonWriter, "use_emitter", use_emitter, True))
+        for hook in self.hooks:
+            self.instrument(*hook)
+
+    def _uninstall(self):
+        for owner, attr, orig, had in reversed(self._patched):
+            if had:
+                setattr(owner, attr, orig)
+            else:
+                delattr(owner, attr)
+        self._patched.clear()
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._install()
+        self._enter(self._total)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._exit(0)
+        self._uninstall()
+        if self._started_tracing:
+            tracemalloc.stop()
+        if exc_type is None or (exc_type is SystemExit and not exc.code):
+            self.write_report()
+        return False
+
+    def report(self) -> dict:
+        total = self._total.wall
+        stages = sorted((s for s in self.stages.values() if s.calls), key=lambda s: -s.wall)
+        hottest = stages[0].name if stages else None
+        rows = [{
+            "stage": s.name,
+            "calls": s.calls,
+            "rows": s.rows,
+            "wall_s": round(s.wall, 6),
+            "share": round(s.wall / total, 4) if total else None,
+            "tracemalloc_peak_kb": round(s.peak / 1024, 1),
+        } for s in stages]
+        return {
+            "script": Path(sys.argv[0]).as_posix(),
+            "argv": sys.argv[1:],
+            "total": {"wall_s": round(total, 6), "tracemalloc_peak_kb": round(self._total.peak / 1024, 1)},
+            "other_s": round(max(0.0, total - sum(s.wall for s in stages)), 6),
+            "stages": rows,
+            "hottest": hottest,
+            "cprofile": self.dump_path if (self.dump_path and hottest) else None,
+        }
+
+    def write_report(self):
+        rep = self.report()
+        if rep["cprofile"]:
+            Path(self.dump_path).parent.mkdir(parents=True, exist_ok=True)
+            self.stages[rep["hottest"]].cprofile.dump_stats(self.dump_path)
+        p = Path(self.report_path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(rep, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"[profile] {p}: total {rep['total']['wall_s']:.3f}s, hottest {rep['hottest']}")
@@ -0,0 +1,272 @@
+"""
+描述文本里的富文本标记：一次扫描切成 文本 / <color=…> / </color> / 换行 片段，并检查标记是否合法。
+
+  - <color=…> 与 </color> 必须配对，不能嵌套（游戏里嵌套和多余的标签会原样显示出来）
+  - 颜色为 #RRGGBB 或 #RRGGBBAA；给了调色板时，不在调色板里的颜色记为警告
+  - 编辑器里的换行是字面的 \\n（反斜杠 + n）；真实换行（\\r\\n / \\r / \\n）一律转成字面 \\n
+
+结果按字符串缓存：同一段描述（各职业强化表、各件圣遗物共用的套装块）只解析一次。
+生成脚本只需要校验时用 errors()：只扫描标签、不切片段，没有 "<" 的文本直接通过。
+合法片段首尾相接仍然合法，所以拼接出来的长描述只需校验各组成部分。
+
+  python rich_text.py                       # 检查仓库里所有 CSV 的文本单元格
+  python rich_text.py build/*.json --palette   # 检查生成结果，并报告调色板之外的颜色
+"""
+import re
+from functools import lru_cache
+
+NL = "\\n"  # 编辑器里的换行：字面的反斜杠 + n
+
+TEXT, OPEN, CLOSE, NEWLINE = "text", "open", "close", "newline"
+
+_TOKEN_RE = re.compile(r"<color=([^<>]*)>|</color>|\\n|\r\n|\r|\n")
+# 只找标签（校验用）；第三项是没能匹配成完整标签的残片
+_TAG_RE = re.compile(r"<color=([^<>]*)>|</color>|(?i:</?color\b)")
+# 整段合法的文本：不在标签里的 "<" 不能开头一个（残缺的）color 标签，标签成对且不嵌套。
+# 绝大多数文本合法，先用它整段匹配一次（在 C 里完成），不合法时再用 _scan 找出具体位置
+_VALID_RE = re.compile(r"(?:[^<]++|<(?!(?i:/?color\b))"
+                       r"|<color=#(?:[0-9A-Fa-f]{8}|[0-9A-Fa-f]{6})>(?:[^<]++|<(?!(?i:/?color\b)))*+</color>)*+")
+COLOR_RE = re.compile(r"#(?:[0-9A-Fa-f]{6}|[0-9A-Fa-f]{8})")
+
+# 现有表格与生成脚本用到的颜色（小写）
+DEFAULT_PALETTE = frozenset({
+    "#00aa88", "#00ccff", "#55ff55", "#6fdfff", "#71db60", "#80c0ff", "#80ffd7", "#86e1f1", "#99ff88",
+    "#ffffffbf", "#aaaaaa", "#ba7920", "#cc0000", "#cc66ff", "#f1c40f", "#ff5555", "#ff8844", "#ff9999",
+    "#ffacff", "#ffe699", "#ffff66",
+})
+
+
+def literal_newlines(s: str) -> str:
+    """把真实换行转成字面 \\n（原 upgrades.normalize_literal_newlines）。"""
+    if s is None:
+        return ""
+    if "\r" in s:
+        s = s.replace("\r\n", "\n").replace("\r", "\n")
+    return s.replace("\n", NL) if "\n" in s else s
+
+
+class Markup:
+    """
+    一段文本的解析结果（只读，按字符串缓存共享）。
+      tokens  [(类型, 值, 起始位置)]：TEXT 为原文，OPEN 为颜色值，CLOSE 为 ""，NEWLINE 为字面 \\n
+      errors  [(位置, 说明)]：标签不配对 / 嵌套 / 残缺、颜色格式不对
+    """
+
+    __slots__ = ("source", "tokens", "errors")
+
+    def __init__(self, source: str, tokens, errors):
+        self.source = source
+        self.tokens = tokens
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def colored(self) -> bool:
+        """是否已经带有成对的颜色标签。"""
+        kinds = {k for k, _, _ in self.tokens}
+        return OPEN in kinds and CLOSE in kinds
+
+    def colors(self) -> list:
+        return [v for k, v, _ in self.tokens if k == OPEN]
+
+    def plain(self) -> str:
+        """去掉标签后的文本（换行为字面 \\n）。"""
+        return "".join(v for k, v, _ in self.tokens if k in (TEXT, NEWLINE))
+
+    def normalized(self) -> str:
+        """原文，只把真实换行换成字面 \\n。"""
+        parts = []
+        for k, v, _ in self.tokens:
+            parts.append(f"<color={v}>" if k == OPEN else "</color>" if k == CLOSE else v)
+        return "".join(parts)
+
+    def problems(self, palette=None) -> list:
+        """errors，再加上调色板之外的颜色（palette 为 None 时不检查）。"""
+        out = list(self.errors)
+        if palette is not None:
+            for k, v, pos in self.tokens:
+                if k == OPEN and COLOR_RE.fullmatch(v) and v.lower() not in palette:
+                    out.append((pos, f"颜色不在调色板里: {v}"))
+        return sorted(out)
+
+
+def _scan(s: str) -> tuple:
+    """只扫描标签，返回 ((位置, 说明), ...)。"""
+    errors = []
+    open_at = None  # 当前未闭合的 <color> 的 (位置, 颜色)
+    for m in _TAG_RE.finditer(s):
+        pos, color = m.start(), m.group(1)
+        if color is not None:
+            if not COLOR_RE.fullmatch(color):
+                errors.append((pos, f"颜色格式不对: {color!r}（应为 #RRGGBB 或 #RRGGBBAA）"))
+            if open_at is not None:
+                errors.append((pos, f"<color> 嵌套：位置 {open_at[0]} 的 <color={open_at[1]}> 还没有闭合"))
+            open_at = (pos, color)
+        elif m.group(0) == "</color>":
+            if open_at is None:
+                errors.append((pos, "多余的 </color>"))
+            open_at = None
+        else:
+            errors.append((pos, f"残缺的标签: {s[pos:pos + 12]!r}"))
+    if open_at is not None:
+        errors.append((open_at[0], f"未闭合的 <color={open_at[1]}>"))
+    return tuple(errors)
+
+
+@lru_cache(maxsize=1 << 14)
+def errors(s: str) -> tuple:
+    """只做校验（生成时用）：不切片段，合法文本一次整段匹配即通过；按字符串缓存。"""
+    if "<" not in s or _VALID_RE.fullmatch(s):
+        return ()
+    return _scan(s)
+
+
+@lru_cache(maxsize=1 << 12)
+def parse(s: str) -> Markup:
+    tokens = []
+    pos = 0
+    for m in _TOKEN_RE.finditer(s):
+        if m.start() > pos:
+            tokens.append((TEXT, s[pos:m.start()], pos))
+        pos = m.end()
+        tok = m.group(0)
+        if m.group(1) is not None:
+            tokens.append((OPEN, m.group(1), m.start()))
+        elif tok == "</color>":
+            tokens.append((CLOSE, "", m.start()))
+        else:
+            tokens.append((NEWLINE, NL, m.start()))
+    if pos < len(s):
+        tokens.append((TEXT, s[pos:], pos))
+    return Markup(s, tuple(tokens), errors(s))
+
+
+def wrap(text: str, color: str) -> str:
+    """给文本上色；已经带有颜色标签的原样返回（upgrades 的 (a/b/c) 候选里可能已手动上色）。"""
+    t = text.strip()
+    if parse(t).colored:
+        return text
+    return f"<color={color}>{t}</color>"
+
+
+class Validator:
+    """
+    生成时收集不合法的文本，最后一起报错：
+
+        check = rich_text.Validator()
+        desc = check(build_desc(...), f"{path}:{line}")
+        ...
+        check.raise_errors()
+
+    同一出处只报告第一段有问题的文本（一行的各级描述往往错在同一处）。
+    """
+
+    def __init__(self, palette=None):
+        self.palette = palette
+        self.found = []  # [(出处, 位置, 说明, 原文)]
+        self._reported = set()
+
+    def __call__(self, s: str, where: str) -> str:
+        if where in self._reported:
+            return s
+        problems = errors(s) if self.palette is None else parse(s).problems(self.palette)
+        if problems:
+            self._reported.add(where)
+            self.found += [(where, pos, why, s) for pos, why in problems]
+        return s
+
+    def report(self) -> str:
+        return "\n".join(f"{where}: 第 {pos} 个字符: {why}\n    {s}" for where, pos, why, s in self.found)
+
+    def raise_errors(self):
+        if self.found:
+            raise SystemExit(f"{len(self.found)} 处富文本标记有误：\n{self.report()}")
+
+
+# ---------------- 检查命令 ----------------
+
+def _csv_texts(path: str):
+    import table_registry
+    t = table_registry.load(path)
+    for line, row in zip(t.lines, t.rows):
+        for col, v in zip(t.header, row):
+            if "<" in v or ">" in v:
+                yield f"{t.path}:{line} {col}", v
+
+
+def _json_texts(path: str):
+    import json
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    def walk(node, where):
+        if isinstance(node, dict):
+            if node.get("param_type") == "String" and isinstance(node.get("value"), str):
+                yield where, node["value"]
+            for v in node.values():
+                yield from walk(v, where)
+        elif isinstance(node, list):
+            for v in node:
+                yield from walk(v, where)
+
+    for i, entry in enumerate(data.get("value", [])):
+        key = entry.get("key", {}).get("value", i) if isinstance(entry, dict) else i
+        yield from walk(entry, f"{path} 键 {key}")
+
+
+def _txt_texts(path: str):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for n, line in enumerate(f, start=1):
+            yield f"{path}:{n}", line.rstrip("\r\n")
+
+
+def iter_texts(path: str):
+    """文件里需要检查的文本：CSV 各单元格、Dict JSON 的 String 值、TXT 各行。"""
+    p = str(path).lower()
+    if p.endswith(".csv"):
+        return _csv_texts(path)
+    if p.endswith(".json"):
+        return _json_texts(path)
+    return _txt_texts(path)
+
+
+def main():
+    import argparse, glob, sys
+    from pathlib import Path
+    ap = argparse.ArgumentParser(description="检查文本里的 <color=…>…</color> 标记（配对、嵌套、颜色格式）。")
+    ap.add_argument("paths", nargs="*", help="CSV / Dict JSON / TXT 文件（默认仓库里全部 CSV）")
+    ap.add_argument("--palette", nargs="?", const="", default=None,
+                    help="同时报告调色板之外的颜色；可给一个每行一个颜色的文件（默认内置调色板）")
+    ap.add_argument("--strict", action="store_true", help="调色板警告也算失败")
+    args = ap.parse_args()
+
+    root = Path(__file__).resolve().parent
+    paths = args.paths or sorted(glob.glob(str(root / "*.csv")) + glob.glob(str(root / "*" / "*.csv")))
+    palette = None
+    if args.palette is not None:
+        if args.palette:
+            palette = frozenset(l.strip().lower() for l in open(args.palette, encoding="utf-8") if l.strip())
+        else:
+            palette = DEFAULT_PALETTE
+
+    n_errors = n_warnings = checked = 0
+    for path in paths:
+        for where, s in iter_texts(path):
+            checked += 1
+            m = parse(s)
+            for pos, why in m.problems(palette):
+                is_error = (pos, why) in m.errors
+                n_errors += is_error
+                n_warnings += not is_error
+                print(f"{where}: 第 {pos} 个字符: {'' if is_error else '[警告] '}{why}")
+    info = errors.cache_info()
+    print(f"检查 {checked} 段文本（不同文本 {info.currsize} 段）：{n_errors} 个错误，{n_warnings} 个警告")
+    if n_errors or (args.strict and n_warnings):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+进程内共享的 CSV 表注册表：每个文件只解析、规整一次，各生成脚本拿到同一份只读视图。
+
+规整规则（原先每个脚本各写一遍）：
+  - utf-8-sig 读入，去掉 BOM
+  - 表头去首尾空白，None 视为 ""
+  - 数据行补齐到表头长度（多出的单元格保留）；完全空的行跳过
+单元格内容不做 strip，由使用方决定。
+
+按 (mtime, 大小) 判断文件是否变化：build.py 串行运行、watch.py 常驻时，
+同一文件只在内容变化后才重新解析。build.py 并行时先在主进程预加载，fork 出的工作进程直接共用。
+
+大文件（≥ PARALLEL_MIN_BYTES，且有多个核）分块并行解析：主进程 mmap 文件，按字节切成每核一块，
+切点挪到引号外的换行处（单元格里带引号的换行不会被切开），各工作进程自己 mmap 并解析一段，
+结果按原顺序拼接，与串行解析得到完全相同的行元组和行号。
+主进程仍要把每个单元格建成 str 对象（约为串行解析一半的时间），所以核再多也只能快到 2 倍左右。
+
+    t = table_registry.load("圣遗物套装.csv")
+    t.require(["名字", "ID"])
+    for rec in t.records():      # {列名: 值}，重名列取第一次出现
+        ...
+"""
+import contextlib, csv, gc, io, mmap, os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PARALLEL_MIN_BYTES = 32 << 20
+_BOM = b"\xef\xbb\xbf"
+_CELL, _REC = "\x1f", "\x1e"  # 工作进程传回行时的单元格 / 行分隔符
+
+_tables = {}
+_parses = Counter()
+
+
+class Table:
+    """一张 CSV 的只读视图：header、rows 都是元组，lines[i] 为 rows[i] 在文件中的起始行号。"""
+
+    __slots__ = ("path", "header", "rows", "lines", "_cols")
+
+    def __init__(self, path: str, header, rows, lines):
+        self.path = path
+        self.header = tuple(header)
+        self.rows = tuple(rows)
+        self.lines = tuple(lines)
+        cols = {}
+        for i, h in enumerate(self.header):
+            cols.setdefault(h, i)
+        self._cols = cols
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, col):
+        return col in self._cols
+
+    def index(self, col: str) -> int:
+        """列下标（重名列取第一次出现）；没有该列时 ValueError，与 list.index 一致。"""
+        try:
+            return self._cols[col]
+        except KeyError:
+            raise ValueError(f"{self.path}: 没有列 {col!r}") from None
+
+    def indexes(self, col: str) -> list:
+        """同名列的全部下标，按出现顺序（如 圣遗物套装.csv 的三个 状态效果ID）。"""
+        return [i for i, h in enumerate(self.header) if h == col]
+
+    def missing(self, cols) -> list:
+        return [c for c in cols if c not in self._cols]
+
+    def require(self, cols, what: str = None):
+        miss = self.missing(cols)
+        if miss:
+            raise SystemExit(f"{what or self.path} 缺少必需列: {'、'.join(miss)}；实际列：{list(self.header)}")
+
+    def column(self, col: str) -> tuple:
+        i = self.index(col)
+        return tuple(row[i] for row in self.rows)
+
+    def records(self):
+        """逐行产出 {列名: 值}（每次都是新 dict，改动不会影响注册表）。"""
+        cols = tuple(self._cols.items())
+        for row in self.rows:
+            yield {h: row[i] for h, i in cols}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """解析时暂停循环垃圾回收：几百万个只含 str 的元组不会成环，分代回收只是反复白扫。"""
+    was = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was:
+            gc.enable()
+
+
+def _read_rows(r, n: int, first_line: int):
+    """从 csv.reader 读出补齐到 n 列的行与各行起始行号；返回 (rows, lines, 读过的物理行数)。"""
+    rows, lines = [], []
+    start = r.line_num + first_line
+    for row in r:
+        if row:
+            if len(row) < n:
+                row += [""] * (n - len(row))
+            rows.append(tuple(row))
+            lines.append(start)
+        start = r.line_num + first_line
+    return rows, lines, r.line_num
+
+
+def _parse_chunk(path: str, begin: int, end: int, n: int):
+    """
+    工作进程：解析 [begin, end) 字节段，返回 (打包的行, 行数, 行号, 读过的物理行数)；行号从 1 起算。
+    行用 \x1f / \x1e 拼成一个字符串传回：pickle 几百万个小字符串比解析本身还慢，
+    一个大字符串传回后主进程 split 只要解析的一半时间。文本里本来就有这两个字符时直接传元组。
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[begin:end].decode("utf-8")
+    gc.disable()  # 工作进程只做这一件事
+    rows, lines, consumed = _read_rows(csv.reader(io.StringIO(text, newline="")), n, 1)
+    packed = rows if (_CELL in text or _REC in text) else _REC.join([_CELL.join(r) for r in rows])
+    return packed, len(rows), array("l", lines), consumed
+
+
+def _unpack(packed, count: int) -> list:
+    if not count:
+        return []
+    if not isinstance(packed, str):
+        return packed
+    return [tuple(r.split(_CELL)) for r in packed.split(_REC)]
+
+
+def split_points(mm, begin: int, parts: int) -> list:
+    """
+    把 [begin, len) 切成约 parts 段，返回各段起点 + 末尾。
+    切点是引号外的换行之后：到该处为止的 '"' 个数为偶数（转义的 "" 成对出现，不影响奇偶）。
+    """
+    size = len(mm)
+    points = [begin]
+    pos, quotes = begin, 0
+    for k in range(1, parts):
+        target = begin + (size - begin) * k // parts
+        if target <= points[-1]:
+            continue
+        quotes += mm[pos:target].count(b'"')
+        pos = target
+        while True:
+            nl = mm.find(b"\n", pos)
+            if nl < 0:
+                pos = size
+                break
+            quotes += mm[pos:nl].count(b'"')
+            pos = nl + 1
+            if quotes % 2 == 0:
+                break
+        if pos >= size:
+            break
+        points.append(pos)
+    points.append(size)
+    return points
+
+
+def _parse_parallel(path: str, workers: int):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        begin = len(_BOM) if mm[:len(_BOM)] == _BOM else 0
+        nl = mm.find(b"\n", begin)
+        body = len(mm) if nl < 0 else nl + 1
+        first = mm[begin:body]
+        # 表头在主进程读（它决定补齐的列数）；表头里有带引号的换行或单独的 \r 时退回串行解析
+        if first.count(b'"') % 2 or b"\r" in first.rstrip(b"\r\n"):
+            return None
+        header = [(h or "").strip() for h in next(csv.reader([first.decode("utf-8")]), [])]
+        points = split_points(mm, body, workers)
+    rows, lines = [], []
+    base = 1  # 已消耗的物理行数（表头占第 1 行）
+    with ProcessPoolExecutor(max_workers=len(points) - 1) as pool:
+        futures = [pool.submit(_parse_chunk, path, a, b, len(header)) for a, b in zip(points, points[1:])]
+        # 按顺序取结果：主进程拆前面的块时，后面的块还在工作进程里解析
+        for fut in futures:
+            packed, count, chunk_lines, consumed = fut.result()
+            rows += _unpack(packed, count)
+            lines += [base + ln for ln in chunk_lines]
+            base += consumed
+    return header, rows, lines
+
+
+def parse(path, workers: int = None) -> Table:
+    """
+    不经过缓存直接解析一个 CSV。
+    workers：并行解析的进程数；默认按 CPU 核数，文件小于 PARALLEL_MIN_BYTES 或只有一个核时串行。
+    """
+    workers = workers or os.cpu_count() or 1
+    parsed = None
+    size = os.path.getsize(path)
+    with _gc_paused():
+        if workers > 1 and size and size >= PARALLEL_MIN_BYTES:
+            parsed = _parse_parallel(str(path), workers)
+        if parsed is None:
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                r = csv.reader(f)
+                header = [(h or "").strip() for h in next(r, [])]
+                rows, lines, _ = _read_rows(r, len(header), 1)
+            parsed = header, rows, lines
+    _parses[Path(path).as_posix()] += 1
+    return Table(Path(path).as_posix(), *parsed)
+
+
+def load(path) -> Table:
+    """返回 path 的共享视图；文件自上次解析后没变则直接复用。"""
+    key = os.path.abspath(path)
+    stamp = _stat_key(key)
+    hit = _tables.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    table = parse(path)
+    _tables[key] = (stamp, table)
+    return table
+
+
+def preload(paths):
+    for p in paths:
+        if str(p).lower().endswith(".csv") and os.path.exists(p):
+            load(p)
+
+
+def parse_counts() -> dict:
+    """{路径: 解析次数}，用于确认每个文件只解析了一次。"""
+    return dict(_parses)
+
+
+def clear():
+    _tables.clear()
+    _parses.clear()
@@ -0,0 +1,233 @@
+"""
+声明式列模式 + 按列批量类型转换（取代各脚本里逐格 try/except 的 to_int_str）。
+
+    ITEMS = [
+        Column("卡牌标题", String),
+        Column("ID", ConfigReference),
+        Column("价格", Int32, default=0),
+    ]
+    cols = load_columns("圣遗物.csv", ITEMS, nonempty=("卡牌标题", "ID"))
+    for title, price in zip(cols["卡牌标题"], cols["价格"]):
+        ...
+
+列类型沿用 editor_types 的标量类型，另加 Percent：
+  String                      去首尾空白的 str
+  Int32                       int（array('l')），检查 Int32 范围；"5.0" 视为 5，"5.5" 报错
+  ConfigReference / EntityReference
+                              数字 ID 的 str（原样保留；"5.0" 规整为 "5"）
+  Percent                     float（array('d')）；"34%" → 0.34，也接受普通数字 "16.87"
+空单元格取 default；没有 default 的列出现空格即为错误。default=None 时空格为 None（此列存为 list）。
+
+每列只对不同的取值各转换一次（表里大量重复的颜色、价格、需求件数），纯数字走快速路径不抛异常。
+所有错误格一起报告（文件:行号: 列 = 值：原因），而不是悄悄变成 "0"。
+"""
+from array import array
+
+import table_registry
+from editor_types import INT32_MAX, INT32_MIN, ConfigReference, EntityReference, Int32, String
+
+_MISSING = object()
+
+
+class Percent:
+    """百分比 / 小数列的类型标记。"""
+    param_type = "Percent"
+
+
+class Column:
+    """
+    name      表头列名
+    kind      String / Int32 / ConfigReference / EntityReference / Percent
+    default   空单元格的取值；不给则空格为错误
+    nth       同名列中的第几个（圣遗物套装.csv 有三个 状态效果ID）
+    optional  表头里可以没有这一列（整列取 default）
+    key       在结果里的名字（默认 name，nth > 0 时为 "name#nth"）
+    """
+
+    __slots__ = ("name", "kind", "default", "nth", "optional", "key")
+
+    def __init__(self, name: str, kind, default=_MISSING, nth: int = 0, optional: bool = False, key: str = None):
+        if kind not in _CONVERTERS:
+            raise TypeError(f"不支持的列类型: {kind!r}")
+        if optional and default is _MISSING:
+            raise TypeError(f"可选列 {name} 需要 default")
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.nth = nth
+        self.optional = optional
+        self.key = key or (name if nth == 0 else f"{name}#{nth}")
+
+
+def _float(s: str) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        raise ValueError("不是数字") from None
+
+
+def _to_int(s: str) -> int:
+    try:
+        return int(s)
+    except ValueError:
+        f = _float(s)  # "5.0" 之类
+        if not f.is_integer():
+            raise ValueError("不是整数") from None
+        return int(f)
+
+
+def _int32(s: str) -> int:
+    n = int(s) if (s.isascii() and s.isdigit()) else _to_int(s)
+    if not INT32_MIN <= n <= INT32_MAX:
+        raise ValueError(f"超出 Int32 范围 [{INT32_MIN}, {INT32_MAX}]")
+    return n
+
+
+def _reference(s: str) -> str:
+    if s.isascii() and s.isdigit():
+        return s
+    n = _to_int(s)
+    if n < 0:
+        raise ValueError("引用 ID 不能为负")
+    return str(n)
+
+
+def _percent(s: str) -> float:
+    if s.endswith("%"):
+        return _float(s[:-1]) / 100
+    return _float(s)
+
+
+_CONVERTERS = {
+    String: None,
+    Int32: _int32,
+    ConfigReference: _reference,
+    EntityReference: _reference,
+    Percent: _percent,
+}
+
+_TYPECODES = {Int32: "l", Percent: "d"}
+
+
+def convert_column(values, col: Column):
+    """
+    批量转换一列原始单元格，返回 (结果, [(下标, 原值, 原因)])。
+    出错的格在结果里占位为 default（没有 default 时为 0 / ""），由调用方决定丢行还是报错。
+    """
+    conv = _CONVERTERS[col.kind]
+    default = col.default
+    fallback = default if default is not _MISSING else (0 if col.kind in _TYPECODES else "")
+    memo = {}
+    out = []
+    bad = []
+    for i, raw in enumerate(values):
+        hit = memo.get(raw)
+        if hit is None:
+            s = raw.strip()
+            if not s:
+                hit = (default, None) if default is not _MISSING else (fallback, "空单元格")
+            elif conv is None:
+                hit = (s, None)
+            else:
+                try:
+                    hit = (conv(s), None)
+                except (ValueError, OverflowError) as e:
+                    hit = (fallback, str(e) or "格式错误")
+            memo[raw] = hit
+        out.append(hit[0])
+        if hit[1] is not None:
+            bad.append((i, raw, hit[1]))
+    code = _TYPECODES.get(col.kind)
+    if code and default is not None:
+        out = array(code, out)
+    return out, bad
+
+
+class Columns:
+    """load_columns 的结果：按列存放的已转换数据，只含保留下来的行。"""
+
+    def __init__(self, table, index, data, errors):
+        self.table = table
+        self.index = index  # 保留行在 table.rows 里的下标
+        self.data = data
+        self.errors = errors  # [(行号, 列名, 原值, 原因)]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    @property
+    def lines(self):
+        return [self.table.lines[r] for r in self.index]
+
+    def raw_rows(self):
+        """保留行的原始单元格（需要模式之外的列时用，如 upgrades 描述后的 (过渡, 最终) 列）。"""
+        return [self.table.rows[r] for r in self.index]
+
+    def error_text(self) -> str:
+        return "\n".join(f"{self.table.path}:{line}: {col} = {raw!r}：{why}" for line, col, raw, why in self.errors)
+
+
+def load_columns(source, schema, nonempty=(), exclude=None, errors: str = "raise") -> Columns:
+    """
+    source     CSV 路径或 table_registry.Table
+    nonempty   这些列去空白后为空的行直接跳过（不参与转换，也不报错）
+    exclude    {列名: 值集合}：该列取这些值的行跳过（如表尾的 中位数 / 目标强度 统计行）
+    errors     "raise"：有错误格时列出全部并退出；"skip"：丢掉有错误格的行，错误留在 .errors 里
+    """
+    t = source if isinstance(source, table_registry.Table) else table_registry.load(source)
+    if not t.header:
+        raise SystemExit(f"{t.path} 缺少表头")
+
+    where = {}
+    missing = []
+    for col in schema:
+        found = t.indexes(col.name)
+        if len(found) > col.nth:
+            where[col.key] = found[col.nth]
+        elif col.optional:
+            where[col.key] = None
+        else:
+            missing.append(col.name if col.nth == 0 else f"{col.name}（第 {col.nth + 1} 个）")
+    for name in list(nonempty) + list(exclude or ()):
+        if name not in t and name not in missing:
+            missing.append(name)
+    if missing:
+        raise SystemExit(f"{t.path} 缺少必需列: {'、'.join(missing)}；实际列：{list(t.header)}")
+
+    rows = t.rows
+    keep = range(len(rows))
+    for name in nonempty:
+        i = t.index(name)
+        keep = [r for r in keep if rows[r][i].strip()]
+    for name, values in (exclude or {}).items():
+        i = t.index(name)
+        keep = [r for r in keep if rows[r][i].strip() not in values]
+    keep = list(keep)
+
+    data = {}
+    bad_cells = []
+    for col in schema:
+        i = where[col.key]
+        raw = [rows[r][i] for r in keep] if i is not None else [""] * len(keep)
+        data[col.key], bad = convert_column(raw, col)
+        bad_cells += [(k, col.name, v, why) for k, v, why in bad]
+
+    bad_cells.sort(key=lambda b: b[0])
+    errs = [(t.lines[keep[k]], name, v, why) for k, name, v, why in bad_cells]
+    result = Columns(t, keep, data, errs)
+    if errs and errors == "raise":
+        raise SystemExit(f"{len(errs)} 个单元格无法转换：\n{result.error_text()}")
+    if errs and errors == "skip":
+        drop = {k for k, *_ in bad_cells}
+        sel = [k for k in range(len(keep)) if k not in drop]
+        for key, values in data.items():
+            picked = [values[k] for k in sel]
+            data[key] = array(values.typecode, picked) if isinstance(values, array) else picked
+        result.index = [keep[k] for k in sel]
+    return result
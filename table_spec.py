@@ -0,0 +1,214 @@
+"""
+声明式表规格 → 专用的逐行编码函数。
+
+一张 Dict 表的规格只描述：键类型、structId、字段顺序、每个字段来自哪一列。
+
+    {
+      "key":       {"type": "Int32", "column": "序号"},
+      "struct_id": "1077936131",
+      "fields": [
+        {"type": "EntityReference", "column": "元件ID"},
+        {"type": "String", "column": "名字"},
+        {"type": "String", "column": "描述", "default": ""},
+        {"type": "Int32", "column": "数量", "default": 1}
+      ],
+      "skip_empty": ["名字"],     # 这些列为空的行跳过（可选）
+      "unique_key": true,         # 键重复时报错（可选）
+      "indent": 2                 # 输出缩进（可选，默认 2）
+    }
+
+字段来源：
+  {"type": T, "column": 列名, "nth": 同名列的第几个, "default": 空格取值, "optional": 表头可以没有此列}
+  {"type": T, "const": 常量}
+  {"type": "Int32", "row": 起始序号}     # 行号计数（artifact 的 Dict 键）
+同一来源出现多次（如 圣遗物套装 的 ID 既是键又是最后一个字段）只读一列。
+
+compile_spec() 用 editor_types.Encoder 对一条占位 entry 编码得到整段文本模板，
+再生成只做 `模板 % (各列取值)` 的函数；按规格缓存，每个进程只生成一次。
+列按 table_schema 一次转换并校验，逐行不再查列名、不再构造 Entry 对象，输出与 Encoder 逐字节一致。
+
+不需要专门脚本的表写在 table_specs.json，用本脚本生成：
+
+    python table_spec.py --table 道具 --csv 超级斗鸡/道具.csv --out build/道具.json
+"""
+import json, re, sys
+from json.encoder import encode_basestring as _quote
+from pathlib import Path
+
+import dict_json, editor_types, profiling, table_registry, table_schema
+from build_cache import open_output, run_cached
+from dict_json import DictJsonWriter
+from editor_types import SCALAR_TYPES, Encoder, Entry, Int32, String, Struct
+from table_schema import Column, load_columns
+
+
+SPECS_PATH = Path(__file__).resolve().parent / "table_specs.json"
+
+# 占位符用私用区字符包住，不会与 structId、常量等真实文本冲突
+_HOLE = re.compile('"\ue000(\\d+)\ue001"')
+_emitters = {}
+
+
+def _kind(f: dict):
+    try:
+        return SCALAR_TYPES[f["type"]]
+    except KeyError:
+        raise SystemExit(f"表规格：不支持的类型 {f.get('type')!r}（可用：{'、'.join(SCALAR_TYPES)}）") from None
+
+
+def plan(spec: dict):
+    """
+    返回 (schema, sources, slots)：
+      schema   传给 load_columns 的 Column 列表，每个不同的列来源一个
+      sources  emitter 各参数的来源：Column.key，或 ("row", 起始序号)
+      slots    键和各字段依次对应的参数下标（常量为 None）
+    """
+    schema, sources, slots, seen = [], [], [], {}
+    for f in [spec["key"]] + list(spec["fields"]):
+        kind = _kind(f)
+        if "const" in f:
+            slots.append(None)
+            continue
+        if "row" in f:
+            if kind is not Int32:
+                raise SystemExit("表规格：row 计数只能是 Int32")
+            src = ("row", int(f["row"]))
+        elif "column" in f:
+            sig = (kind, f["column"], f.get("nth", 0), f.get("default"), bool(f.get("optional")))
+            src = seen.get(sig)
+            if src is None:
+                src = seen[sig] = f"#{len(schema)}"
+                extra = {}
+                if "default" in f:
+                    extra["default"] = int(f["default"]) if kind is Int32 else str(f["default"])
+                schema.append(Column(f["column"], kind, nth=f.get("nth", 0), optional=bool(f.get("optional")),
+                                     key=src, **extra))
+        else:
+            raise SystemExit(f"表规格：字段需要 column / const / row 之一: {f}")
+        if src not in sources:
+            sources.append(src)
+        slots.append(sources.index(src))
+    return schema, sources, slots
+
+
+def _hole(kind, i: int):
+    s = object.__new__(kind)  # 绕过取值检查，占位符不是合法的 Int32 / 引用
+    s.value = f"\ue000{i}\ue001"
+    return s
+
+
+def emitter_source(spec: dict, indent: int = 2) -> tuple:
+    """(函数源码, % 模板)：函数按 plan() 的参数顺序接收各列的值，返回该 entry 在 value 数组中的文本。"""
+    _, sources, slots = plan(spec)
+    fields = [spec["key"]] + list(spec["fields"])
+    kinds = {}
+    nodes = []
+    for f, slot in zip(fields, slots):
+        kind = _kind(f)
+        if slot is None:
+            nodes.append(kind(f["const"]))
+        else:
+            kinds[slot] = kind
+            nodes.append(_hole(kind, slot))
+    text = Encoder(indent).node(Entry(nodes[0], Struct(spec["struct_id"], tuple(nodes[1:]))), 2)
+
+    fmt, args = [], []
+    for j, part in enumerate(_HOLE.split(text.replace("%", "%%"))):
+        if j % 2 == 0:
+            fmt.append(part)
+        elif kinds[int(part)] is String:
+            fmt.append("%s")
+            args.append(f"_quote(a{part})")
+        else:
+            # Int32 / 引用已由 table_schema 转换校验，只含数字和负号，无需转义
+            fmt.append('"%s"')
+            args.append(f"a{part}")
+    params = ", ".join(f"a{i}" for i in range(len(sources)))
+    src = f"def emit({params}):\n    return _T % ({', '.join(args)},)\n"
+    return src, "".join(fmt)
+
+
+def compile_spec(spec: dict, indent: int = 2):
+    """规格 → emit(*各列取值) -> str；同一规格在进程内只生成一次。"""
+    cache_key = (json.dumps(spec, ensure_ascii=False, sort_keys=True), indent)
+    emit = _emitters.get(cache_key)
+    if emit is None:
+        src, template = emitter_source(spec, indent)
+        scope = {"_T": template, "_quote": _quote}
+        exec(compile(src, f"<table_spec {spec['struct_id']}>", "exec"), scope)
+        emit = _emitters[cache_key] = scope["emit"]
+        emit.source = src
+    return emit
+
+
+def build_table(spec: dict, csv_path: str, out_path: str) -> int:
+    """按规格把一张 CSV 流式写成 Dict JSON，返回条目数。"""
+    indent = int(spec.get("indent", 2))
+    schema, sources, slots = plan(spec)
+    cols = load_columns(csv_path, schema, nonempty=spec.get("skip_empty", ()))
+
+    key_src = sources[slots[0]] if slots[0] is not None else None
+    if spec.get("unique_key") and isinstance(key_src, str):
+        first, dups = {}, []
+        for line, k in zip(cols.lines, cols[key_src]):
+            if k in first:
+                dups.append(f"{cols.table.path}:{line}: {spec['key']['column']} 重复: {k}（第 {first[k]} 行已出现）")
+            else:
+                first[k] = line
+        if dups:
+            raise SystemExit("\n".join(dups))
+
+    n = len(cols)
+    columns = [range(src[1], src[1] + n) if isinstance(src, tuple) else cols[src] for src in sources]
+    emit = compile_spec(spec, indent)
+    out = open_output(out_path)
+    with out as w, DictJsonWriter(w, spec["key"]["type"], spec["struct_id"], indent=indent) as writer:
+        write, emit = writer.write_text, writer.use_emitter(emit)
+        for values in zip(*columns):
+            write(emit(*values))
+    print(f"{'Wrote' if out.changed else 'Unchanged'} {out_path} ({writer.count} entries)")
+    return writer.count
+
+
+def load_specs(path=SPECS_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("tables", {})
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="按 table_specs.json 里的规格把 CSV 生成 Dict JSON（无需专门脚本）。")
+    ap.add_argument("--table", required=True, help="规格名（table_specs.json 中 tables 的键）")
+    ap.add_argument("--csv", required=True, help="输入 CSV")
+    ap.add_argument("--out", required=True, help="输出 JSON 路径")
+    ap.add_argument("--specs", default=str(SPECS_PATH), help="规格文件（默认仓库根目录的 table_specs.json）")
+    ap.add_argument("--struct-id", default="", help="覆盖规格中的 structId")
+    ap.add_argument("--show-emitter", action="store_true", help="打印生成的逐行编码函数后退出")
+    ap.add_argument("--cache-dir", default="", help="增量构建缓存目录（为空则不使用缓存）")
+    profiling.add_arguments(ap)
+    args = ap.parse_args()
+
+    specs = load_specs(args.specs)
+    if args.table not in specs:
+        raise SystemExit(f"{args.specs} 中没有表规格 {args.table!r}；已有：{'、'.join(specs)}")
+    spec = dict(specs[args.table])
+    if args.struct_id:
+        spec["struct_id"] = args.struct_id
+
+    if args.show_emitter:
+        src, template = emitter_source(spec, int(spec.get("indent", 2)))
+        print(f"_T = {template!r}\n\n{src}", end="")
+        return
+
+    with profiling.from_args(args, hooks=[(sys.modules[__name__], "compile_spec", "compile")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.csv], outputs=[args.out],
+            params={"spec": spec},
+            sources=[__file__, dict_json.__file__, editor_types.__file__, table_registry.__file__, table_schema.__file__],
+            build=lambda: build_table(spec, args.csv, args.out),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,35 @@
-import csv, json, re, sys
+import re, sys
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from pathlib import Path
 
+import dict_json, editor_types, profiling, rich_text, table_registry, table_schema
+from build_cache import open_output, run_cached
+from dict_json import DictJsonWriter
+from editor_types import ConfigReference, Entry, Int32, String, Struct, StructList
+from rich_text import NL, literal_newlines
+from table_schema import Column, load_columns
+
 DEFAULT_OUTER_STRUCT_ID = "1077936138"
 DEFAULT_INNER_STRUCT_ID = "1077936139"
 DEFAULT_ALT_COLOR = "#86e1f1"
 
-def to_int_str(v, default="0"):
-    s = str(v).strip() if v is not None else ""
-    if s == "":
-        return default
-    try:
-        return str(int(float(s)))
-    except Exception:
-        return default
+UPGRADE_COLUMNS = [
+    Column("名字", String),
+    Column("上限", Int32, default=None),  # 空 = 按描述里 (a/b/c) 的组长推出级数
+    Column("状态ID", ConfigReference, default="0"),
+    Column("描述", String, default=""),  # 只用于检查表头；模板取原始单元格（不去空白）
+]
 
 # Find "(...)" groups
 PAREN_RE = re.compile(r"\(([^()]*)\)")
+# 数值候选："×2" / "3" / "1.5" / "20%"；去掉颜色标签后整段匹配
+VALUE_RE = re.compile(r"[×xX*+]?\s*(-?\d+(?:\.\d+)?)\s*(%?)")
+BASIS_POINTS = 10000  # 百分数与小数按万分比存成 Int32：20% → 2000，1.5 → 15000
 
 def split_alts(s: str):
     return [part.strip() for part in s.split("/")]
 
-def collect_groups(desc: str):
-    groups = []
-    for m in PAREN_RE.finditer(desc):
-        groups.append(split_alts(m.group(1)))
-    return groups
-
 def derive_level_count(groups, limit_int: int):
     if not groups:
         return max(1, limit_int or 1)
@@ -34,183 +38,241 @@ def derive_level_count(groups, limit_int: int):
         return min(max_alts, limit_int)
     return max_alts
 
-def wrap_color(text: str, color: str):
-    t = text.strip()
-    if "<color=" in t and "</color>" in t:
-        return text  # already colored
-    return f"<color={color}>{t}</color>"
+def parse_group_values(alts):
+    """
+    一组 (a/b/c) 候选 → (倍率, (各级整数值...))；不是数值组（有候选不是数字）返回 None。
+    全为整数时倍率为 1、值原样；有百分数或小数时倍率为 BASIS_POINTS，值为万分比。
+    百分数与普通数字混用、万分比不是整数、超出 Int32 时抛 ValueError。
+    """
+    found = [VALUE_RE.fullmatch(rich_text.parse(a).plain().strip()) for a in alts]
+    if not all(found):
+        return None
+    percent = {m.group(2) for m in found}
+    if len(percent) > 1:
+        raise ValueError(f"百分数与普通数字混用: ({'/'.join(alts)})")
+    numbers = [Decimal(m.group(1)) for m in found]
+    if "%" in percent:
+        numbers = [n / 100 for n in numbers]
+    scale = 1 if ("%" not in percent and all(n == n.to_integral_value() for n in numbers)) else BASIS_POINTS
+    values = []
+    for n in numbers:
+        v = n * scale
+        if v != v.to_integral_value():
+            raise ValueError(f"{n} 换成万分比不是整数: ({'/'.join(alts)})")
+        values.append(int(Int32(int(v)).value))
+    return scale, tuple(values)
 
-def normalize_literal_newlines(s: str) -> str:
-    """Ensure the string contains literal backslash+n sequences, not actual newline chars."""
-    if s is None:
+@lru_cache(maxsize=4096)
+def template_values(desc: str):
+    """
+    描述模板里的数值组，返回 ((倍率, 各级值), ...) 与无法转换的组（按模板缓存）。
+    只在要输出数值（--value-struct-id）时调用；纯文本输出不解析数值。
+    """
+    problems = []
+    numeric = []
+    for g in compile_template(desc, "")[2]:
+        if len(g) < 2:
+            continue
+        try:
+            parsed = parse_group_values(g)
+        except (ValueError, InvalidOperation) as e:
+            problems.append(str(e))
+            continue
+        if parsed:
+            numeric.append(parsed)
+    return tuple(numeric), tuple(problems)
+
+def uneven_groups(groups) -> str:
+    """有多个候选的 (a/b/c) 组长度不一致时返回提示（短的组在高等级重复最后一个候选），否则为空。"""
+    multi = [g for g in groups if len(g) > 1]
+    if len({len(g) for g in multi}) < 2:
         return ""
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = s.replace("\n", "\\n")
-    return s
-
-def build_final_text(desc_template: str, groups, level_idx: int, alt_color: str, prefix_newline: bool):
-    gi = 0
-    def repl(m):
-        nonlocal gi
-        alts = groups[gi] if gi < len(groups) else [""]
-        choice = alts[level_idx] if level_idx < len(alts) else alts[-1]
-        gi += 1
+    return f"(a/b/c) 组的候选数不一致：{'、'.join('(' + '/'.join(g) + ')' for g in multi)}"
+
+def build_level_values(numeric, level_idx: int, value_struct_id: str):
+    """第 level_idx 级的数值列表：每个数值组一项 (数值, 倍率)，超出组长时取最后一个候选（与文本一致）。"""
+    return StructList(value_struct_id, [
+        Struct(value_struct_id, (Int32(values[min(level_idx, len(values) - 1)]), Int32(scale)))
+        for scale, values in numeric
+    ])
+
+wrap_color = rich_text.wrap  # 已带颜色标签的候选原样保留
+
+@lru_cache(maxsize=4096)
+def compile_template(desc: str, alt_color: str):
+    """
+    把 描述 模板解析一次，得到 (statics, slots, groups, has_cr)：
+      statics —— len(slots)+1 段静态文本
+      slots   —— 每个 "(a/b/c)" 组的候选文本（已上色）
+      groups  —— 原始候选（供 derive_level_count 使用）
+    不含 \\r 时各段已转成字面 \\n（逐字符替换，可分段做）；
+    含 \\r 时 \\r\\n 可能跨段拼接，留到渲染后整体转换。
+    同一张表里重复的模板只解析一次。
+    """
+    has_cr = "\r" in desc
+    norm = (lambda t: t) if has_cr else literal_newlines
+    statics, slots, groups = [], [], []
+    pos = 0
+    for m in PAREN_RE.finditer(desc):
+        statics.append(norm(desc[pos:m.start()]))
+        alts = split_alts(m.group(1))
+        groups.append(tuple(alts))
         if alt_color:
-            choice = wrap_color(choice, alt_color)
-        return choice
-    s = PAREN_RE.sub(repl, desc_template)
-    s = normalize_literal_newlines(s)
-    if prefix_newline and not s.startswith("\\n"):
-        s = "\\n" + s
-    return s
-
-def derive_pairs_from_desc(desc: str, limit: str, alt_color: str, prefix_newline: bool):
-    try:
-        limit_int = int(float(str(limit).strip())) if str(limit).strip() else 0
-    except Exception:
-        limit_int = 0
-    groups = collect_groups(desc)
-    n_levels = derive_level_count(groups, limit_int)
-    finals = [build_final_text(desc, groups, i, alt_color=alt_color, prefix_newline=prefix_newline) for i in range(n_levels)]
-    pairs = []
-    if n_levels == 1:
-        pairs.append((finals[0], finals[0]))
-    else:
-        pairs.append((finals[0], finals[0]))
-        for i in range(1, n_levels):
-            trans = finals[i-1] + "\\n\\n↓\\n\\n" + finals[i]
-            pairs.append((trans, finals[i]))
+            alts = [wrap_color(a, alt_color) for a in alts]
+        slots.append(tuple(norm(a) for a in alts))
+        pos = m.end()
+    statics.append(norm(desc[pos:]))
+    return tuple(statics), tuple(slots), tuple(groups), has_cr
+
+def render_levels(compiled, n_levels: int, prefix_newline: bool):
+    """按等级批量渲染最终文本，不再扫描模板。"""
+    statics, slots, _, has_cr = compiled
+    finals = []
+    for i in range(n_levels):
+        parts = [statics[0]]
+        for alts, static in zip(slots, statics[1:]):
+            parts.append(alts[i] if i < len(alts) else alts[-1])
+            parts.append(static)
+        s = "".join(parts)
+        if has_cr:
+            s = literal_newlines(s)
+        if prefix_newline and not s.startswith(NL):
+            s = NL + s
+        finals.append(s)
+    return finals
+
+def derive_pairs_from_desc(desc: str, limit, alt_color: str, prefix_newline: bool):
+    """limit: 上限（int 或数字字符串）；None / 空 / 0 表示不限，按组长推出级数。"""
+    limit_int = int(limit or 0)
+    compiled = compile_template(desc, alt_color or "")
+    n_levels = derive_level_count(compiled[2], limit_int)
+    finals = render_levels(compiled, n_levels, prefix_newline=prefix_newline)
+    pairs = [(finals[0], finals[0])]
+    for i in range(1, n_levels):
+        trans = finals[i-1] + "\\n\\n↓\\n\\n" + finals[i]
+        pairs.append((trans, finals[i]))
     return pairs, str(n_levels)
 
-def build_level_struct(transition_text: str, final_text: str, inner_struct_id: str):
-    transition_text = normalize_literal_newlines(transition_text)
-    final_text = normalize_literal_newlines(final_text)
-    return {
-        "param_type": "Struct",
-        "value": {
-            "structId": inner_struct_id,
-            "type": "Struct",
-            "value": [
-                {"param_type": "String", "value": transition_text},
-                {"param_type": "String", "value": final_text},
-            ],
-        },
-    }
-
-def build_entry_row(name: str, limit_val: str, state_id: str, desc: str,
+def build_level_struct(transition_text: str, final_text: str, inner_struct_id: str, values=None):
+    transition_text = literal_newlines(transition_text)
+    final_text = literal_newlines(final_text)
+    fields = (String(transition_text), String(final_text))
+    return Struct(inner_struct_id, fields if values is None else fields + (values,))
+
+def build_entry_row(name: str, limit_val, state_id: str, desc: str,
                     pairs: list, outer_struct_id: str, inner_struct_id: str,
-                    alt_color: str, prefix_newline: bool):
+                    alt_color: str, prefix_newline: bool, value_struct_id: str = ""):
+    """
+    limit_val: int 上限，None 表示表里没填；state_id: 数字 ID 字符串。
+    value_struct_id 非空时，每级 Struct 末尾再加一个 StructList：描述里各数值组在该级的 (数值, 倍率)。
+    """
     level_values = []
     if not pairs:
         pairs, computed_levels = derive_pairs_from_desc(desc, limit_val,
                                                         alt_color=alt_color,
                                                         prefix_newline=prefix_newline)
-        limit_val = to_int_str(limit_val or computed_levels, default=computed_levels)
+        if limit_val is None:
+            limit_val = computed_levels
     else:
         fixed = []
         for (t, f) in pairs:
-            t = normalize_literal_newlines(str(t))
-            f = normalize_literal_newlines(str(f) if (f is not None and str(f).strip() != "") else str(t))
+            t = literal_newlines(str(t))
+            f = literal_newlines(str(f) if (f is not None and str(f).strip() != "") else str(t))
             fixed.append((t, f))
         pairs = fixed
 
-    for (t, f) in pairs:
-        level_values.append(build_level_struct(t, f, inner_struct_id))
-
-    return {
-        "key": {"param_type": "String", "value": name},
-        "value": {
-            "param_type": "Struct",
-            "value": {
-                "structId": outer_struct_id,
-                "type": "Struct",
-                "value": [
-                    {"param_type": "String", "value": name},
-                    {
-                        "param_type": "StructList",
-                        "value": {"structId": inner_struct_id, "value": level_values}
-                    },
-                    # 1) limit stays as-is
-                    {"param_type": "Int32", "value": to_int_str(limit_val, default=str(len(level_values)))},
-                    # 2) current state must be 0
-                    {"param_type": "Int32", "value": "0"},
-                    # 3) ConfigReference is the 状态ID from CSV (not 0)
-                    {"param_type": "ConfigReference", "value": to_int_str(state_id, default="0")},
-                ],
-            },
-        },
-    }
+    numeric = template_values(desc)[0] if value_struct_id else None
+    for i, (t, f) in enumerate(pairs):
+        values = build_level_values(numeric, i, value_struct_id) if value_struct_id else None
+        level_values.append(build_level_struct(t, f, inner_struct_id, values))
 
+    return Entry(String(name), Struct(outer_struct_id, (
+        String(name),
+        StructList(inner_struct_id, level_values),
+        # 1) limit stays as-is
+        Int32(len(level_values) if limit_val is None else limit_val),
+        # 2) current state must be 0
+        Int32("0"),
+        # 3) ConfigReference is the 状态ID from CSV (not 0)
+        ConfigReference(state_id),
+    )))
 
-def parse_csv(path_csv: str, outer_struct_id: str, inner_struct_id: str, alt_color: str, prefix_newline: bool):
-    entries = []
-    with open(path_csv, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.reader(f)
-        try:
-            header = next(r)
-        except StopIteration:
-            return entries
 
-        header = [(h or "").strip() for h in header]
-        try:
-            idx_name = header.index("名字")
-            idx_limit = header.index("上限")
-            idx_state = header.index("状态ID")
-            idx_desc = header.index("描述")
-        except ValueError:
-            raise SystemExit(f"CSV 缺少必需列（名字/上限/状态ID/描述）。实际列: {header}")
-
-        for row in r:
-            if len(row) < len(header):
-                row = row + [""] * (len(header) - len(row))
-
-            name = (row[idx_name] or "").strip()
-            if not name:
-                continue
-            limit_val = row[idx_limit] if idx_limit < len(row) else ""
-            state_id  = row[idx_state]  if idx_state  < len(row) else ""
-            desc      = row[idx_desc]   if idx_desc   < len(row) else ""
-
-            # optional explicit (transition, final) pairs after 描述
-            tail = row[idx_desc+1:] if (idx_desc+1) <= len(row) else []
-            while tail and (tail[-1] is None or str(tail[-1]).strip() == ""):
-                tail.pop()
-
-            pairs = []
-            i = 0
-            while i < len(tail):
-                t = tail[i] if i < len(tail) else ""
-                f = tail[i+1] if (i+1) < len(tail) else t
-                pairs.append((str(t), str(f)))
-                i += 2
-
-            entries.append(
-                build_entry_row(
-                    name, limit_val, state_id, desc, pairs,
-                    outer_struct_id, inner_struct_id,
-                    alt_color=alt_color, prefix_newline=prefix_newline
-                )
-            )
-
-    return entries
+def iter_entries(path_csv: str, outer_struct_id: str, inner_struct_id: str, alt_color: str, prefix_newline: bool,
+                 value_struct_id: str = ""):
+    """
+    Yield one Dict entry per CSV row (streaming; nothing is accumulated).
+    Level texts are checked with rich_text; bad <color> markup is reported after the last row.
+    Derived transitions are two checked finals joined by plain text, so only the finals are checked.
+    (a/b/c) groups of unequal length are printed as warnings (the short groups repeat their last alternative);
+    with value_struct_id, groups that cannot be converted to numbers are fatal like bad markup.
+    """
+    t = table_registry.load(path_csv)
+    if not t.header:
+        return
+    # 名字为空的行跳过；上限 / 状态ID 按列一次转换，坏单元格一起报错
+    cols = load_columns(t, UPGRADE_COLUMNS, nonempty=("名字",))
+    idx_desc = t.index("描述")
+    check = rich_text.Validator()
+    template_warnings, template_problems = [], []
+
+    rows = zip(cols.lines, cols["名字"], cols["上限"], cols["状态ID"], cols.raw_rows())
+    for line, name, limit_val, state_id, row in rows:
+        desc = row[idx_desc]
+
+        # optional explicit (transition, final) pairs after 描述
+        tail = list(row[idx_desc+1:]) if (idx_desc+1) <= len(row) else []
+        while tail and (tail[-1] is None or str(tail[-1]).strip() == ""):
+            tail.pop()
+
+        pairs = []
+        i = 0
+        while i < len(tail):
+            trans = tail[i] if i < len(tail) else ""
+            final = tail[i+1] if (i+1) < len(tail) else trans
+            pairs.append((str(trans), str(final)))
+            i += 2
+
+        explicit = bool(pairs)
+        if not explicit:
+            uneven = uneven_groups(compile_template(desc, alt_color or "")[2])
+            if uneven:
+                template_warnings.append(f"{t.path}:{line} {name}: {uneven}")
+        if value_struct_id:
+            template_problems += [f"{t.path}:{line} {name}: {p}" for p in template_values(desc)[1]]
+        entry = build_entry_row(
+            name, limit_val, state_id, desc, pairs,
+            outer_struct_id, inner_struct_id,
+            alt_color=alt_color, prefix_newline=prefix_newline, value_struct_id=value_struct_id
+        )
+        for level in entry.value.fields[1].items:
+            for text in (level.fields[:2] if explicit else level.fields[1:2]):
+                check(text.value, f"{t.path}:{line} {name}")
+        yield entry
+    for w in template_warnings:
+        print(f"[警告] {w}")
+    check.raise_errors()
+    if template_problems:
+        raise SystemExit(f"{len(template_problems)} 处描述模板有误：\n" + "\n".join(template_problems))
+
+def parse_csv(path_csv: str, outer_struct_id: str, inner_struct_id: str, alt_color: str, prefix_newline: bool,
+              value_struct_id: str = ""):
+    return [e.to_obj() for e in iter_entries(path_csv, outer_struct_id, inner_struct_id, alt_color=alt_color,
+                                             prefix_newline=prefix_newline, value_struct_id=value_struct_id)]
 
 def build_json(path_csv: str, out_path: str,
                outer_struct_id: str = DEFAULT_OUTER_STRUCT_ID,
                inner_struct_id: str = DEFAULT_INNER_STRUCT_ID,
                alt_color: str = DEFAULT_ALT_COLOR,
-               prefix_newline: bool = True):
-    entries = parse_csv(path_csv, outer_struct_id, inner_struct_id, alt_color=alt_color, prefix_newline=prefix_newline)
-    obj = {
-        "type": "Dict",
-        "key_type": "String",
-        "value_type": "Struct",
-        "value": entries,
-        "value_structId": outer_struct_id
-    }
+               prefix_newline: bool = True,
+               value_struct_id: str = ""):
+    entries = iter_entries(path_csv, outer_struct_id, inner_struct_id, alt_color=alt_color, prefix_newline=prefix_newline,
+                           value_struct_id=value_struct_id)
     outp = Path(out_path)
-    outp.parent.mkdir(parents=True, exist_ok=True)
-    with open(outp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    out = open_output(outp)
+    with out as f, DictJsonWriter(f, "String", outer_struct_id, indent=2) as writer:
+        writer.write_all(entries)
+    print(f"Wrote {outp}" if out.changed else f"Unchanged {outp}")
     return str(outp)
 
 if __name__ == "__main__":
@@ -224,7 +286,28 @@ if __name__ == "__main__":
     ap.add_argument("--inner-struct-id", dest="inner_struct_id", default=DEFAULT_INNER_STRUCT_ID, help="Inner structId for levels (default 1077936139)")
     ap.add_argument("--alt-color", default=DEFAULT_ALT_COLOR, help="Color for '(a/b/c)' alternatives (e.g., #86e1f1). Empty to disable.")
     ap.add_argument("--no-prefix-newline", action="store_true", help="Do not prefix derived strings with literal '\\n'.")
+    ap.add_argument("--value-struct-id", default="",
+                    help="StructId of (value, scale) rows; when set, each level also gets the numeric values of its "
+                         "(a/b/c) groups (ints as-is, percentages/decimals in basis points, scale 10000). Empty = text only.")
+    ap.add_argument("--cache-dir", default="", help="Incremental build cache directory (empty = no cache).")
+    profiling.add_arguments(ap)
     args = ap.parse_args()
-    path = build_json(args.csv, args.out, args.outer_struct_id, args.inner_struct_id,
-                      alt_color=(args.alt_color or ""), prefix_newline=(not args.no_prefix_newline))
-    print(f"Wrote {path}")
\ No newline at end of file
+
+    def build():
+        build_json(args.csv, args.out, args.outer_struct_id, args.inner_struct_id,
+                   alt_color=(args.alt_color or ""), prefix_newline=(not args.no_prefix_newline),
+                   value_struct_id=args.value_struct_id)
+
+    with profiling.from_args(args, hooks=[(sys.modules[__name__], "derive_pairs_from_desc", "template_expand")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.csv], outputs=[args.out],
+            params={
+                "outer_struct_id": args.outer_struct_id, "inner_struct_id": args.inner_struct_id,
+                "alt_color": args.alt_color or "", "prefix_newline": not args.no_prefix_newline,
+                "value_struct_id": args.value_struct_id,
+            },
+            sources=[__file__, dict_json.__file__, editor_types.__file__, rich_text.__file__, table_registry.__file__,
+                     table_schema.__file__],
+            build=build,
+        )
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+监视模式：常驻进程监视 build_manifest.json 里各表的输入 CSV，保存后只重建依赖它的表。
+
+  python watch.py                 # 监视全部表
+  python watch.py 怪物 圣遗物      # 只监视这些表的输入
+  python watch.py --poll          # 不用 inotify，改为轮询 mtime/size
+
+Linux 上用 inotify 监视输入所在的目录（覆盖编辑器先写临时文件再改名的保存方式），
+其它平台或 inotify 不可用时退回轮询。连续多次保存在 --debounce 时间内合并为一次重建；
+内容没变的保存（只改了 mtime）不触发重建。生成脚本在本进程内运行，
+清单、依赖图和已导入的共用模块一直留在内存里，省掉每次启动解释器的开销。
+"""
+import argparse, ctypes, os, select, struct, sys, time
+from pathlib import Path
+
+import build
+from build_cache import file_digest
+
+DEFAULT_INTERVAL = 0.05
+DEFAULT_DEBOUNCE = 0.05
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """监视若干目录，wait() 返回这段时间内被写入 / 改名覆盖的文件路径集合。"""
+
+    def __init__(self, dirs):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        for d in dirs:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(d or "."), mask)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {d}")
+            self._dirs[wd] = d
+
+    def wait(self, timeout: float) -> set:
+        ready, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        pos = 0
+        while pos + _IN_EVENT.size <= len(data):
+            wd, _mask, _cookie, n = _IN_EVENT.unpack_from(data, pos)
+            pos += _IN_EVENT.size
+            name = data[pos:pos + n].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            pos += n
+            if wd in self._dirs and name:
+                changed.add(Path(self._dirs[wd], name).as_posix())
+        return changed
+
+
+class PollingWatcher:
+    """按 (mtime, size) 轮询文件列表。"""
+
+    def __init__(self, paths):
+        self._stats = {p: self._stat(p) for p in paths}
+
+    @staticmethod
+    def _stat(p):
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def wait(self, timeout: float) -> set:
+        time.sleep(max(0.0, timeout))
+        changed = set()
+        for p, old in self._stats.items():
+            cur = self._stat(p)
+            if cur != old:
+                self._stats[p] = cur
+                changed.add(p)
+        return changed
+
+
+def make_watcher(paths, poll: bool = False):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(sorted({str(Path(p).parent) for p in paths}))
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
+
+
+def dependents(tables, deps, names) -> list:
+    """names 以及所有（传递）依赖它们的表，按清单顺序。"""
+    hit = set(names)
+    grew = True
+    while grew:
+        grew = False
+        for t in tables:
+            if t["name"] not in hit and deps[t["name"]] & hit:
+                hit.add(t["name"])
+                grew = True
+    return [t for t in tables if t["name"] in hit]
+
+
+class Watcher:
+    def __init__(self, tables, deps):
+        self.tables = tables
+        self.deps = deps
+        produced = {p for t in tables for _, p in t["outputs"]}
+        # 输入路径 -> 直接读取它的表；其它表的输出不监视（重建时按依赖连带）
+        self.readers = {}
+        for t in tables:
+            for _, p in t["inputs"]:
+                if p not in produced:
+                    self.readers.setdefault(Path(p).as_posix(), []).append(t["name"])
+        self.digests = {p: file_digest(p) for p in self.readers}
+
+    def changed_inputs(self, paths) -> list:
+        """内容确实变了的输入（同时更新内存中的摘要）。"""
+        out = []
+        for p in sorted(paths):
+            d = file_digest(p)
+            if d != self.digests.get(p):
+                self.digests[p] = d
+                out.append(p)
+        return out
+
+    def rebuild(self, paths) -> float:
+        names = {n for p in paths for n in self.readers[p]}
+        todo = dependents(self.tables, self.deps, names)
+        t0 = time.perf_counter()
+        build.run_build(todo, self.deps, jobs=1)
+        return time.perf_counter() - t0
+
+    def run(self, watcher, debounce: float = DEFAULT_DEBOUNCE, interval: float = DEFAULT_INTERVAL):
+        pending = set()
+        deadline = None
+        while True:
+            timeout = interval if deadline is None else min(interval, deadline - time.perf_counter())
+            for p in watcher.wait(timeout):
+                if p in self.readers:
+                    pending.add(p)
+                    deadline = time.perf_counter() + debounce
+            if pending and time.perf_counter() >= deadline:
+                paths = self.changed_inputs(pending)
+                pending.clear()
+                deadline = None
+                if paths:
+                    secs = self.rebuild(paths)
+                    print(f"[watch] {', '.join(paths)} → rebuilt in {secs * 1000:.1f} ms", flush=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="监视输入 CSV，保存后只重建受影响的表。")
+    ap.add_argument("tables", nargs="*", help="只监视这些表（默认全部）")
+    ap.add_argument("--manifest", default=build.DEFAULT_MANIFEST, help=f"清单路径（默认 {build.DEFAULT_MANIFEST}）")
+    ap.add_argument("--out-dir", default="", help="覆盖清单中的 out_dir")
+    ap.add_argument("--poll", action="store_true", help="强制轮询（默认 Linux 上用 inotify）")
+    ap.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help=f"轮询间隔秒数（默认 {DEFAULT_INTERVAL}）")
+    ap.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help=f"合并连续保存的静默时间（默认 {DEFAULT_DEBOUNCE}s）")
+    ap.add_argument("--no-initial", action="store_true", help="启动时不先完整构建一次")
+    args = ap.parse_args()
+
+    os.chdir(build.ROOT)
+    tables = build.load_manifest(args.manifest, out_dir=args.out_dir or None)
+    deps = build.resolve_deps(tables)
+    tables = build.select_tables(tables, deps, args.tables)
+    w = Watcher(tables, deps)
+    if not args.no_initial:
+        build.run_build(tables, deps, jobs=1)
+    watcher = make_watcher(w.readers, poll=args.poll)
+    print(f"[watch] {type(watcher).__name__}: {len(w.readers)} 个输入，Ctrl+C 退出", flush=True)
+    try:
+        w.run(watcher, debounce=args.debounce, interval=args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
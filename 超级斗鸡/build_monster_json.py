@@ -1,8 +1,16 @@
 # build_monsters_json.py
-import csv
-import json
+import sys
 from pathlib import Path
 
+HERE = Path(__file__).resolve().parent
+sys.path[:0] = [str(HERE), str(HERE.parent)]  # 本目录 + 仓库根目录的共用模块
+import dict_json, editor_types, profiling, table_registry, table_schema
+import monster_strength
+from build_cache import open_output, run_cached
+from dict_json import DictJsonWriter
+from editor_types import Entry, EntityReference, Int32, String, Struct
+from table_schema import Column, load_columns
+
 DEFAULT_STRUCT_ID = "1077936130"
 
 # CSV column names (change here if your headers differ)
@@ -13,73 +21,49 @@ COL_MIN_SPAWN = "最小生成"   # 第三个 Int32 = 最小生成
 
 FOOTER_ROWS = {"中位数", "生命值权重", "目标强度"}
 
-def to_int_str(v: str) -> str:
-    """Convert numeric-like string to integer string. '5.0' -> '5'."""
-    s = str(v or "").strip()
-    if not s:
-        raise ValueError("empty")
-    return str(int(float(s)))
+# The last two are only read when the strength is not recomputed
+MONSTER_COLUMNS = [
+    Column(COL_NAME, String),
+    Column(COL_ENTITY_ID, EntityReference),
+    Column(COL_STRENGTH, Int32),
+    Column(COL_MIN_SPAWN, Int32),
+]
 
-def make_entry(name: str, entity_id: str, strength: str, min_spawn: str, struct_id: str):
+def make_entry(name: str, entity_id: str, strength: int, min_spawn: int, struct_id: str):
     """One Dict entry: key is monster name (String), value is Struct of 3 fields."""
-    return {
-        "key": {
-            "param_type": "String",
-            "value": name
-        },
-        "value": {
-            "param_type": "Struct",
-            "value": {
-                "structId": struct_id,
-                "type": "Struct",
-                "value": [
-                    {"param_type": "EntityReference", "value": entity_id},
-                    {"param_type": "Int32",           "value": strength},
-                    {"param_type": "Int32",           "value": min_spawn},
-                ]
-            }
-        }
-    }
-
-def build_json_from_csv(csv_path: str, struct_id: str = DEFAULT_STRUCT_ID) -> dict:
-    entries = []
-    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.DictReader(f)
-        if r.fieldnames is None:
-            raise SystemExit("CSV is missing header row.")
-        # normalize headers (trim spaces, handle accidental blanks)
-        r.fieldnames = [(h or "").strip() for h in r.fieldnames]
+    return Entry(String(name), Struct(struct_id, (
+        EntityReference(entity_id),
+        Int32(strength),
+        Int32(min_spawn),
+    )))
 
-        needed = [COL_NAME, COL_ENTITY_ID, COL_STRENGTH, COL_MIN_SPAWN]
-        for c in needed:
-            if c not in r.fieldnames:
-                raise SystemExit(f"Missing required column: {c} ; got: {r.fieldnames}")
+def iter_entries(csv_path: str, struct_id: str = DEFAULT_STRUCT_ID, strength: dict = None):
+    """
+    Yield Dict entries row by row (used by the streaming writer).
+    strength: {name: (单体强度, 最小生成)} from monster_strength; when given, the
+    spreadsheet-computed columns are ignored.
+    """
+    t = table_registry.load(csv_path)  # headers already trimmed, shared with monster_strength
+    schema = MONSTER_COLUMNS if strength is None else MONSTER_COLUMNS[:2]
+    # Blank and footer/stat rows are skipped; malformed numbers are reported with their line numbers
+    cols = load_columns(t, schema, nonempty=(COL_NAME, COL_ENTITY_ID), exclude={COL_NAME: FOOTER_ROWS})
 
-        for row in r:
-            name = (row.get(COL_NAME) or "").strip()
-            ent  = (row.get(COL_ENTITY_ID) or "").strip()
-            st   = (row.get(COL_STRENGTH) or "").strip()
-            mn   = (row.get(COL_MIN_SPAWN) or "").strip()
-
-            # Skip blanks & footer/stat rows
-            if not name or not ent or name in FOOTER_ROWS:
-                continue
-
-            try:
-                ent_s = to_int_str(ent)
-                st_s  = to_int_str(st)
-                mn_s  = to_int_str(mn)
-            except ValueError:
-                # Skip rows that don't have valid numeric fields
-                continue
-
-            entries.append(make_entry(name, ent_s, st_s, mn_s, struct_id))
+    if strength is None:
+        for name, ent, st, mn in zip(cols[COL_NAME], cols[COL_ENTITY_ID], cols[COL_STRENGTH], cols[COL_MIN_SPAWN]):
+            yield make_entry(name, ent, st, mn, struct_id)
+        return
+    for name, ent in zip(cols[COL_NAME], cols[COL_ENTITY_ID]):
+        if name not in strength:
+            continue  # base columns were not numeric
+        st, mn = strength[name]
+        yield make_entry(name, ent, st, mn, struct_id)
 
+def build_json_from_csv(csv_path: str, struct_id: str = DEFAULT_STRUCT_ID) -> dict:
     return {
         "type": "Dict",
         "key_type": "String",
         "value_type": "Struct",
-        "value": entries,
+        "value": [e.to_obj() for e in iter_entries(csv_path, struct_id)],
         "value_structId": struct_id
     }
 
@@ -89,14 +73,33 @@ def main():
     ap.add_argument("--csv", required=True, help="Monsters CSV path")
     ap.add_argument("--out", required=True, help="Output JSON path")
     ap.add_argument("--struct-id", default=DEFAULT_STRUCT_ID, help=f"StructId (default {DEFAULT_STRUCT_ID})")
+    ap.add_argument("--cache-dir", default="", help="Incremental build cache directory (empty = no cache)")
+    ap.add_argument("--recompute", action="store_true",
+                    help="Recompute 单体强度/最小生成 from the base columns instead of trusting the sheet")
+    ap.add_argument("--hp-weight", type=float, default=None, help="生命值权重 for --recompute (default: footer row or 0.5)")
+    ap.add_argument("--target-strength", type=float, default=None, help="目标强度 for --recompute (default: footer row or 800)")
+    profiling.add_arguments(ap)
     args = ap.parse_args()
 
-    obj = build_json_from_csv(args.csv, struct_id=args.struct_id)
-    outp = Path(args.out)
-    outp.parent.mkdir(parents=True, exist_ok=True)
-    with open(outp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=3)
-    print(f"Wrote {outp}")
+    def build():
+        strength = None
+        if args.recompute:
+            strength = monster_strength.strength_by_name(args.csv, hp_weight=args.hp_weight, target=args.target_strength)
+        outp = Path(args.out)
+        out = open_output(outp)
+        with out as f, DictJsonWriter(f, "String", args.struct_id, indent=3) as writer:
+            writer.write_all(iter_entries(args.csv, struct_id=args.struct_id, strength=strength))
+        print(f"Wrote {outp}" if out.changed else f"Unchanged {outp}")
+
+    with profiling.from_args(args, hooks=[(sys.modules[__name__], "make_entry", "entry_build"), (monster_strength, "compute_strength", "strength")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.csv], outputs=[args.out],
+            params={"struct_id": args.struct_id, "recompute": args.recompute,
+                    "hp_weight": args.hp_weight, "target_strength": args.target_strength},
+            sources=[__file__, dict_json.__file__, editor_types.__file__, table_registry.__file__, table_schema.__file__, monster_strength.__file__],
+            build=build,
+        )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,236 @@
+"""
+遭遇战耗时模拟：怪物 × 等级 × 玩家构筑 的击杀耗时（TTK）与被击杀耗时（TTD），汇总成热力图表。
+
+怪物取 怪物数据.csv 的基础列（与 monster_strength 相同）：
+  秒伤(m, L)  = 秒伤倍率 × 基础攻击力 × (1 + 攻击力额外倍率) × 攻击成长(L)
+  生命(m, L)  = 基础生命值 × (1 + 生命值额外倍率) × 生命成长(L)
+玩家构筑为 (秒伤, 生命值) 网格，可选再乘一条玩家成长曲线：
+  TTK = 生命(m, L) / (构筑秒伤 × 玩家成长(L))
+  TTD = 构筑生命 × 玩家成长(L) / 秒伤(m, L)
+胜 = TTK < TTD，即 构筑秒伤 × 构筑生命 > 生命(m, L) × 秒伤(m, L) / 玩家成长(L)²。
+
+每个 (怪物, 等级) 对全部构筑的 TTK 只差一个常数因子，所以构筑只需各排序一次：
+胜率是对 秒伤×生命 的一次二分查找，TTK / TTD 的分位数是 1/秒伤、生命 的分位数乘上该格的常数。
+结果与逐个构筑算出完整的 怪物 × 等级 × 构筑 三维表再汇总完全一致，但每格只需 O(log 构筑数)，
+30 种怪物 × 100 级 × 几千个构筑也在一秒内完成；cell() 给出单格逐构筑的明细。
+
+成长曲线（L 从 1 开始，1 级为 1）：
+  const          1
+  linear:k       1 + k × (L - 1)
+  exp:r          r^(L - 1)
+  pow:e          L^e
+
+胜负只取决于 怪物生命×秒伤 与 玩家成长² 之比：默认 exp:1.05 × exp:1.04 对 exp:1.035²，
+每级难度约升 2%，100 级约 6.7 倍；两者相等时每行各等级的结果完全相同。
+
+  python 超级斗鸡/encounter_sim.py --csv 超级斗鸡/怪物数据.csv --levels 1-100 --hp-curve exp:1.05 --atk-curve linear:0.08
+  python 超级斗鸡/encounter_sim.py --csv ... --metric ttk --quantile 0.9 --out build/ttk.csv
+  python 超级斗鸡/encounter_sim.py --csv ... --cell 丘丘王:50
+"""
+import csv
+import math
+import sys
+from bisect import bisect_right
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # 仓库根目录的共用模块
+import monster_strength
+
+DEFAULT_DPS = "2:80:2"
+DEFAULT_HP = "10:400:10"
+METRICS = ("win", "ttk", "ttd")
+
+
+# ---------------- 成长曲线 ----------------
+
+def parse_curve(spec: str):
+    """'exp:1.05' -> 等级 L 的倍率函数。"""
+    kind, _, arg = (spec or "const").partition(":")
+    kind = kind.strip().lower()
+    try:
+        k = float(arg) if arg.strip() else None
+    except ValueError:
+        raise SystemExit(f"成长曲线参数有误：{spec!r}") from None
+    if kind == "const":
+        return lambda L: 1.0
+    if k is None:
+        raise SystemExit(f"成长曲线 {spec!r} 缺少参数，如 linear:0.1 / exp:1.05 / pow:1.5")
+    if kind == "linear":
+        return lambda L: 1 + k * (L - 1)
+    if kind == "exp":
+        return lambda L: k ** (L - 1)
+    if kind == "pow":
+        return lambda L: L ** k
+    raise SystemExit(f"未知的成长曲线 {spec!r}（const / linear:k / exp:r / pow:e）")
+
+
+def parse_range(spec: str, cast=float):
+    """'5:200:5' -> [5, 10, ..., 200]；'1-100' 也可；单个数即只有一个值。"""
+    if ":" not in spec and "-" in spec[1:]:
+        i = spec.index("-", 1)
+        parts = [spec[:i], spec[i + 1:]]
+    else:
+        parts = spec.split(":")
+    try:
+        if len(parts) == 1:
+            return [cast(parts[0])]
+        lo, hi = cast(parts[0]), cast(parts[1])
+        step = cast(parts[2]) if len(parts) > 2 else cast(1)
+    except ValueError:
+        raise SystemExit(f"范围有误：{spec!r}（写成 lo:hi[:step]）") from None
+    if step <= 0 or hi < lo:
+        raise SystemExit(f"范围有误：{spec!r}（需要 lo <= hi 且 step > 0）")
+    n = int(math.floor((hi - lo) / step + 1e-9)) + 1
+    return [cast(lo + i * step) for i in range(n)]
+
+
+# ---------------- 数据 ----------------
+
+def load_monsters(csv_path: str):
+    """(名字列表, 1 级平均秒伤, 1 级有效生命)；基础列坏掉的行已被 monster_strength 跳过。"""
+    cols = monster_strength.load_base_columns(csv_path)
+    dps, hp = monster_strength.base_stats(cols)
+    if not cols["name"]:
+        raise SystemExit(f"{csv_path} 里没有可用的怪物")
+    return list(cols["name"]), dps, hp
+
+
+class Builds:
+    """
+    玩家构筑网格 dps × hp（笛卡尔积），预先排好三组序列：
+      inv_dps   各构筑 1/秒伤（升序）        TTK 的分位数
+      hp        各构筑生命（升序）           TTD 的分位数
+      power     各构筑 秒伤 × 生命（升序）   胜率
+    """
+
+    def __init__(self, dps_values, hp_values):
+        if not dps_values or not hp_values or min(dps_values) <= 0 or min(hp_values) <= 0:
+            raise SystemExit("构筑的秒伤 / 生命必须为正数")
+        self.dps_values = list(dps_values)
+        self.hp_values = list(hp_values)
+        nd, nh = len(self.dps_values), len(self.hp_values)
+        self.count = nd * nh
+        # 网格里每个 秒伤 各出现 nh 次、每个 生命 各出现 nd 次
+        self.inv_dps = sorted(1 / d for d in self.dps_values for _ in range(nh))
+        self.hp = sorted(h for h in self.hp_values for _ in range(nd))
+        self.power = sorted(d * h for d in self.dps_values for h in self.hp_values)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for d in self.dps_values:
+            for h in self.hp_values:
+                yield d, h
+
+
+def _quantile(sorted_values, q: float) -> float:
+    """最近秩分位数（与逐构筑排序后取值一致）。"""
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))]
+
+
+# ---------------- 模拟 ----------------
+
+class Encounter:
+    def __init__(self, names, dps, hp, levels, hp_curve, atk_curve, player_curve):
+        self.names = names
+        self.levels = list(levels)
+        hc = [hp_curve(L) for L in self.levels]
+        ac = [atk_curve(L) for L in self.levels]
+        pc = [player_curve(L) for L in self.levels]
+        if min(pc) <= 0:
+            raise SystemExit("玩家成长曲线必须保持为正")
+        # [怪物][等级]：该格的怪物生命、怪物秒伤，都已除以玩家成长（相当于构筑的秒伤、生命按 1 级计）
+        self.ehp = [[h * c / p for c, p in zip(hc, pc)] for h in hp]
+        self.mdps = [[d * c / p for c, p in zip(ac, pc)] for d in dps]
+
+    def heat(self, builds: Builds, metric: str = "win", q: float = 0.5):
+        """[怪物][等级] 的汇总值：win 为胜率，ttk / ttd 为对全部构筑的 q 分位数（秒；怪物秒伤为 0 时 TTD 为 inf）。"""
+        if metric == "win":
+            power, n = builds.power, len(builds)
+            return [[(n - bisect_right(power, e * d)) / n for e, d in zip(er, dr)]
+                    for er, dr in zip(self.ehp, self.mdps)]
+        if metric == "ttk":
+            k = _quantile(builds.inv_dps, q)
+            return [[e * k for e in er] for er in self.ehp]
+        if metric == "ttd":
+            k = _quantile(builds.hp, q)
+            return [[k / d if d > 0 else math.inf for d in dr] for dr in self.mdps]
+        raise ValueError(metric)
+
+    def cell(self, m: int, li: int, builds: Builds):
+        """单格逐构筑明细：[(构筑秒伤, 构筑生命, TTK, TTD)]。"""
+        e, d = self.ehp[m][li], self.mdps[m][li]
+        return [(bd, bh, e / bd, bh / d if d > 0 else math.inf) for bd, bh in builds]
+
+
+def _fmt(v: float, metric: str) -> str:
+    if metric == "win":
+        return f"{v:.0%}"
+    return "inf" if math.isinf(v) else f"{v:.1f}"
+
+
+def main():
+    import argparse, time
+    ap = argparse.ArgumentParser(description="怪物数据.csv × 等级 × 玩家构筑 的击杀耗时 / 被击杀耗时热力图。")
+    ap.add_argument("--csv", required=True, help="怪物表路径（怪物数据.csv）")
+    ap.add_argument("--levels", default="1-100", help="等级范围 lo-hi 或 lo:hi[:step]（默认 1-100）")
+    ap.add_argument("--hp-curve", default="exp:1.05", help="怪物生命成长曲线（默认 exp:1.05）")
+    ap.add_argument("--atk-curve", default="exp:1.04", help="怪物攻击成长曲线（默认 exp:1.04）")
+    ap.add_argument("--player-curve", default="exp:1.035", help="玩家成长曲线，同时乘到每个构筑的秒伤和生命上（默认 exp:1.035）")
+    ap.add_argument("--dps", default=DEFAULT_DPS, help=f"构筑秒伤网格 lo:hi:step，按 1 级计（默认 {DEFAULT_DPS}）")
+    ap.add_argument("--hp", default=DEFAULT_HP, help=f"构筑生命网格 lo:hi:step，按 1 级计（默认 {DEFAULT_HP}）")
+    ap.add_argument("--metric", choices=METRICS, default="win", help="win = TTK < TTD 的构筑占比；ttk / ttd = 对全部构筑取分位数")
+    ap.add_argument("--quantile", type=float, default=0.5, help="ttk / ttd 的分位数（默认 0.5）")
+    ap.add_argument("--print-levels", type=int, default=10, help="打印到 stdout 的等级列数（默认 10；--out 保留全部等级）")
+    ap.add_argument("--out", default="", help="把完整热力图（全部等级）写成 CSV")
+    ap.add_argument("--cell", default="", help="单格逐构筑明细，如 丘丘王:50")
+    args = ap.parse_args()
+
+    if not 0 <= args.quantile <= 1:
+        raise SystemExit("--quantile 必须在 [0, 1] 内")
+    names, dps, hp = load_monsters(args.csv)
+    levels = parse_range(args.levels, int)
+    if levels[0] < 1:
+        raise SystemExit("等级从 1 开始")
+    builds = Builds(parse_range(args.dps), parse_range(args.hp))
+    t0 = time.perf_counter()
+    sim = Encounter(names, dps, hp, levels, parse_curve(args.hp_curve), parse_curve(args.atk_curve),
+                    parse_curve(args.player_curve))
+
+    if args.cell:
+        name, _, lv = args.cell.rpartition(":")
+        if name not in names or not lv.isdigit() or int(lv) not in levels:
+            raise SystemExit(f"--cell 应为 怪物:等级，怪物取自 {args.csv}，等级在 --levels 范围内")
+        rows = sim.cell(names.index(name), levels.index(int(lv)), builds)
+        print("构筑秒伤\t构筑生命\tTTK\tTTD\t胜")
+        for bd, bh, ttk, ttd in rows:
+            print(f"{bd:g}\t{bh:g}\t{ttk:.2f}\t{ttd:.2f}\t{'Y' if ttk < ttd else ''}")
+        wins = sum(ttk < ttd for _, _, ttk, ttd in rows)
+        print(f"{name} Lv{lv}：{wins}/{len(rows)} 个构筑获胜")
+        return
+
+    heat = sim.heat(builds, args.metric, args.quantile)
+    elapsed = time.perf_counter() - t0
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8-sig", newline="") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(["怪物"] + [f"Lv{L}" for L in levels])
+            for name, row in zip(names, heat):
+                w.writerow([name] + [repr(v) for v in row])
+        print(f"已写出 {args.out}")
+
+    step = max(1, math.ceil(len(levels) / max(1, args.print_levels)))
+    shown = list(range(0, len(levels), step))
+    if shown[-1] != len(levels) - 1:
+        shown.append(len(levels) - 1)
+    what = "胜率" if args.metric == "win" else f"{args.metric} p{args.quantile * 100:g}（秒）"
+    print(f"# {what}：{len(names)} 种怪物 × {len(levels)} 级 × {len(builds)} 个构筑（{elapsed:.2f}s）")
+    print("怪物\t" + "\t".join(f"Lv{levels[i]}" for i in shown))
+    for name, row in zip(names, heat):
+        print(name + "\t" + "\t".join(_fmt(row[i], args.metric) for i in shown))
+
+
+if __name__ == "__main__":
+    main()
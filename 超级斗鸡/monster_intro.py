@@ -1,23 +1,22 @@
 import argparse
-import csv
-import json
-import os
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # 共用模块在仓库根目录
+import dict_json, editor_types, profiling, table_registry, table_schema, table_spec
+from build_cache import run_cached
 
-def build_entry(monster_id: str, name: str, desc: str, struct_id: str) -> dict:
+
+def intro_spec(struct_id: str, id_col: str = "元件ID", name_col: str = "名字", desc_col: str = "介绍") -> dict:
+    """元件ID → (名字, 介绍)；元件ID 为空或重复都报错。"""
     return {
-        "key": {"param_type": "EntityReference", "value": monster_id},
-        "value": {
-            "param_type": "Struct",
-            "value": {
-                "structId": struct_id,
-                "type": "Struct",
-                "value": [
-                    {"param_type": "String", "value": name},
-                    {"param_type": "String", "value": desc},
-                ],
-            },
-        },
+        "key": {"type": "EntityReference", "column": id_col},
+        "struct_id": struct_id,
+        "fields": [
+            {"type": "String", "column": name_col, "default": ""},
+            {"type": "String", "column": desc_col, "default": ""},
+        ],
+        "unique_key": True,
     }
 
 
@@ -32,56 +31,26 @@ def main():
     parser.add_argument("--name-col", default="名字", help="column name for name (default: 名字)")
     parser.add_argument("--desc-col", default="介绍", help="column name for description (default: 介绍)")
 
-    args = parser.parse_args()
-
-    in_path = args.csv
-    out_path = args.out
-    struct_id = str(args.struct_id)
-
-    result = {
-        "type": "Dict",
-        "key_type": "EntityReference",
-        "value_type": "Struct",
-        "value": [],
-        "value_structId": struct_id,
-    }
-
-    seen = set()
+    parser.add_argument("--cache-dir", default="", help="incremental build cache dir (empty: no cache)")
 
-    with open(in_path, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-
-        if not reader.fieldnames:
-            raise ValueError("CSV 似乎是空的或没有表头")
-
-        required_cols = {args.id_col, args.name_col, args.desc_col}
-        missing = required_cols - set(reader.fieldnames)
-        if missing:
-            raise ValueError(f"CSV 缺少列: {missing}. 当前列: {reader.fieldnames}")
-
-        for line_no, row in enumerate(reader, start=2):  # 第1行表头
-            monster_id = str(row.get(args.id_col, "")).strip()
-            name = (row.get(args.name_col, "") or "").strip()
-            desc = (row.get(args.desc_col, "") or "").strip()
-
-            if not monster_id:
-                raise ValueError(f"第 {line_no} 行：{args.id_col} 为空")
-            if monster_id in seen:
-                raise ValueError(f"第 {line_no} 行：{args.id_col} 重复: {monster_id}")
-            seen.add(monster_id)
-
-            result["value"].append(build_entry(monster_id, name, desc, struct_id))
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
 
-    # 确保输出目录存在
-    out_dir = os.path.dirname(out_path)
-    if out_dir:
-        os.makedirs(out_dir, exist_ok=True)
+    with profiling.from_args(args, hooks=[(table_spec, "compile_spec", "compile")]):
+        run_cached(
+            args.cache_dir, args.out,
+            inputs=[args.csv], outputs=[args.out],
+            params={"struct_id": str(args.struct_id), "id_col": args.id_col, "name_col": args.name_col, "desc_col": args.desc_col},
+            sources=[__file__, dict_json.__file__, editor_types.__file__, table_registry.__file__, table_schema.__file__,
+                     table_spec.__file__],
+            build=lambda: generate(args.csv, args.out, str(args.struct_id), args.id_col, args.name_col, args.desc_col),
+        )
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
 
-    print(f"OK: wrote {out_path} ({len(result['value'])} entries)")
+def generate(in_path: str, out_path: str, struct_id: str, id_col: str = "元件ID", name_col: str = "名字", desc_col: str = "介绍"):
+    # 边读边写；出错时临时文件被丢弃，不会留下半个 JSON
+    table_spec.build_table(intro_spec(struct_id, id_col, name_col, desc_col), in_path, out_path)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
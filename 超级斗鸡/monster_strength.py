@@ -0,0 +1,201 @@
+"""
+从 怪物数据.csv 的基础列重新计算派生强度列（不再依赖表格里算好的 单体强度 / 最小生成）。
+
+  平均秒伤   = 秒伤倍率 × 基础攻击力 × (1 + 攻击力额外倍率)
+  有效生命   = 基础生命值 × (1 + 生命值额外倍率)
+  总强度     = 100 × (平均秒伤 / 中位数)^(1-w) × (有效生命 / 中位数)^w      w = 生命值权重
+  单体强度   = round(总强度 × (1 + AI额外乘区) + 额外强度)
+  可生成数量 = floor(目标强度 / 单体强度)
+  最小生成   = 按 可生成数量 分档（MIN_SPAWN_STEPS）
+
+按列计算：对数列只算一次，扫描多组 权重/目标强度 时每组只是几次逐列运算。
+表格导出的百分比只保留整数，重新计算的结果与表格可能差 1。
+"""
+import math
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # 仓库根目录的共用模块
+import table_registry
+from editor_types import String
+from table_schema import Column, Percent, load_columns
+
+COL_NAME = "怪物"
+COL_ENTITY_ID = "元件ID"
+COL_DPS_MULT = "秒伤倍率"
+COL_BASE_HP = "基础生命值（1级）"
+COL_BASE_ATK = "基础攻击力（1级）"
+COL_HP_EXTRA = "生命值额外倍率"
+COL_ATK_EXTRA = "攻击力额外倍率"
+COL_AI_MULT = "AI额外乘区"
+COL_EXTRA_STRENGTH = "额外强度"
+COL_STRENGTH = "单体强度"
+COL_MIN_SPAWN = "最小生成"
+
+FOOTER_ROWS = {"中位数", "生命值权重", "目标强度"}
+
+# 键 -> 列；基础列不是数字的行整行跳过
+BASE_COLUMNS = [
+    Column(COL_NAME, String, key="name"),
+    Column(COL_ENTITY_ID, String, key="entity_id"),
+    Column(COL_DPS_MULT, Percent, default=0.0, key="dps_mult"),
+    Column(COL_BASE_HP, Percent, default=0.0, key="base_hp"),
+    Column(COL_BASE_ATK, Percent, default=0.0, key="base_atk"),
+    Column(COL_HP_EXTRA, Percent, default=0.0, key="hp_extra"),
+    Column(COL_ATK_EXTRA, Percent, default=0.0, key="atk_extra"),
+    Column(COL_AI_MULT, Percent, default=0.0, key="ai_mult"),
+    Column(COL_EXTRA_STRENGTH, Percent, default=0.0, optional=True, key="extra_strength"),
+    Column(COL_STRENGTH, String, default="", optional=True, key="sheet_strength"),
+    Column(COL_MIN_SPAWN, String, default="", optional=True, key="sheet_min_spawn"),
+]
+
+DEFAULT_HP_WEIGHT = 0.5
+DEFAULT_TARGET_STRENGTH = 800
+DEFAULT_SCALE = 100
+# (可生成数量下限, 最小生成)，从上往下取第一个满足的档；都不满足则为 1
+MIN_SPAWN_STEPS = ((15, 4), (13, 3), (8, 2))
+
+
+def parse_number(v) -> float:
+    """'34%' -> 0.34, '16.87' -> 16.87, '' -> 0.0"""
+    s = str(v or "").strip()
+    if not s:
+        return 0.0
+    if s.endswith("%"):
+        return float(s[:-1]) / 100
+    return float(s)
+
+
+def load_base_columns(csv_path: str) -> dict:
+    """
+    读取基础列，返回按列存放的 dict：
+      {"name": [...], "entity_id": [...], "dps_mult": [...], ..., "sheet_strength": [...], "sheet_min_spawn": [...],
+       "params": {"hp_weight": ..., "target": ...}}   # params 来自表尾的 生命值权重 / 目标强度 行（若有）
+    跳过空行、表尾统计行，以及基础列不是数字的行。
+    """
+    t = table_registry.load(csv_path)
+    # 表头里 “总强度” 出现两次，列模式按第一次出现取列
+    loaded = load_columns(t, BASE_COLUMNS, nonempty=(COL_NAME, COL_ENTITY_ID),
+                          exclude={COL_NAME: FOOTER_ROWS}, errors="skip")
+    cols = dict(loaded.data)
+
+    params = {}
+    i_name = t.index(COL_NAME)
+    for row in t.rows:
+        name = row[i_name].strip()
+        if name in FOOTER_ROWS:
+            values = [c for c in row[1:] if c.strip()]
+            if name == "生命值权重" and values:
+                params["hp_weight"] = parse_number(values[0])
+            elif name == "目标强度" and values:
+                params["target"] = parse_number(values[0])
+    cols["params"] = params
+    return cols
+
+
+def base_stats(cols: dict):
+    """平均秒伤、有效生命两列（与权重/目标无关，扫描时只算一次）。"""
+    dps = [m * a * (1 + ae) for m, a, ae in zip(cols["dps_mult"], cols["base_atk"], cols["atk_extra"])]
+    hp = [h * (1 + he) for h, he in zip(cols["base_hp"], cols["hp_extra"])]
+    return dps, hp
+
+
+def min_spawn_for(count: int, steps=MIN_SPAWN_STEPS) -> int:
+    for lower, n in steps:
+        if count >= lower:
+            return n
+    return 1
+
+
+def _log_ratios(values):
+    """log(x / 中位数)；x <= 0 时记为 -inf（强度为 0）。"""
+    med = statistics.median(values) if values else 0.0
+    if med <= 0:
+        raise SystemExit("中位数为 0，无法归一化强度。")
+    return [math.log(v / med) if v > 0 else -math.inf for v in values]
+
+
+def _finish(cols, dps, hp, log_dps, log_hp, hp_weight, target, scale, steps) -> dict:
+    dw = 1 - hp_weight
+    total = [scale * math.exp(dw * ld + hp_weight * lh) for ld, lh in zip(log_dps, log_hp)]
+    single = [max(1, round(t * (1 + ai) + ex)) for t, ai, ex in zip(total, cols["ai_mult"], cols["extra_strength"])]
+    count = [int(target // s) for s in single]
+    return {
+        "name": cols["name"],
+        "平均秒伤": dps,
+        "有效生命": hp,
+        "总强度": total,
+        "单体强度": single,
+        "可生成数量": count,
+        "最小生成": [min_spawn_for(c, steps) for c in count],
+    }
+
+
+def compute_strength(cols: dict, hp_weight: float = None, target: float = None,
+                     scale: float = DEFAULT_SCALE, steps=MIN_SPAWN_STEPS) -> dict:
+    """
+    计算所有派生列，返回按列存放的 dict（键为表格列名）。
+    hp_weight / target 为空时取表尾行的值，再没有则用默认值。
+    """
+    params = cols.get("params", {})
+    hp_weight = params.get("hp_weight", DEFAULT_HP_WEIGHT) if hp_weight is None else hp_weight
+    target = params.get("target", DEFAULT_TARGET_STRENGTH) if target is None else target
+    dps, hp = base_stats(cols)
+    return _finish(cols, dps, hp, _log_ratios(dps), _log_ratios(hp), hp_weight, target, scale, steps)
+
+
+def sweep(cols: dict, hp_weights, targets, scale: float = DEFAULT_SCALE, steps=MIN_SPAWN_STEPS):
+    """对每组 (生命值权重, 目标强度) 计算一次，返回 [(w, target, 结果列), ...]。"""
+    dps, hp = base_stats(cols)
+    log_dps, log_hp = _log_ratios(dps), _log_ratios(hp)
+    return [(w, t, _finish(cols, dps, hp, log_dps, log_hp, w, t, scale, steps))
+            for w in hp_weights for t in targets]
+
+
+def strength_by_name(csv_path: str, hp_weight: float = None, target: float = None) -> dict:
+    """{怪物名: (单体强度, 最小生成)}，供 build_monster_json 使用。"""
+    res = compute_strength(load_base_columns(csv_path), hp_weight=hp_weight, target=target)
+    return {n: (s, m) for n, s, m in zip(res["name"], res["单体强度"], res["最小生成"])}
+
+
+def _floats(s: str):
+    return [float(x) for x in s.split(",") if x.strip()]
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Recompute 单体强度/最小生成 from the base columns of 怪物数据.csv.")
+    ap.add_argument("--csv", required=True, help="Monsters CSV path")
+    ap.add_argument("--hp-weight", type=float, default=None, help=f"生命值权重 (default: footer row or {DEFAULT_HP_WEIGHT})")
+    ap.add_argument("--target", type=float, default=None, help=f"目标强度 (default: footer row or {DEFAULT_TARGET_STRENGTH})")
+    ap.add_argument("--sweep-weights", default="", help="Comma-separated 生命值权重 values to sweep, e.g. 0.3,0.5,0.7")
+    ap.add_argument("--sweep-targets", default="", help="Comma-separated 目标强度 values to sweep")
+    args = ap.parse_args()
+
+    cols = load_base_columns(args.csv)
+    if args.sweep_weights or args.sweep_targets:
+        params = cols["params"]
+        weights = _floats(args.sweep_weights) or [args.hp_weight if args.hp_weight is not None else params.get("hp_weight", DEFAULT_HP_WEIGHT)]
+        targets = _floats(args.sweep_targets) or [args.target if args.target is not None else params.get("target", DEFAULT_TARGET_STRENGTH)]
+        for w, t, res in sweep(cols, weights, targets):
+            print(f"# 生命值权重={w:g} 目标强度={t:g}")
+            for n, s, m in zip(res["name"], res["单体强度"], res["最小生成"]):
+                print(f"{n}\t{s}\t{m}")
+        return
+
+    res = compute_strength(cols, hp_weight=args.hp_weight, target=args.target)
+    changed = 0
+    print("怪物\t平均秒伤\t有效生命\t总强度\t单体强度(表格→计算)\t可生成数量\t最小生成(表格→计算)")
+    for i, n in enumerate(res["name"]):
+        old_s, old_m = cols["sheet_strength"][i], cols["sheet_min_spawn"][i]
+        s, m = res["单体强度"][i], res["最小生成"][i]
+        mark = "" if (old_s == str(s) and old_m == str(m)) else "  *"
+        changed += bool(mark)
+        print(f"{n}\t{res['平均秒伤'][i]:.1f}\t{res['有效生命'][i]:.1f}\t{res['总强度'][i]:.1f}\t"
+              f"{old_s}→{s}\t{res['可生成数量'][i]}\t{old_m}→{m}{mark}")
+    print(f"{changed}/{len(res['name'])} rows differ from {Path(args.csv).name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+波次组合求解：在 目标强度 ± 容差 内，枚举 / 采样满足 最小生成 的怪物组合。
+
+每种怪物要么不出，要么至少出 最小生成 只；组合总强度 = Σ 数量 × 单体强度。
+用有界背包计数 DP（按强度和 × 种类数）代替暴力枚举：
+  ways[i][k][t] = 只用第 i.. 种怪物、恰好 k 种、总强度恰为 t 的组合数
+同一余数类上的前缀和让每种怪物的转移是 O(T)，整张表 O(种类 × 最大种类数 × T)。
+有了计数表，可以按组合数加权均匀采样，也可以只沿着非零分支枚举。
+
+  python 超级斗鸡/wave_solver.py --csv 超级斗鸡/怪物数据.csv --min-target 400 --max-target 1200 --step 100
+  python 超级斗鸡/wave_solver.py ... --out build/波次.json --struct-id ... --inner-struct-id ...
+"""
+import itertools
+import random
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path[:0] = [str(HERE), str(HERE.parent)]  # 本目录 + 仓库根目录的共用模块
+import build_monster_json
+from build_cache import open_output
+from dict_json import DictJsonWriter
+from editor_types import INT32_MAX, EntityReference, Entry, Int32, Struct, StructList
+
+DEFAULT_TOLERANCE = 0
+DEFAULT_MAX_KINDS = 3
+DEFAULT_PER_TARGET = 5
+
+
+def load_monsters(csv_path: str, strength: dict = None):
+    """[(名字, 元件ID, 单体强度, 最小生成)]，与 build_monster_json 输出的数据一致。"""
+    monsters = []
+    for e in build_monster_json.iter_entries(csv_path, strength=strength):
+        ent, st, mn = (f.value for f in e.value.fields)
+        st, mn = int(st), max(1, int(mn))
+        if st > 0:
+            monsters.append((e.key.value, ent, st, mn))
+    return monsters
+
+
+class WaveSolver:
+    """
+    对固定的怪物池和强度上限建一次计数表，之后对任意目标区间查询 / 采样 / 枚举。
+    """
+
+    def __init__(self, monsters, max_total: int, max_kinds: int = DEFAULT_MAX_KINDS):
+        self.monsters = list(monsters)
+        self.max_total = int(max_total)
+        self.max_kinds = max(1, min(int(max_kinds or len(self.monsters)), len(self.monsters)))
+        self.ways = self._build()
+
+    def _build(self):
+        T, K = self.max_total, self.max_kinds
+        n = len(self.monsters)
+        # ways[n]: 不用任何怪物 —— 只有 k=0, t=0 一种
+        tail = [[0] * (T + 1) for _ in range(K + 1)]
+        tail[0][0] = 1
+        ways = [None] * (n + 1)
+        ways[n] = tail
+        for i in range(n - 1, -1, -1):
+            _, _, s, m = self.monsters[i]
+            nxt = ways[i + 1]
+            cur = [row[:] for row in nxt]  # 数量为 0
+            first = m * s
+            for k in range(1, K + 1):
+                src = nxt[k - 1]
+                # 前缀和沿步长 s：P[t] = src[t] + P[t-s]；Σ_{c>=m} src[t-c·s] = P[t-m·s]
+                P = src[:]
+                for t in range(s, T + 1):
+                    P[t] += P[t - s]
+                row = cur[k]
+                for t in range(first, T + 1):
+                    row[t] += P[t - first]
+            ways[i] = cur
+        return ways
+
+    def _total_ways(self, t: int) -> int:
+        return sum(self.ways[0][k][t] for k in range(1, self.max_kinds + 1))
+
+    def count(self, target: int, tolerance: int = DEFAULT_TOLERANCE) -> int:
+        lo, hi = max(1, target - tolerance), min(self.max_total, target + tolerance)
+        return sum(self._total_ways(t) for t in range(lo, hi + 1))
+
+    def _counts_for(self, i: int, k: int, t: int):
+        """第 i 种怪物在剩余 (k 种, 强度 t) 下的可选数量及其权重。"""
+        _, _, s, m = self.monsters[i]
+        nxt = self.ways[i + 1]
+        opts = []
+        if nxt[k][t]:
+            opts.append((0, nxt[k][t]))
+        if k:
+            c = m
+            while c * s <= t:
+                w = nxt[k - 1][t - c * s]
+                if w:
+                    opts.append((c, w))
+                c += 1
+        return opts
+
+    def sample(self, target: int, tolerance: int = DEFAULT_TOLERANCE, n: int = 1, rng: random.Random = None):
+        """按组合数加权，均匀采样 n 个组合（可能重复）；每个组合为 [(名字, 元件ID, 数量), ...]。"""
+        rng = rng or random.Random()
+        lo, hi = max(1, target - tolerance), min(self.max_total, target + tolerance)
+        cells = [(k, t, self.ways[0][k][t]) for t in range(lo, hi + 1) for k in range(1, self.max_kinds + 1)]
+        cells = [c for c in cells if c[2]]
+        if not cells:
+            return []
+        out = []
+        for _ in range(n):
+            k, t = _weighted(rng, [(c[:2], c[2]) for c in cells])
+            mix = []
+            for i in range(len(self.monsters)):
+                c = _weighted(rng, self._counts_for(i, k, t))
+                if c:
+                    name, ent, s, _ = self.monsters[i]
+                    mix.append((name, ent, c))
+                    k, t = k - 1, t - c * s
+            out.append(mix)
+        return out
+
+    def enumerate(self, target: int, tolerance: int = DEFAULT_TOLERANCE, limit: int = None):
+        """按怪物顺序枚举全部组合（只走计数非零的分支，不会走进死路）。"""
+        lo, hi = max(1, target - tolerance), min(self.max_total, target + tolerance)
+        n = len(self.monsters)
+
+        def walk(i, k, t, mix):
+            if i == n:
+                yield list(mix)
+                return
+            for c, _ in self._counts_for(i, k, t):
+                if c:
+                    name, ent, s, _ = self.monsters[i]
+                    mix.append((name, ent, c))
+                    yield from walk(i + 1, k - 1, t - c * s, mix)
+                    mix.pop()
+                else:
+                    yield from walk(i + 1, k, t, mix)
+
+        mixes = (m for t in range(lo, hi + 1) for k in range(1, self.max_kinds + 1)
+                 if self.ways[0][k][t] for m in walk(0, k, t, []))
+        return itertools.islice(mixes, limit)
+
+
+def _weighted(rng: random.Random, options):
+    total = sum(w for _, w in options)
+    r = rng.randrange(total)
+    for v, w in options:
+        r -= w
+        if r < 0:
+            return v
+    return options[-1][0]
+
+
+def lookup_table(solver: WaveSolver, targets, tolerance: int, per_target: int, seed: int = 0):
+    """{目标强度: (组合总数, [组合, ...])}；每个目标用独立的种子，结果可复现。"""
+    table = {}
+    for target in targets:
+        rng = random.Random(f"{seed}:{target}")
+        table[target] = (solver.count(target, tolerance), solver.sample(target, tolerance, per_target, rng))
+    return table
+
+
+def make_entry(target: int, total: int, mixes, struct_id: str, inner_struct_id: str) -> Entry:
+    """
+    Dict<Int32 目标强度, Struct>：
+      [Int32 组合总数(封顶 Int32), StructList<Struct(Int32 组合序号, EntityReference 怪物, Int32 数量)>]
+    """
+    rows = [Struct(inner_struct_id, (Int32(i), EntityReference(ent), Int32(c)))
+            for i, mix in enumerate(mixes) for _, ent, c in mix]
+    return Entry(Int32(target), Struct(struct_id, (Int32(min(total, INT32_MAX)), StructList(inner_struct_id, rows))))
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Solve monster wave compositions for a range of target strengths.")
+    ap.add_argument("--csv", required=True, help="Monsters CSV path (怪物数据.csv)")
+    ap.add_argument("--min-target", type=int, required=True, help="Smallest 目标强度")
+    ap.add_argument("--max-target", type=int, required=True, help="Largest 目标强度")
+    ap.add_argument("--step", type=int, default=1, help="Target step (default 1)")
+    ap.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE, help="Allowed |total - target| (default 0)")
+    ap.add_argument("--max-kinds", type=int, default=DEFAULT_MAX_KINDS, help=f"Max monster kinds per wave (default {DEFAULT_MAX_KINDS})")
+    ap.add_argument("--per-target", type=int, default=DEFAULT_PER_TARGET, help=f"Mixes sampled per target (default {DEFAULT_PER_TARGET})")
+    ap.add_argument("--seed", type=int, default=0, help="Sampling seed (default 0)")
+    ap.add_argument("--recompute", action="store_true", help="Use strengths recomputed by monster_strength")
+    ap.add_argument("--out", default="", help="Write the lookup table as Dict JSON here")
+    ap.add_argument("--struct-id", default="", help="StructId of the per-target Struct (required with --out)")
+    ap.add_argument("--inner-struct-id", default="", help="StructId of the (mix, monster, count) rows (required with --out)")
+    args = ap.parse_args()
+
+    if args.min_target < 1 or args.max_target < args.min_target or args.step < 1:
+        raise SystemExit("Need 1 <= --min-target <= --max-target and --step >= 1.")
+    if args.out and not (args.struct_id and args.inner_struct_id):
+        raise SystemExit("--out needs --struct-id and --inner-struct-id.")
+
+    strength = None
+    if args.recompute:
+        import monster_strength
+        strength = monster_strength.strength_by_name(args.csv)
+    solver = WaveSolver(load_monsters(args.csv, strength), args.max_target + args.tolerance, args.max_kinds)
+    targets = range(args.min_target, args.max_target + 1, args.step)
+    table = lookup_table(solver, targets, args.tolerance, args.per_target, seed=args.seed)
+
+    if args.out:
+        outp = Path(args.out)
+        out = open_output(outp)
+        with out as f, DictJsonWriter(f, "Int32", args.struct_id, indent=3) as writer:
+            for target, (total, mixes) in table.items():
+                writer.write(make_entry(target, total, mixes, args.struct_id, args.inner_struct_id))
+        print(f"Wrote {outp}" if out.changed else f"Unchanged {outp}")
+        return
+
+    for target, (total, mixes) in table.items():
+        print(f"目标强度 {target}: {total} 种组合")
+        for mix in mixes:
+            print("  " + " + ".join(f"{name}×{c}" for name, _, c in mix))
+
+
+if __name__ == "__main__":
+    main()